@@ -1,9 +1,12 @@
 # api/clients/channeltalk_client.py
-import os, asyncio
-from typing import Optional, Dict, Any
+import os, time, random, asyncio, logging
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Any, List, Tuple
 from pathlib import Path
 from dotenv import load_dotenv
 
+from api.services import metrics
+
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 ENV_PATH = PROJECT_ROOT / ".env"
 load_dotenv(dotenv_path=ENV_PATH)
@@ -11,54 +14,438 @@ load_dotenv(dotenv_path=ENV_PATH)
 CHANNELTALK_API_BASE = os.getenv("CHANNELTALK_API_BASE", "https://api.channel.io/open/v5")
 CHANNELTALK_BOT_NAME = os.getenv("CHANNELTALK_BOT_NAME", "EventOK")
 
+# 커넥션 풀 / 프로토콜
+CHANNELTALK_MAX_CONNECTIONS = int(os.getenv("CHANNELTALK_MAX_CONNECTIONS", "20"))
+CHANNELTALK_MAX_KEEPALIVE   = int(os.getenv("CHANNELTALK_MAX_KEEPALIVE", "10"))
+CHANNELTALK_KEEPALIVE_SECS  = float(os.getenv("CHANNELTALK_KEEPALIVE_SECS", "30"))
+CHANNELTALK_CONNECT_TIMEOUT = float(os.getenv("CHANNELTALK_CONNECT_TIMEOUT", "3"))
+CHANNELTALK_TIMEOUT         = float(os.getenv("CHANNELTALK_TIMEOUT", "8"))
+CHANNELTALK_HTTP2           = os.getenv("CHANNELTALK_HTTP2", "false").lower() in ("1", "true", "yes", "y")
+
+# 호출 한도 (채널톡 Open API 쿼터에 맞춰 조정)
+CHANNELTALK_RATE_PER_SEC = float(os.getenv("CHANNELTALK_RATE_PER_SEC", "10"))
+CHANNELTALK_RATE_BURST   = float(os.getenv("CHANNELTALK_RATE_BURST", "20"))
+
+# 재시도: 횟수와 총 소요 시간 상한 (vercel maxDuration 10s 안쪽)
+CHANNELTALK_MAX_RETRIES   = int(os.getenv("CHANNELTALK_MAX_RETRIES", "4"))
+CHANNELTALK_RETRY_BUDGET  = float(os.getenv("CHANNELTALK_RETRY_BUDGET", "6"))
+CHANNELTALK_BACKOFF_BASE  = float(os.getenv("CHANNELTALK_BACKOFF_BASE", "0.5"))
+CHANNELTALK_BACKOFF_CAP   = float(os.getenv("CHANNELTALK_BACKOFF_CAP", "4"))
+
+# 서킷 브레이커
+CHANNELTALK_CB_FAILURES = int(os.getenv("CHANNELTALK_CB_FAILURES", "5"))
+CHANNELTALK_CB_COOLDOWN = float(os.getenv("CHANNELTALK_CB_COOLDOWN", "30"))
+
+# 같은 user_chat_id 로 가는 응답 병합 창(ms). 0 이면 끔
+CHANNELTALK_COALESCE_MS  = float(os.getenv("CHANNELTALK_COALESCE_MS", "0"))
+CHANNELTALK_COALESCE_MAX = int(os.getenv("CHANNELTALK_COALESCE_MAX", "10"))
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+log = logging.getLogger(__name__)
+
 _httpx_client = None
+_transport = None
+_auth_cache: Optional[Dict[str, str]] = None
 
 def _client():
     global _httpx_client
     if _httpx_client is None:
         import httpx
-        _httpx_client = httpx.AsyncClient(timeout=10)
+        http2 = CHANNELTALK_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401  (httpx[http2])
+            except ImportError:
+                log.warning("CHANNELTALK_HTTP2 set but 'h2' is not installed; using HTTP/1.1")
+                http2 = False
+        _httpx_client = httpx.AsyncClient(
+            transport=_transport,
+            http2=http2,
+            timeout=httpx.Timeout(CHANNELTALK_TIMEOUT, connect=CHANNELTALK_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=CHANNELTALK_MAX_CONNECTIONS,
+                max_keepalive_connections=CHANNELTALK_MAX_KEEPALIVE,
+                keepalive_expiry=CHANNELTALK_KEEPALIVE_SECS,
+            ),
+        )
     return _httpx_client
 
+async def close_client() -> None:
+    global _httpx_client
+    await _coalescer.drain()
+    if _httpx_client is not None:
+        await _httpx_client.aclose()
+        _httpx_client = None
+
+async def use_transport(transport) -> None:
+    """
+    부하 측정/로컬 실행용: 실제 네트워크 대신 주어진 httpx transport 사용 (None 이면 기본).
+    기존 클라이언트는 닫고 다음 호출에서 다시 만든다.
+    """
+    global _transport
+    await close_client()
+    _transport = transport
+
 def _auth_headers() -> Dict[str, str]:
-    """Open API v5 인증: x-access-key / x-access-secret"""
-    key = os.getenv("CHANNELTALK_ACCESS_KEY")
-    sec = os.getenv("CHANNELTALK_ACCESS_SECRET")
-    if not key or not sec:
-        raise RuntimeError("Set CHANNELTALK_ACCESS_KEY & CHANNELTALK_ACCESS_SECRET")
-    return {
-        "Content-Type": "application/json",
-        "x-access-key": key,
-        "x-access-secret": sec,
-    }
+    """Open API v5 인증: x-access-key / x-access-secret (최초 1회 생성 후 재사용)"""
+    global _auth_cache
+    if _auth_cache is None:
+        key = os.getenv("CHANNELTALK_ACCESS_KEY")
+        sec = os.getenv("CHANNELTALK_ACCESS_SECRET")
+        if not key or not sec:
+            raise RuntimeError("Set CHANNELTALK_ACCESS_KEY & CHANNELTALK_ACCESS_SECRET")
+        _auth_cache = {
+            "Content-Type": "application/json",
+            "x-access-key": key,
+            "x-access-secret": sec,
+        }
+    return _auth_cache
+
+def reset_auth_cache() -> None:
+    """키 교체 후 호출"""
+    global _auth_cache
+    _auth_cache = None
+
+
+class TokenBucket:
+    """
+    프로세스 공유 토큰 버킷. acquire()는 토큰이 생길 때까지 대기한다.
+    429 수신 시 pause_until()로 모든 호출을 Retry-After 까지 멈춘다.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.capacity = max(1.0, burst)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> float:
+        """대기한 시간(초) 반환"""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            now = time.monotonic()
+            if now < self.paused_until:
+                delay = self.paused_until - now
+            else:
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def pause_until(self, deadline: float) -> None:
+        self.paused_until = max(self.paused_until, deadline)
+
+
+class CircuitBreaker:
+    """
+    연속 실패(5xx/네트워크 오류)가 threshold 에 닿으면 cooldown 동안 호출 차단(open).
+    cooldown 후 한 건만 시험 호출(half-open), 성공하면 closed 로 복귀.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        st = self.state
+        if st == "closed":
+            return True
+        if st == "half_open" and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.probing or self.failures >= self.threshold:
+            if self.opened_at is None or self.probing:
+                log.warning("channeltalk circuit open (failures=%d)", self.failures)
+            self.opened_at = time.monotonic()
+        self.probing = False
+
+
+rate_limiter = TokenBucket(CHANNELTALK_RATE_PER_SEC, CHANNELTALK_RATE_BURST)
+breaker = CircuitBreaker(CHANNELTALK_CB_FAILURES, CHANNELTALK_CB_COOLDOWN)
+
+
+def _retry_after(resp) -> Optional[float]:
+    """Retry-After: 초 또는 HTTP-date"""
+    v = resp.headers.get("Retry-After")
+    if not v:
+        return None
+    try:
+        return max(0.0, float(v))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(v).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def _backoff(attempt: int) -> float:
+    """full jitter: U(0, min(cap, base * 2^attempt))"""
+    return random.uniform(0, min(CHANNELTALK_BACKOFF_CAP, CHANNELTALK_BACKOFF_BASE * (2 ** attempt)))
+
 
 async def send_message_to_userchat(
     user_chat_id: str,
     text: str,
     *,
     bot_name: Optional[str] = None,
-    plain: bool = True
+    plain: bool = True,
+    coalesce: Optional[bool] = None,
+    retries: Optional[int] = None,
 ):
+    """
+    coalesce=None 이면 CHANNELTALK_COALESCE_MS > 0 일 때 병합 사용.
+    병합 시 창 안에 모인 응답들이 blocks 여러 문단으로 한 번에 전송되고, 모두 같은 결과를 받는다.
+    retries: 재시도 횟수 (None = CHANNELTALK_MAX_RETRIES). 지정하면 병합하지 않는다
+    """
     if not user_chat_id:
         return {"ok": False, "reason": "no_user_chat_id"}
 
+    if coalesce is None:
+        coalesce = CHANNELTALK_COALESCE_MS > 0 and retries is None
+    if coalesce:
+        return await _coalescer.submit(user_chat_id, text, bot_name, plain)
+
+    body = {"plainText": text} if plain else {"blocks": [{"type": "text", "value": text}]}
+    return await _post_message(user_chat_id, body, bot_name=bot_name, retries=retries)
+
+
+class _Batch:
+    __slots__ = ("texts", "futures", "timer", "plain")
+
+    def __init__(self, plain: bool = True):
+        self.plain = plain
+        self.texts: List[str] = []
+        self.futures: List["asyncio.Future[Any]"] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class ReplyCoalescer:
+    """
+    user_chat_id 별로 window 초 동안 응답을 모아 하나의 메시지로 전송.
+    - 마감은 첫 응답 도착 + window: 단건도 window 이상 기다리지 않는다
+    - max_items 가 차면 즉시 전송
+    - 같은 채팅의 배치는 채팅별 락으로 순서대로 전송된다
+    - plain 이 다른 응답이 오면 모으던 배치를 먼저 보내고 새 배치를 시작 (plainText 와 blocks 를 섞지 않는다)
+    """
+
+    def __init__(self, window: float, max_items: int):
+        self.window = window
+        self.max_items = max(1, max_items)
+        self._batches: Dict[Tuple[str, Optional[str]], _Batch] = {}
+        self._locks: Dict[str, List[Any]] = {}   # user_chat_id -> [lock, 대기 배치 수]
+        self._tasks: set = set()
+        self.stats = {"messages": 0, "sends": 0}
+
+    async def submit(self, user_chat_id: str, text: str, bot_name: Optional[str], plain: bool = True):
+        key = (user_chat_id, bot_name)
+        loop = asyncio.get_running_loop()
+        batch = self._batches.get(key)
+        if batch is not None and batch.plain != plain:
+            batch.timer.cancel()
+            self._flush_soon(key, batch)
+            batch = None
+        if batch is None:
+            batch = self._batches[key] = _Batch(plain)
+            batch.timer = loop.call_later(self.window, self._flush_soon, key, batch)
+
+        fut = loop.create_future()
+        batch.texts.append(text)
+        batch.futures.append(fut)
+        self.stats["messages"] += 1
+        if len(batch.texts) >= self.max_items:
+            batch.timer.cancel()
+            self._flush_soon(key, batch)
+        return await fut
+
+    def _flush_soon(self, key, batch: _Batch) -> None:
+        if self._batches.get(key) is batch:
+            del self._batches[key]
+            # 락 대기 순서 = 배치 마감 순서
+            task = asyncio.get_running_loop().create_task(self._send(key, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, key, batch: _Batch) -> None:
+        user_chat_id, bot_name = key
+        entry = self._locks.setdefault(user_chat_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        lock = entry[0]
+        async with lock:
+            try:
+                if len(batch.texts) == 1 and batch.plain:
+                    body = {"plainText": batch.texts[0]}
+                else:
+                    body = {"blocks": [{"type": "text", "value": t} for t in batch.texts]}
+                self.stats["sends"] += 1
+                result = await _post_message(user_chat_id, body, bot_name=bot_name)
+            except Exception as e:
+                for f in batch.futures:
+                    if not f.done():
+                        f.set_exception(e)
+            else:
+                for f in batch.futures:
+                    if not f.done():
+                        f.set_result(result)
+        entry[1] -= 1
+        if entry[1] == 0:
+            self._locks.pop(user_chat_id, None)
+
+    def pending(self) -> int:
+        return sum(len(b.texts) for b in self._batches.values())
+
+    async def drain(self) -> None:
+        """창을 기다리지 않고 모든 배치 즉시 전송 (종료 시)"""
+        for key, batch in list(self._batches.items()):
+            batch.timer.cancel()
+            self._flush_soon(key, batch)
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+
+_coalescer = ReplyCoalescer(CHANNELTALK_COALESCE_MS / 1000, CHANNELTALK_COALESCE_MAX)
+
+
+# ===== 메트릭 =====
+_in_flight = 0
+
+
+def _pool_connections() -> Optional[Dict[tuple, int]]:
+    """httpx(httpcore) 풀의 커넥션 수 — 비공개 속성이라 없으면 생략"""
+    if _httpx_client is None:
+        return None
+    pool = getattr(getattr(_httpx_client, "_transport", None), "_pool", None)
+    conns = getattr(pool, "connections", None)
+    if conns is None:
+        return None
+    idle = sum(1 for c in conns if getattr(c, "is_idle", lambda: False)())
+    return {("idle",): idle, ("active",): len(conns) - idle}
+
+
+_BREAKER_STATES = ("closed", "half_open", "open")
+
+_REQUEST_SECONDS = metrics.Histogram(
+    "eventlive_channeltalk_request_seconds",
+    "ChannelTalk API round trip per HTTP attempt",
+)
+_RETRIES = metrics.Counter(
+    "eventlive_channeltalk_retries_total",
+    "ChannelTalk API retries by cause",
+    ("status",),
+)
+metrics.GaugeCallback("eventlive_channeltalk_in_flight", "ChannelTalk requests in flight", lambda: _in_flight)
+metrics.GaugeCallback(
+    "eventlive_channeltalk_pool_connections", "ChannelTalk HTTP pool connections",
+    _pool_connections, ("state",),
+)
+metrics.GaugeCallback(
+    "eventlive_channeltalk_breaker_state", "Circuit breaker state (1 = current)",
+    lambda: {(st,): int(breaker.state == st) for st in _BREAKER_STATES}, ("state",),
+)
+metrics.stats_gauge("eventlive_channeltalk_coalescer", "Reply coalescer counters", lambda: _coalescer.stats)
+
+
+async def _timed_post(url: str, **kw):
+    global _in_flight
+    _in_flight += 1
+    try:
+        with _REQUEST_SECONDS.time():
+            return await _client().post(url, **kw)
+    finally:
+        _in_flight -= 1
+
+
+async def _post_message(
+    user_chat_id: str,
+    body: Dict[str, Any],
+    *,
+    bot_name: Optional[str] = None,
+    retries: Optional[int] = None,
+):
+    import httpx
+
     params = {"botName": bot_name or CHANNELTALK_BOT_NAME}
     url = f"{CHANNELTALK_API_BASE}/user-chats/{user_chat_id}/messages"
-    body = {"plainText": text} if plain else {"blocks": [{"type": "text", "value": text}]}
     headers = _auth_headers()
+    deadline = time.monotonic() + CHANNELTALK_RETRY_BUDGET
+
+    max_retries = CHANNELTALK_MAX_RETRIES if retries is None else max(0, retries)
+
+    last_status, last_error = 502, "retry_exceeded"
+    for attempt in range(max_retries + 1):
+        probe = breaker.state == "half_open"
+        if not breaker.allow():
+            return {"ok": False, "status": 503, "error": "circuit_open"}
+        try:
+            await rate_limiter.acquire()
 
-    backoff = 0.5
-    for _ in range(5):
-        resp = await _client().post(url, params=params, headers=headers, json=body)
-        if resp.status_code < 400:
             try:
-                return resp.json()
-            except Exception:
-                return {"ok": True}
-        if resp.status_code in (429, 500, 502, 503, 504):
-            await asyncio.sleep(backoff)
-            backoff *= 2
-            continue
-        return {"ok": False, "status": resp.status_code, "error": resp.text}
-
-    return {"ok": False, "status": 502, "error": "retry_exceeded"}
+                resp = await _timed_post(url, params=params, headers=headers, json=body)
+            except httpx.TransportError as e:
+                breaker.record_failure()
+                last_status, last_error = 502, f"transport_error: {e!r}"
+                delay = _backoff(attempt)
+            else:
+                if resp.status_code < 400:
+                    breaker.record_success()
+                    try:
+                        return resp.json()
+                    except Exception:
+                        return {"ok": True}
+                if resp.status_code not in RETRY_STATUSES:
+                    # 4xx 는 요청 문제 → 재시도 없음, 브레이커 집계 제외
+                    breaker.record_success()
+                    return {"ok": False, "status": resp.status_code, "error": resp.text}
+
+                last_status, last_error = resp.status_code, "retry_exceeded"
+                ra = _retry_after(resp)
+                if resp.status_code == 429:
+                    # 쿼터 초과는 장애가 아님(서버는 응답 중): 브레이커 대신 버킷 전체를 멈춘다
+                    breaker.record_success()
+                    delay = ra if ra is not None else _backoff(attempt)
+                    delay += random.uniform(0, min(1.0, 0.1 * delay + 0.05))
+                    rate_limiter.pause_until(time.monotonic() + delay)
+                else:
+                    breaker.record_failure()
+                    delay = max(ra or 0.0, _backoff(attempt))
+        finally:
+            if probe and breaker.probing:
+                # 시험 호출이 결과를 남기지 못하고 끝남(취소/예상 밖 예외) → 실패로 기록해야 probing 이 풀린다
+                breaker.record_failure()
+
+        if attempt == max_retries or time.monotonic() + delay > deadline:
+            break
+        _RETRIES.inc(str(last_status) if last_error == "retry_exceeded" else "transport")
+        await asyncio.sleep(delay)
+
+    return {"ok": False, "status": last_status, "error": last_error}
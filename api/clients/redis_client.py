@@ -0,0 +1,35 @@
+# api/clients/redis_client.py
+import os
+from pathlib import Path
+from dotenv import load_dotenv
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+ENV_PATH = PROJECT_ROOT / ".env"
+load_dotenv(dotenv_path=ENV_PATH)
+
+REDIS_URL = os.getenv("REDIS_URL", "")
+
+_redis_client = None
+
+def get_redis():
+    """
+    공유 redis.asyncio 클라이언트. REDIS_URL 미설정이면 None (프로세스 로컬로만 동작)
+    """
+    global _redis_client
+    if not REDIS_URL:
+        return None
+    if _redis_client is None:
+        import redis.asyncio as aioredis
+        _redis_client = aioredis.from_url(
+            REDIS_URL,
+            socket_timeout=float(os.getenv("REDIS_TIMEOUT", "0.5")),
+            socket_connect_timeout=float(os.getenv("REDIS_TIMEOUT", "0.5")),
+            health_check_interval=30,
+        )
+    return _redis_client
+
+async def close_redis() -> None:
+    global _redis_client
+    if _redis_client is not None:
+        await _redis_client.aclose()
+        _redis_client = None
@@ -0,0 +1,134 @@
+# api/db/chatlog_writer.py
+import os, time, asyncio, logging
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert
+
+from .models import ChatLog
+from .session import get_session
+from api.services import metrics
+
+# write-behind 기본값 (call site에서 defer=True/False로 개별 지정 가능)
+CHATLOG_WRITE_BEHIND = os.getenv("CHATLOG_WRITE_BEHIND", "false").lower() in ("1", "true", "yes", "y")
+CHATLOG_FLUSH_MS     = int(os.getenv("CHATLOG_FLUSH_MS", "200"))
+CHATLOG_BATCH_SIZE   = int(os.getenv("CHATLOG_BATCH_SIZE", "100"))
+CHATLOG_BUFFER_MAX   = int(os.getenv("CHATLOG_BUFFER_MAX", "5000"))
+
+log = logging.getLogger(__name__)
+
+
+class ChatLogWriter:
+    """
+    ChatLog 행을 프로세스 내 버퍼에 모았다가 flush_ms 마다 또는 batch_size 개가 차면
+    multi-row INSERT 한 번으로 저장한다.
+
+    - 버퍼는 max_buffer 로 제한. 가득 차면 enqueue가 flush 완료까지 대기(backpressure)
+    - flush 실패 시 행을 버퍼 앞에 되돌리고, 한도를 넘는 분량은 버리고 dropped 로 센다
+    - 서버리스에서는 응답 후 인스턴스가 멈출 수 있으므로 shutdown 훅에서 close() 필수
+    """
+
+    def __init__(self, flush_ms: int, batch_size: int, max_buffer: int):
+        self.flush_interval = flush_ms / 1000
+        self.batch_size = max(1, batch_size)
+        self.max_buffer = max(self.batch_size, max_buffer)
+        self._buf: List[Dict[str, str]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        self.stats = {
+            "enqueued": 0,
+            "flushed_rows": 0,
+            "flushes": 0,
+            "flush_errors": 0,
+            "dropped": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+        }
+
+    def pending(self) -> int:
+        return len(self._buf)
+
+    def _ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def enqueue(self, user_id: str, role: str, message: str) -> None:
+        if self._closed:
+            raise RuntimeError("ChatLogWriter is closed")
+        self._ensure_started()
+        while len(self._buf) >= self.max_buffer:
+            await self.flush()
+        self._buf.append({"channel_user_id": user_id, "role": role, "message": message})
+        self.stats["enqueued"] += 1
+        if len(self._buf) >= self.batch_size:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                # flush()가 이미 로깅/재적재함. 루프는 계속
+                pass
+
+    async def flush(self) -> int:
+        """버퍼 전체를 batch_size 단위 multi-row INSERT로 저장. 저장한 행 수 반환"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        written = 0
+        async with self._flush_lock:
+            while self._buf:
+                batch = self._buf[: self.batch_size]
+                del self._buf[: len(batch)]
+                t0 = time.perf_counter()
+                try:
+                    async with get_session() as s:
+                        await s.execute(insert(ChatLog).values(batch))
+                        await s.commit()
+                except Exception:
+                    self.stats["flush_errors"] += 1
+                    log.exception("chatlog flush failed rows=%d", len(batch))
+                    self._buf[:0] = batch
+                    overflow = len(self._buf) - self.max_buffer
+                    if overflow > 0:
+                        del self._buf[-overflow:]
+                        self.stats["dropped"] += overflow
+                    raise
+                ms = (time.perf_counter() - t0) * 1000
+                st = self.stats
+                st["flushes"] += 1
+                st["flushed_rows"] += len(batch)
+                st["last_flush_ms"] = ms
+                st["total_flush_ms"] += ms
+                st["max_flush_ms"] = max(st["max_flush_ms"], ms)
+                written += len(batch)
+        return written
+
+    async def close(self) -> None:
+        """남은 행을 모두 flush 하고 백그라운드 태스크 종료"""
+        self._closed = True
+        if self._task is not None:
+            self._wakeup.set()
+            try:
+                await self._task
+            except Exception:
+                pass
+            self._task = None
+        if self._buf:
+            await self.flush()
+        self._closed = False
+
+
+writer = ChatLogWriter(CHATLOG_FLUSH_MS, CHATLOG_BATCH_SIZE, CHATLOG_BUFFER_MAX)
+
+metrics.stats_gauge("eventlive_chatlog_writer", "Chat log write-behind counters", lambda: writer.stats)
+metrics.GaugeCallback("eventlive_chatlog_writer_pending", "Chat log rows waiting for flush", writer.pending)
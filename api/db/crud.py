@@ -1,54 +1,112 @@
 # api/db/crud.py
-from typing import Optional, List
-from sqlalchemy import select, desc
+import os, base64
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, List, Tuple
+from sqlalchemy import select, desc, func, and_, or_, literal, String
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .models import ChannelUser, ChatLog
+from .models import ChannelUser, ChatLog, Outbox
+from . import chatlog_writer
 
-__all__ = ["upsert_user", "add_inquery", "get_recent_inqueries"]
+__all__ = [
+    "upsert_user_native",
+    "add_chat_log",
+    "add_inquery",
+    "record_message",
+    "record_message_with_reply",
+    "get_recent_inqueries",
+    "get_history_page",
+    "encode_cursor",
+    "decode_cursor",
+]
 
+# 최근 upsert한 사용자 이름 (프로세스 로컬). 같은 이름이면 upsert 생략
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+_known_users: "OrderedDict[str, Optional[str]]" = OrderedDict()
 
-async def upsert_user(
+
+def _user_is_current(user_id: str, name: Optional[str]) -> bool:
+    if user_id not in _known_users:
+        return False
+    _known_users.move_to_end(user_id)
+    return name is None or _known_users[user_id] == name
+
+
+def _remember_user(user_id: str, name: Optional[str]) -> None:
+    if name is not None or user_id not in _known_users:
+        _known_users[user_id] = name
+    _known_users.move_to_end(user_id)
+    while len(_known_users) > USER_CACHE_SIZE:
+        _known_users.popitem(last=False)
+
+
+def _user_upsert_stmt(session: AsyncSession, user_id: str, name: Optional[str]):
+    """
+    방언별 단일 구문 upsert. name이 None이면 기존 이름 유지
+    """
+    dialect = session.bind.dialect.name if session.bind is not None else "mysql"
+    if dialect == "sqlite":
+        from sqlalchemy.dialects import sqlite
+        stmt = sqlite.insert(ChannelUser).values(channel_user_id=user_id, name=name)
+        return stmt.on_conflict_do_update(
+            index_elements=[ChannelUser.channel_user_id],
+            set_={"name": func.coalesce(stmt.excluded.name, ChannelUser.name)},
+        )
+    from sqlalchemy.dialects import mysql  # 방언 모듈은 첫 upsert 때 로드 (콜드 스타트)
+    stmt = mysql.insert(ChannelUser).values(channel_user_id=user_id, name=name)
+    return stmt.on_duplicate_key_update(
+        name=func.coalesce(stmt.inserted.name, ChannelUser.name),
+    )
+
+
+async def upsert_user_native(
     session: AsyncSession,
     user_id: str,                 # == ChannelUser.channel_user_id
     name: Optional[str] = None,
-) -> ChannelUser:
+    *,
+    commit: bool = True,
+) -> bool:
     """
-    channel_user_id 기준으로 ChannelUser 생성/갱신 (비동기)
+    INSERT ... ON DUPLICATE KEY UPDATE 한 번으로 ChannelUser 생성/갱신.
+    프로세스 캐시상 이름이 그대로면 DB를 건드리지 않고 False 반환
     """
+    if _user_is_current(user_id, name):
+        return False
     try:
-        stmt = select(ChannelUser).where(ChannelUser.channel_user_id == user_id)
-        res = await session.execute(stmt)
-        user = res.scalar_one_or_none()
-
-        if user is None:
-            user = ChannelUser(channel_user_id=user_id, name=name)
-            session.add(user)
-        else:
-            if name is not None:
-                user.name = name
-
-        await session.commit()
-        await session.refresh(user)
-        return user
+        await session.execute(_user_upsert_stmt(session, user_id, name))
+        if commit:
+            await session.commit()
+            _remember_user(user_id, name)
+        return True
     except SQLAlchemyError:
         await session.rollback()
         raise
 
 
-async def add_inquery(
+async def add_chat_log(
     session: AsyncSession,
     user_id: str,                 # == ChatLog.channel_user_id
+    role: str,                    # 'user' | 'bot'
     content: str,
-) -> int:
+    *,
+    defer: Optional[bool] = None,
+) -> Optional[int]:
     """
-    사용자 문의를 ChatLog에 저장 (role='user')
+    ChatLog 1건 저장.
+    defer=True(또는 None + CHATLOG_WRITE_BEHIND)면 write-behind 버퍼에 넣고 None 반환
     """
+    if defer is None:
+        defer = chatlog_writer.CHATLOG_WRITE_BEHIND
+    if defer:
+        await chatlog_writer.writer.enqueue(user_id, role, content)
+        return None
+
     try:
         log = ChatLog(
             channel_user_id=user_id,
-            role="user",
+            role=role,
             message=content,
         )
         session.add(log)
@@ -60,6 +118,92 @@ async def add_inquery(
         raise
 
 
+async def add_inquery(
+    session: AsyncSession,
+    user_id: str,                 # == ChatLog.channel_user_id
+    content: str,
+    *,
+    defer: Optional[bool] = None,
+) -> Optional[int]:
+    """
+    사용자 문의를 ChatLog에 저장 (role='user')
+    """
+    return await add_chat_log(session, user_id, "user", content, defer=defer)
+
+
+async def record_message(
+    session: AsyncSession,
+    user_id: str,
+    name: Optional[str],
+    role: str,                    # 'user' | 'bot'
+    content: str,
+    *,
+    defer: Optional[bool] = None,
+) -> Optional[int]:
+    """
+    웹훅 1건 = 트랜잭션 1건: 사용자 upsert(캐시 히트면 생략) + ChatLog insert + commit 1회.
+    id는 flush 시 INSERT 결과로 채워지므로 REFRESH 없이 반환. defer 시 None
+    """
+    if defer is None:
+        defer = chatlog_writer.CHATLOG_WRITE_BEHIND
+    try:
+        wrote_user = await upsert_user_native(session, user_id, name, commit=False)
+        log_id = None
+        if not defer:
+            log = ChatLog(channel_user_id=user_id, role=role, message=content)
+            session.add(log)
+            await session.flush()
+            log_id = log.id
+        if wrote_user or not defer:
+            await session.commit()
+        if wrote_user:
+            _remember_user(user_id, name)
+    except SQLAlchemyError:
+        await session.rollback()
+        raise
+
+    if defer:
+        await chatlog_writer.writer.enqueue(user_id, role, content)
+    return log_id
+
+
+async def record_message_with_reply(
+    session: AsyncSession,
+    user_id: str,
+    name: Optional[str],
+    content: str,
+    user_chat_id: str,
+    reply: str,
+    *,
+    next_attempt_at=None,
+) -> Tuple[Optional[int], int]:
+    """
+    사용자 메시지 ChatLog + 보낼 응답 Outbox 를 한 트랜잭션으로 (응답이 기록 없이 사라지지 않도록).
+    write-behind 모드면 ChatLog 는 버퍼로 가고 Outbox(+사용자 upsert)만 커밋. (log_id, outbox_id) 반환.
+    next_attempt_at 은 DB 시각 식(outbox.claimed_until()) — 없으면 DB 의 지금
+    """
+    defer = chatlog_writer.CHATLOG_WRITE_BEHIND
+    try:
+        wrote_user = await upsert_user_native(session, user_id, name, commit=False)
+        log = None
+        if not defer:
+            log = ChatLog(channel_user_id=user_id, role="user", message=content)
+            session.add(log)
+        ob = Outbox(user_chat_id=user_chat_id, message=reply, next_attempt_at=func.now() if next_attempt_at is None else next_attempt_at)
+        session.add(ob)
+        await session.flush()
+        await session.commit()
+        if wrote_user:
+            _remember_user(user_id, name)
+    except SQLAlchemyError:
+        await session.rollback()
+        raise
+
+    if defer:
+        await chatlog_writer.writer.enqueue(user_id, "user", content)
+    return (log.id if log is not None else None), ob.id
+
+
 async def get_recent_inqueries(
     session: AsyncSession,
     user_id: str,
@@ -68,13 +212,69 @@ async def get_recent_inqueries(
     """
     해당 사용자의 최근 사용자 메시지(=inquery) 반환
     """
+    rows, _ = await get_history_page(session, user_id, role="user", limit=limit)
+    return rows
+
+
+# ===== keyset 페이지네이션 =====
+def encode_cursor(row: ChatLog) -> str:
+    """마지막 행의 (created_at, id) → 불투명 커서"""
+    raw = f"{row.created_at.isoformat()}|{row.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _cursor_ts(session: AsyncSession, ts: datetime):
+    """
+    커서 시각을 DB 에 저장된 형식 그대로 바인딩.
+    SQLite 는 created_at(CURRENT_TIMESTAMP)을 'YYYY-MM-DD HH:MM:SS' 문자열로 두는데 datetime 을 바인딩하면
+    '.000000' 이 붙어 같은 초 비교가 어긋난다 (첫 페이지가 반복됨)
+    """
+    if session.get_bind().dialect.name == "sqlite":
+        return literal(ts.strftime("%Y-%m-%d %H:%M:%S"), String())
+    return ts
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """encode_cursor 역변환. 형식이 틀리면 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, _, pk = raw.rpartition("|")
+        return datetime.fromisoformat(ts), int(pk)
+    except Exception as e:
+        raise ValueError(f"invalid cursor: {cursor!r}") from e
+
+
+async def get_history_page(
+    session: AsyncSession,
+    user_id: str,
+    *,
+    role: Optional[str] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+) -> Tuple[List[ChatLog], Optional[str]]:
+    """
+    사용자 대화 이력 최신순 페이지 (rows, next_cursor). 마지막 페이지면 next_cursor=None
+    ix_chat_logs_user_role_created(role 지정) / ix_chat_logs_user_created(전체)를 (created_at, id) < 커서 범위로
+    타므로 깊이와 무관하게 O(limit)
+    """
+    conds = [ChatLog.channel_user_id == user_id]
+    if role is not None:
+        conds.append(ChatLog.role == role)
+    if cursor:
+        ts, pk = decode_cursor(cursor)
+        ts = _cursor_ts(session, ts)
+        conds.append(or_(
+            ChatLog.created_at < ts,
+            and_(ChatLog.created_at == ts, ChatLog.id < pk),
+        ))
     stmt = (
         select(ChatLog)
-        .where(ChatLog.channel_user_id == user_id)
-        .where(ChatLog.role == "user")
-        .order_by(desc(ChatLog.created_at))
-        .limit(limit)
+        .where(*conds)
+        .order_by(desc(ChatLog.created_at), desc(ChatLog.id))
+        .limit(limit + 1)   # 한 건 더 읽어 다음 페이지 유무 판단
     )
-    res = await session.execute(stmt)
-    rows = res.scalars().all()
-    return list(rows)
+    rows = list((await session.execute(stmt)).scalars().all())
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
@@ -1,10 +1,56 @@
-import asyncio
-from api.db.session import engine
+# api/db/init_db.py
+"""
+스키마 초기화/보강 (배포 파이프라인에서 명시적으로 실행)
+  python -m api.db.init_db [--dry-run]
+- 없는 테이블 생성 (create_all)
+- 기존 테이블에 모델에 정의된 인덱스가 없으면 추가 — 큰 테이블에선 오래 걸릴 수 있어 앱 기동에서는 하지 않는다
+- point / message 컬럼 매핑(legacy reflection) 결과 출력
+"""
+import asyncio, argparse, logging
+
+from api.db.session import get_engine, get_session
 from api.db.models import Base
 
-async def main():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+log = logging.getLogger("api.db.init_db")
+
+
+def missing_indexes(sync_conn, metadata) -> list:
+    """create_all 은 기존 테이블에 새 인덱스를 붙이지 않으므로 따로 찾는다"""
+    from sqlalchemy import inspect
+    insp = inspect(sync_conn)
+    out = []
+    for table in metadata.sorted_tables:
+        if not insp.has_table(table.name):
+            continue
+        existing = {ix["name"] for ix in insp.get_indexes(table.name)}
+        out += [ix for ix in table.indexes if ix.name and ix.name not in existing]
+    return out
+
+
+def create_missing_indexes(sync_conn, metadata, dry_run: bool = False) -> list:
+    indexes = missing_indexes(sync_conn, metadata)
+    for ix in indexes:
+        log.info("%s index %s on %s", "would create" if dry_run else "creating", ix.name, ix.table.name)
+        if not dry_run:
+            ix.create(sync_conn)
+    return [ix.name for ix in indexes]
+
+
+async def main(dry_run: bool = False) -> None:
+    from api.db import legacy
+
+    async with get_engine().begin() as conn:
+        if not dry_run:
+            await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(create_missing_indexes, Base.metadata, dry_run)
+    async with get_session() as s:
+        for lt in await legacy.tables(s):
+            log.info("%s: %s", lt.table.name, ", ".join(f"{k}={c.name}" for k, c in lt.c.items()))
+
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    ap = argparse.ArgumentParser(description="create tables / missing indexes")
+    ap.add_argument("--dry-run", action="store_true", help="추가할 인덱스만 출력")
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    asyncio.run(main(args.dry_run))
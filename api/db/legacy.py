@@ -0,0 +1,68 @@
+# api/db/legacy.py
+"""
+기존 운영 테이블(point / message) 컬럼 매핑
+- 기존 코드는 select * 결과를 위치로만 읽었다 (point: r[3]=제목, r[4]=경도, r[5]=위도 / message: r[3]=본문).
+  이름이 확인된 컬럼은 WHERE/ORDER BY 에 쓰인 id, loc, pos_type, msg_type 뿐
+- 처음 쓸 때 한 번 reflection 해서 모델 속성 이름의 컬럼이 있으면 그것을, 없으면 기존 위치의 컬럼을 쓴다
+  (models.Point / Message 는 로컬 create_all 용 정의 — 운영 쿼리는 여기서 얻은 컬럼으로 만든다)
+"""
+import logging
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from sqlalchemy import Column, MetaData, Table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+log = logging.getLogger(__name__)
+
+# 속성 이름 → 이름이 없을 때 쓸 select * 위치 (None = 이름이 반드시 있어야 함)
+POINT_COLUMNS = {"id": None, "loc": None, "pos_type": None, "title": 3, "pos_long": 4, "pos_lati": 5}
+MESSAGE_COLUMNS = {"id": None, "loc": None, "msg_type": None, "content": 3}
+
+
+class LegacyTable(NamedTuple):
+    table: Table
+    c: Dict[str, Column]       # 속성 이름 → 실제 컬럼
+
+    def row(self, values: dict) -> dict:
+        """속성 이름 dict → 실제 컬럼 이름 dict (insert 용)"""
+        return {self.c[k].name: v for k, v in values.items()}
+
+
+_tables: Optional[Tuple[LegacyTable, LegacyTable]] = None
+
+
+def _resolve(table: Table, spec: Dict[str, Optional[int]]) -> LegacyTable:
+    cols = list(table.columns)
+    out: Dict[str, Column] = {}
+    for attr, pos in spec.items():
+        if attr in table.c:
+            out[attr] = table.c[attr]
+        elif pos is not None and pos < len(cols):
+            out[attr] = cols[pos]
+            log.info("%s.%s mapped to column %r (position %d)", table.name, attr, cols[pos].name, pos)
+        else:
+            raise RuntimeError(f"{table.name}: column for {attr!r} not found in {[c.name for c in cols]}")
+    return LegacyTable(table, out)
+
+
+def _reflect(sync_conn) -> Tuple[LegacyTable, LegacyTable]:
+    md = MetaData()
+    return (
+        _resolve(Table("point", md, autoload_with=sync_conn), POINT_COLUMNS),
+        _resolve(Table("message", md, autoload_with=sync_conn), MESSAGE_COLUMNS),
+    )
+
+
+async def tables(session: AsyncSession) -> Tuple[LegacyTable, LegacyTable]:
+    """(point, message) — 프로세스당 한 번 reflection"""
+    global _tables
+    if _tables is None:
+        conn = await session.connection()
+        _tables = await conn.run_sync(_reflect)
+    return _tables
+
+
+def reset() -> None:
+    """스키마를 바꾼 뒤 (테스트/스크립트) 다시 reflection 하도록"""
+    global _tables
+    _tables = None
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import String, Text, DateTime, func
+from sqlalchemy import String, Text, DateTime, Integer, Float, Boolean, Index, func
 
 
 class Base(DeclarativeBase):
@@ -21,12 +21,116 @@ class ChannelUser(Base):
 
 class ChatLog(Base):
     __tablename__ = "chat_logs"
+    __table_args__ = (
+        # 사용자별 이력 조회(role 필터 + 최신순 keyset) 가 filesort 없이 인덱스만 타도록
+        Index("ix_chat_logs_user_role_created", "channel_user_id", "role", "created_at", "id"),
+        # role 없이 조회할 때 (role 이 두 번째 컬럼이라 위 인덱스로는 정렬까지 못 탄다)
+        Index("ix_chat_logs_user_created", "channel_user_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     channel_user_id: Mapped[str] = mapped_column(String(64), index=True)
-    role: Mapped[str] = mapped_column(String(10))     # 'user' | 'bot'
+    role: Mapped[str] = mapped_column(String(10))     # 'user' | 'bot' | 'throttled'(유입 제한으로 미처리)
+    message: Mapped[str] = mapped_column(Text())
+    created_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
+
+
+class Outbox(Base):
+    """보낼 채널톡 응답. 사용자 ChatLog 와 같은 트랜잭션으로 저장, 전송 후 status='sent'"""
+    __tablename__ = "outbox"
+    __table_args__ = (
+        # dispatcher: status='pending' AND next_attempt_at <= now 순서대로
+        Index("ix_outbox_status_next", "status", "next_attempt_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    user_chat_id: Mapped[str] = mapped_column(String(64))
     message: Mapped[str] = mapped_column(Text())
+    status: Mapped[str] = mapped_column(String(10), default="pending", server_default="pending")  # 'pending' | 'sent' | 'dead'
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    next_attempt_at: Mapped[DateTime] = mapped_column(DateTime)
+    last_error: Mapped[str | None] = mapped_column(String(255), nullable=True)
     created_at: Mapped[DateTime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
     )
+    sent_at: Mapped[DateTime | None] = mapped_column(DateTime, nullable=True)
+
+
+class Festival(Base):
+    """route_reply 축제 정의 (이름/별칭 → point·message 의 loc)"""
+    __tablename__ = "festivals"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String(50), unique=True)
+    aliases: Mapped[str | None] = mapped_column(String(255), nullable=True)  # 쉼표 구분
+    loc: Mapped[int] = mapped_column(Integer)
+    user_long: Mapped[float | None] = mapped_column(Float, nullable=True)    # 임시 사용자 좌표
+    user_lati: Mapped[float | None] = mapped_column(Float, nullable=True)
+    enabled: Mapped[bool] = mapped_column(Boolean, default=True, server_default="1")
+
+
+class IntentKeyword(Base):
+    """route_reply 키워드 정의 (키워드 → 공지/좌표 조회)"""
+    __tablename__ = "intent_keywords"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    keyword: Mapped[str] = mapped_column(String(50), unique=True)
+    intent: Mapped[str] = mapped_column(String(10))   # 'notice' | 'point'
+    target: Mapped[str] = mapped_column(String(50))   # message.msg_type | point.pos_type
+    label: Mapped[str] = mapped_column(String(50))    # 응답 문구용 이름
+    enabled: Mapped[bool] = mapped_column(Boolean, default=True, server_default="1")
+
+
+class FaqEntry(Base):
+    """자동 답변 FAQ (큐레이션 Q/A + 답변 완료 문의에서 승격)"""
+    __tablename__ = "faq_entries"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    question: Mapped[str] = mapped_column(Text())
+    answer: Mapped[str] = mapped_column(Text())
+    source: Mapped[str] = mapped_column(String(10), default="curated", server_default="curated")  # 'curated' | 'inquiry'
+    enabled: Mapped[bool] = mapped_column(Boolean, default=True, server_default="1")
+    updated_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        index=True,
+    )
+
+
+class Point(Base):
+    """
+    지도 지점 (기존 운영 테이블, 컬럼 순서: id, loc, pos_type, title, pos_long, pos_lati).
+    title/pos_long/pos_lati 이름은 추정 — 운영 쿼리는 legacy.py 가 reflection 으로 정한 컬럼을 쓴다
+    """
+    __tablename__ = "point"
+    __table_args__ = (
+        Index("ix_point_loc_type", "loc", "pos_type"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    loc: Mapped[int] = mapped_column(Integer)
+    pos_type: Mapped[str] = mapped_column(String(50))     # toilet | stage | helpdesk | booth ...
+    title: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    pos_long: Mapped[float | None] = mapped_column(Float, nullable=True)
+    pos_lati: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+
+class Message(Base):
+    """
+    공지 (기존 운영 테이블, 컬럼 순서: id, loc, msg_type, content).
+    content 이름은 추정 — 운영 쿼리는 legacy.py 가 reflection 으로 정한 컬럼을 쓴다
+    """
+    __tablename__ = "message"
+    __table_args__ = (
+        Index("ix_message_loc_type", "loc", "msg_type"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    loc: Mapped[int] = mapped_column(Integer)
+    msg_type: Mapped[str] = mapped_column(String(50))     # '물품 공지' | '분실물 공지' ...
+    content: Mapped[str | None] = mapped_column(Text(), nullable=True)
@@ -0,0 +1,110 @@
+# api/db/partitions.py
+"""
+chat_logs 월 단위 RANGE 파티션 관리 (MySQL 전용)
+- MySQL 은 모든 유니크 키에 파티션 컬럼이 있어야 하므로 PK 를 (id, created_at) 로 바꾼다
+  (ORM 매핑은 id 단일 PK 그대로 — id 는 AUTO_INCREMENT 라 여전히 유일)
+- 파티션 이름 pYYYYMM = 해당 월 행, pmax = 그 이후 전부
+"""
+from datetime import date
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import text
+
+TABLE = "chat_logs"
+
+
+class PartitionInfo(NamedTuple):
+    name: str
+    bound: Optional[str]   # VALUES LESS THAN 값 (pmax 는 None)
+    rows: int               # information_schema 추정치
+
+
+def month_start(d: date) -> date:
+    return date(d.year, d.month, 1)
+
+
+def add_months(d: date, n: int) -> date:
+    y, m = divmod(d.month - 1 + n, 12)
+    return date(d.year + y, m + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"p{month.year:04d}{month.month:02d}"
+
+
+def month_of(name: str) -> Optional[date]:
+    if len(name) == 7 and name.startswith("p") and name[1:].isdigit():
+        return date(int(name[1:5]), int(name[5:7]), 1)
+    return None
+
+
+def _partition_def(month: date) -> str:
+    return f"PARTITION {partition_name(month)} VALUES LESS THAN ('{add_months(month, 1).isoformat()}')"
+
+
+def migration_sql(first_month: date, months_ahead: int = 2) -> List[str]:
+    """
+    기존(비파티션) chat_logs → 월 파티션 전환 DDL.
+    first_month 이전 행은 첫 파티션에 함께 들어간다. 큰 테이블은 점검 시간에 실행
+    """
+    today = month_start(date.today())
+    months = []
+    m = month_start(first_month)
+    while m <= add_months(today, months_ahead):
+        months.append(m)
+        m = add_months(m, 1)
+    parts = ",\n  ".join([_partition_def(m) for m in months] + ["PARTITION pmax VALUES LESS THAN (MAXVALUE)"])
+    return [
+        f"ALTER TABLE {TABLE} MODIFY created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP",
+        f"ALTER TABLE {TABLE} DROP PRIMARY KEY, ADD PRIMARY KEY (id, created_at)",
+        f"ALTER TABLE {TABLE} PARTITION BY RANGE COLUMNS(created_at) (\n  {parts}\n)",
+    ]
+
+
+def is_supported(conn) -> bool:
+    return conn.dialect.name == "mysql"
+
+
+async def list_partitions(conn) -> List[PartitionInfo]:
+    """파티션 목록 (비파티션 테이블이거나 MySQL 이 아니면 빈 목록)"""
+    if not is_supported(conn):
+        return []
+    rows = (await conn.execute(text(
+        "SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :t AND PARTITION_NAME IS NOT NULL "
+        "ORDER BY PARTITION_ORDINAL_POSITION"
+    ), {"t": TABLE})).all()
+    return [
+        PartitionInfo(r[0], None if (r[1] or "").upper() == "MAXVALUE" else (r[1] or "").strip("'"), int(r[2] or 0))
+        for r in rows
+    ]
+
+
+async def ensure_future_partitions(conn, months_ahead: int = 2) -> List[str]:
+    """
+    pmax 를 쪼개 이번 달 + months_ahead 개월 파티션을 미리 만든다 (REORGANIZE 는 pmax 가 비어 있으면 즉시).
+    만든 파티션 이름 반환
+    """
+    parts = await list_partitions(conn)
+    if not parts or parts[-1].name != "pmax":
+        return []
+    existing = {month_of(p.name) for p in parts if month_of(p.name)}
+    last = max(existing) if existing else add_months(month_start(date.today()), -1)
+    target = add_months(month_start(date.today()), months_ahead)
+    new = []
+    m = add_months(last, 1)
+    while m <= target:
+        if m not in existing:
+            new.append(m)
+        m = add_months(m, 1)
+    if not new:
+        return []
+    defs = ", ".join([_partition_def(m) for m in new] + ["PARTITION pmax VALUES LESS THAN (MAXVALUE)"])
+    await conn.execute(text(f"ALTER TABLE {TABLE} REORGANIZE PARTITION pmax INTO ({defs})"))
+    return [partition_name(m) for m in new]
+
+
+async def drop_partition(conn, name: str) -> None:
+    if month_of(name) is None:
+        raise ValueError(f"not a monthly partition: {name!r}")
+    await conn.execute(text(f"ALTER TABLE {TABLE} DROP PARTITION {name}"))
@@ -0,0 +1,132 @@
+# api/db/queries.py
+"""
+route_reply 조회 쿼리 (point / message)
+- 구문은 프로세스당 한 번 (첫 조회 때 legacy reflection 으로 컬럼을 정한 뒤) 만들고 값은 bindparam 으로만 넘긴다
+  → SQLAlchemy 컴파일 캐시 재사용, 드라이버/서버에서도 같은 SQL 텍스트
+- select * 대신 필요한 컬럼만
+"""
+import zlib
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import select, bindparam, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import legacy
+from .legacy import LegacyTable
+
+
+class PointRow(NamedTuple):
+    id: int
+    title: Optional[str]
+    lng: Optional[float]
+    lat: Optional[float]
+
+
+def _row_crc(*cols):
+    """MySQL: 행 내용 CRC32 (NULL 은 빈 문자열로 — CONCAT_WS 는 NULL 을 건너뛰어 자리가 밀린다)"""
+    return func.crc32(func.concat_ws("|", *(func.coalesce(c, "") for c in cols)))
+
+
+class _Statements(NamedTuple):
+    points: object
+    notice: object
+    point_versions_mysql: object
+    notice_versions_mysql: object
+    point_rows: object
+    notice_rows: object
+
+
+_stmts: Optional[Tuple[tuple, _Statements]] = None     # (reflection 결과, 구문) — legacy.reset() 뒤엔 다시 만든다
+
+
+def _build(point: LegacyTable, message: LegacyTable) -> _Statements:
+    p, m = point.c, message.c
+    return _Statements(
+        points=(
+            select(p["id"], p["title"], p["pos_long"], p["pos_lati"])
+            .where(p["loc"] == bindparam("loc"), p["pos_type"] == bindparam("pos_type"))
+        ),
+        notice=(
+            select(m["content"])
+            .where(m["loc"] == bindparam("loc"), m["msg_type"] == bindparam("msg_type"))
+            .order_by(m["id"])
+            .limit(1)
+        ),
+        # MySQL 은 서버에서 집계 (행 CRC32 합 — 순서 무관, 같은 길이의 수정도 잡힌다)
+        point_versions_mysql=(
+            select(
+                p["loc"], p["pos_type"],
+                func.count(), func.sum(_row_crc(p["id"], p["title"], p["pos_long"], p["pos_lati"])),
+            )
+            .group_by(p["loc"], p["pos_type"])
+        ),
+        notice_versions_mysql=(
+            select(
+                m["loc"], m["msg_type"],
+                func.count(), func.min(m["id"]), func.sum(_row_crc(m["id"], m["content"])),
+            )
+            .group_by(m["loc"], m["msg_type"])
+        ),
+        # 그 외(SQLite 등 CRC32 함수가 없는 DB)는 행을 읽어 파이썬에서 같은 방식으로
+        point_rows=select(p["loc"], p["pos_type"], p["id"], p["title"], p["pos_long"], p["pos_lati"]),
+        notice_rows=select(m["loc"], m["msg_type"], m["id"], m["content"]),
+    )
+
+
+async def _statements(session: AsyncSession) -> _Statements:
+    global _stmts
+    tables = await legacy.tables(session)
+    if _stmts is None or _stmts[0] is not tables:
+        _stmts = (tables, _build(*tables))
+    return _stmts[1]
+
+
+async def fetch_points(session: AsyncSession, loc: int, pos_type: str) -> List[PointRow]:
+    """(loc, pos_type) 지점 목록"""
+    st = await _statements(session)
+    res = await session.execute(st.points, {"loc": int(loc), "pos_type": pos_type})
+    return [PointRow(*r) for r in res.all()]
+
+
+async def fetch_notice(session: AsyncSession, loc: int, msg_type: str) -> Optional[str]:
+    """(loc, msg_type) 공지 본문 (id 가 가장 작은 것 — 기존 동작 유지)"""
+    st = await _statements(session)
+    res = await session.execute(st.notice, {"loc": int(loc), "msg_type": msg_type})
+    return res.scalar_one_or_none()
+
+
+def _crc(values) -> int:
+    return zlib.crc32("|".join("" if v is None else str(v) for v in values).encode("utf-8"))
+
+
+def _fp(values) -> str:
+    return "/".join(str(v) for v in values)
+
+
+async def partition_versions(session: AsyncSession) -> Dict[str, str]:
+    """
+    파티션별 데이터 지문 {"point:{loc}:{pos_type}" | "notice:{loc}:{msg_type}": 지문}
+    행 수 + 행 내용 CRC32 합 (notice 는 어떤 행이 첫 번째인지도 — fetch_notice 가 id 최소 행을 쓰므로)
+    """
+    st = await _statements(session)
+    out: Dict[str, str] = {}
+    if session.get_bind().dialect.name == "mysql":
+        for r in (await session.execute(st.point_versions_mysql)).all():
+            out[f"point:{int(r[0])}:{r[1]}"] = _fp(r[2:])
+        for r in (await session.execute(st.notice_versions_mysql)).all():
+            out[f"notice:{int(r[0])}:{r[1]}"] = _fp(r[2:])
+        return out
+
+    acc: Dict[str, list] = {}
+    for r in (await session.execute(st.point_rows)).all():
+        a = acc.setdefault(f"point:{int(r[0])}:{r[1]}", [0, 0])
+        a[0] += 1
+        a[1] += _crc(r[2:])
+    for r in (await session.execute(st.notice_rows)).all():
+        a = acc.setdefault(f"notice:{int(r[0])}:{r[1]}", [0, None, 0])
+        a[0] += 1
+        a[1] = r[2] if a[1] is None else min(a[1], r[2])
+        a[2] += _crc(r[2:])
+    for k, a in acc.items():
+        out[k] = _fp(a)
+    return out
@@ -1,18 +1,17 @@
-import os
-from typing import AsyncIterator
+import os, time, hashlib, tempfile, logging
+from pathlib import Path
+from typing import AsyncIterator, Optional
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
 
 from dotenv import load_dotenv
-from sqlalchemy.ext.asyncio import (
-    create_async_engine,
-    async_sessionmaker,
-    AsyncSession,
-)
 
 load_dotenv()
 
-# 우선순위: DB_URL > 조합형 환경변수
+# 우선순위: DB_URL > DB_BACKEND=sqlite(로컬/테스트) > 조합형 환경변수
 DB_URL = os.getenv("DB_URL")
+if not DB_URL and os.getenv("DB_BACKEND", "").lower() == "sqlite":
+    DB_URL = f"sqlite+aiosqlite:///{os.getenv('DB_SQLITE_PATH', './eventlive.db')}"
 if not DB_URL:
     DB_HOST = os.getenv("DB_HOST", "211.118.63.85")
     DB_NAME = os.getenv("DB_NAME", "channel")
@@ -20,38 +19,261 @@ if not DB_URL:
     DB_PASS = os.getenv("DB_PASS", "")
     DB_URL = f"mysql+asyncmy://{DB_USER}:{DB_PASS}@{DB_HOST}:3306/{DB_NAME}?charset=utf8mb4"
 
-engine = create_async_engine(
-    DB_URL,
-    pool_pre_ping=True,
-    pool_recycle=1800,
-    echo=False,   # 필요하면 True
-    future=True,
-)
-
-AsyncSessionLocal = async_sessionmaker(
-    bind=engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autoflush=False,
-)
+# 스키마 확인(create_all) 정책
+#   always : 매 기동마다 create_all (기존 동작, 로컬 기본값)
+#   cached : 모델 지문이 같으면 생략 (로컬 마커 파일 + REDIS_URL 있으면 Redis 공유, Vercel 기본값)
+#   skip   : 하지 않음 (배포 파이프라인에서 init_db 실행)
+DB_SCHEMA_CHECK   = os.getenv("DB_SCHEMA_CHECK", "cached" if os.getenv("VERCEL") else "always").lower()
+SCHEMA_MARKER_DIR = Path(os.getenv("SCHEMA_MARKER_DIR", tempfile.gettempdir()))
+
+# 커넥션 전략
+#   serverless : 인스턴스마다 풀을 들고 있으면 max_connections 고갈 → NullPool(기본) 또는 아주 작은 풀, pre-ping 없음
+#   server     : 상주 프로세스용 튜닝된 풀. pre-ping 대신 유휴 시간이 긴 커넥션만 교체
+#   (sqlite 는 모드와 무관하게 드라이버 기본 풀)
+DB_POOL_MODE         = os.getenv("DB_POOL_MODE", "serverless" if os.getenv("VERCEL") else "server").lower()
+DB_POOL_SIZE         = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW      = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT      = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+DB_POOL_RECYCLE      = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_IDLE_MAX     = float(os.getenv("DB_POOL_IDLE_MAX", "300"))   # MySQL wait_timeout 보다 짧게
+DB_SERVERLESS_POOL   = int(os.getenv("DB_SERVERLESS_POOL", "0"))      # 0 이면 NullPool
+DB_CONNECT_TIMEOUT   = int(os.getenv("DB_CONNECT_TIMEOUT", "3"))
+
+log = logging.getLogger(__name__)
+
+# 풀 이벤트 카운터 (/metrics, /admin/db/pool)
+pool_events = {"connects": 0, "checkouts": 0, "idle_recycled": 0}
+
+_engine = None
+_sessionmaker = None
+
+# 세션 트랜잭션이 시작된 시각 → 첫 체크아웃 이벤트에서 대기 시간으로 관측
+# (AsyncSession 의 greenlet 은 호출한 태스크와 같은 context 를 쓴다)
+_checkout_started: ContextVar[Optional[float]] = ContextVar("db_checkout_started", default=None)
+
+
+def get_engine():
+    """
+    엔진은 첫 사용 시 생성 (콜드 스타트에서 드라이버/풀 초기화를 요청 경로 밖으로)
+    """
+    global _engine
+    if _engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+        _engine = create_async_engine(
+            DB_URL,
+            echo=False,   # 필요하면 True
+            future=True,
+            **_engine_options(),
+        )
+        _install_pool_events(_engine)
+        log.info("db engine created (mode=%s, pool=%s)", pool_mode(), type(_engine.sync_engine.pool).__name__)
+    return _engine
+
+
+def pool_mode() -> str:
+    return "sqlite" if DB_URL.startswith("sqlite") else DB_POOL_MODE
+
+
+def _engine_options() -> dict:
+    mode = pool_mode()
+    if mode == "sqlite":
+        if ":memory:" in DB_URL or DB_URL.rstrip("/").endswith("sqlite+aiosqlite:"):
+            # 메모리 DB 는 커넥션마다 별개이므로 하나를 공유
+            from sqlalchemy.pool import StaticPool
+            return {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}}
+        return {"connect_args": {"timeout": 15}}
+
+    connect_args = {"connect_timeout": DB_CONNECT_TIMEOUT}
+    if mode == "serverless":
+        if DB_SERVERLESS_POOL <= 0:
+            from sqlalchemy.pool import NullPool
+            return {"poolclass": NullPool, "connect_args": connect_args}
+        return {
+            "pool_size": DB_SERVERLESS_POOL,
+            "max_overflow": 0,
+            "pool_timeout": DB_POOL_TIMEOUT,
+            "pool_recycle": DB_POOL_RECYCLE,
+            "connect_args": connect_args,
+        }
+    if mode != "server":
+        log.warning("unknown DB_POOL_MODE=%r, using server", mode)
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_use_lifo": True,   # 최근 쓴 커넥션 우선 → 남는 커넥션은 유휴로 밀려나 정리됨
+        "connect_args": connect_args,
+    }
+
+
+def _install_pool_events(engine) -> None:
+    """
+    pre-ping(체크아웃마다 왕복 1회) 대신 체크인 시각을 기록해 두고,
+    DB_POOL_IDLE_MAX 이상 놀던 커넥션만 체크아웃 시 폐기 → 풀이 새로 연결
+    """
+    from sqlalchemy import event, exc
+
+    target = engine.sync_engine
+    idle_check = pool_mode() != "sqlite"
+
+    @event.listens_for(target, "connect")
+    def _on_connect(dbapi_conn, record):
+        pool_events["connects"] += 1
+
+    @event.listens_for(target, "checkin")
+    def _on_checkin(dbapi_conn, record):
+        if record is not None:
+            record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(target, "checkout")
+    def _on_checkout(dbapi_conn, record, proxy):
+        pool_events["checkouts"] += 1
+        started = _checkout_started.get()
+        if started is not None:
+            _checkout_started.set(None)
+            _CHECKOUT_SECONDS.observe(time.perf_counter() - started)
+        idle_since = record.info.get("checked_in_at")
+        if idle_check and idle_since is not None and time.monotonic() - idle_since > DB_POOL_IDLE_MAX:
+            pool_events["idle_recycled"] += 1
+            record.info.pop("checked_in_at", None)
+            raise exc.DisconnectionError("connection idle too long")
+
+
+def get_sessionmaker():
+    global _sessionmaker
+    if _sessionmaker is None:
+        from sqlalchemy import event
+        from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+        from sqlalchemy.orm import Session
+
+        @event.listens_for(Session, "after_transaction_create")
+        def _on_begin(session, transaction):
+            # 바깥 트랜잭션마다 커넥션을 한 번 체크아웃한다 (커밋/롤백 때 반납)
+            if transaction.parent is None:
+                _checkout_started.set(time.perf_counter())
+
+        _sessionmaker = async_sessionmaker(
+            bind=get_engine(),
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autoflush=False,
+        )
+    return _sessionmaker
+
+
+def __getattr__(name: str):
+    # 기존 `from api.db.session import engine, AsyncSessionLocal` 호환
+    if name == "engine":
+        return get_engine()
+    if name == "AsyncSessionLocal":
+        return get_sessionmaker()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 @asynccontextmanager
-async def get_session() -> AsyncIterator[AsyncSession]:
+async def get_session() -> AsyncIterator["AsyncSession"]:
     """
-    FastAPI Depends에서 사용할 비동기 세션 컨텍스트 매니저
+    FastAPI Depends에서 사용할 비동기 세션 컨텍스트 매니저.
+    커넥션은 첫 쿼리 때 체크아웃 (캐시 히트·중복 이벤트는 DB 에 연결하지 않는다).
+    체크아웃 대기 시간은 풀 checkout 이벤트에서 관측
     """
-    async with AsyncSessionLocal() as session:
+    async with get_sessionmaker()() as session:
         try:
             yield session
         finally:
             await session.close()
 
+
+def pool_status() -> dict | None:
+    """풀 상태 (엔진 미생성이면 None). NullPool 은 크기 항목 없이 이벤트 카운터만"""
+    if _engine is None:
+        return None
+    pool = _engine.sync_engine.pool
+    out = dict(pool_events)
+    for key in ("size", "checkedin", "checkedout", "overflow"):
+        fn = getattr(pool, key, None)
+        if callable(fn):
+            try:
+                out[key] = fn()
+            except Exception:
+                pass
+    return out
+
+
+def _register_metrics():
+    from api.services import metrics
+    metrics.stats_gauge("eventlive_db_pool", "SQLAlchemy connection pool state", lambda: pool_status() or {})
+    return metrics.Histogram(
+        "eventlive_db_checkout_seconds",
+        "Time spent waiting for a pooled DB connection",
+        buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+    )
+
+
+_CHECKOUT_SECONDS = _register_metrics()
+
+
+def schema_fingerprint() -> str:
+    """모델 정의(테이블/컬럼/타입/인덱스) 지문"""
+    from api.db.models import Base
+    h = hashlib.sha1()
+    for t in sorted(Base.metadata.tables.values(), key=lambda t: t.name):
+        h.update(t.name.encode())
+        for c in t.columns:
+            h.update(f"|{c.name}:{c.type!r}:{c.nullable}:{c.primary_key}".encode())
+        for ix in sorted(t.indexes, key=lambda i: i.name or ""):
+            h.update(f"|ix:{ix.name}:{[c.name for c in ix.columns]}".encode())
+    h.update(DB_URL.rsplit("@", 1)[-1].encode())  # 대상 DB 가 바뀌면 다시 확인
+    return h.hexdigest()[:16]
+
+
+async def _schema_checked(fp: str) -> bool:
+    if (SCHEMA_MARKER_DIR / f"eventlive_schema_{fp}").exists():
+        return True
+    from api.clients.redis_client import get_redis
+    r = get_redis()
+    if r is None:
+        return False
+    try:
+        return bool(await r.exists(f"eventlive:schema:{fp}"))
+    except Exception:
+        return False
+
+
+async def _mark_schema_checked(fp: str) -> None:
+    try:
+        (SCHEMA_MARKER_DIR / f"eventlive_schema_{fp}").touch()
+    except OSError:
+        pass
+    from api.clients.redis_client import get_redis
+    r = get_redis()
+    if r is not None:
+        try:
+            await r.set(f"eventlive:schema:{fp}", "1", ex=7 * 24 * 3600)
+        except Exception:
+            pass
+
+
 # --- 앱 시작 시 1회 호출하여 테이블 생성 ---
-async def init_models() -> None:
+async def init_models(force: bool = False) -> None:
     """
-    models.Base 기준으로 테이블을 생성합니다.
-    Alembic 도입 전 임시 초기화 용도.
+    models.Base 기준으로 없는 테이블만 생성합니다.
+    Alembic 도입 전 임시 초기화 용도. DB_SCHEMA_CHECK 로 생략 가능(force=True 면 항상 실행).
+    기존 테이블에 인덱스를 붙이는 DDL 은 기동 경로에서 하지 않는다 → python -m api.db.init_db
     """
+    if not force and DB_SCHEMA_CHECK == "skip":
+        return
+    fp = None
+    if not force and DB_SCHEMA_CHECK == "cached":
+        fp = schema_fingerprint()
+        if await _schema_checked(fp):
+            log.info("schema check skipped (fingerprint %s)", fp)
+            return
+
     from api.db.models import Base  # 지연 임포트로 순환참조 방지
-    async with engine.begin() as conn:
+    async with get_engine().begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+
+    if fp is not None:
+        await _mark_schema_checked(fp)
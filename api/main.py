@@ -1,10 +1,25 @@
 # api/scripts/main.py
+import os, asyncio
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from api.routers.channel_webhook import router as channel_router
+from api.routers.admin import router as admin_router
 from api.db.session import init_models
+from api.clients.redis_client import close_redis
+from api.clients.channeltalk_client import close_client as close_channeltalk
+from api.db.chatlog_writer import writer as chatlog_writer
+from api.services.work_queue import queue as webhook_queue
+from api.services import metrics, logs, outbox
 
 
+# 라우터 import 보다 늦어도 무방 — 핸들러만 교체하므로 이미 만든 로거에도 적용된다
+logs.setup()
+
 app = FastAPI(title="EventLive API")
+app.add_middleware(logs.RequestIdMiddleware)
+
+_outbox_stop = asyncio.Event()
+_bg_tasks: list = []
 
 
 @app.on_event("startup")
@@ -13,13 +28,41 @@ async def on_startup():
     앱 시작 시 DB 모델 테이블 생성 (Alembic 도입 전 초기화용)
     """
     await init_models()
+    if outbox.OUTBOX_ENABLED and outbox.OUTBOX_DISPATCHER:
+        # 상주 프로세스 전용. 서버리스는 POST /admin/outbox/dispatch 를 cron 으로
+        _outbox_stop.clear()
+        _bg_tasks.append(asyncio.get_running_loop().create_task(outbox.run_forever(_outbox_stop)))
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    """
+    종료 시 웹훅 큐 drain → write-behind 버퍼 flush → 공유 클라이언트 정리 → 남은 로그 출력
+    """
+    await webhook_queue.drain(timeout=float(os.getenv("WEBHOOK_DRAIN_TIMEOUT", "8")))
+    _outbox_stop.set()
+    if _bg_tasks:
+        await asyncio.gather(*_bg_tasks, return_exceptions=True)
+        _bg_tasks.clear()
+    await chatlog_writer.close()
+    await outbox.close()
+    await close_channeltalk()
+    await close_redis()
+    logs.shutdown()
 
 
 # 라우터 등록
 app.include_router(channel_router)
+app.include_router(admin_router)
 
 
 # 헬스체크 (배포 환경 / 로드밸런서 체크용)
 @app.get("/health")
 async def health():
     return {"ok": True}
+
+
+# Prometheus 스크레이프 (text format 0.0.4)
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
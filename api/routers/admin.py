@@ -0,0 +1,214 @@
+# api/routers/admin.py
+import os, hmac
+from datetime import datetime
+from fastapi import APIRouter, Request, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
+from dotenv import load_dotenv
+
+from api.db.session import get_session, pool_mode, pool_status
+from api.db.crud import get_history_page
+from api.services import export, archive, cache, spatial_index, reply_table, intent_router, faq, outbox, event_stream
+from api.services.work_queue import queue as webhook_queue
+from api.services.dedup import dedup
+from api.services.rate_limit import limiter as rate_limiter
+
+load_dotenv()
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+# 비어 있으면 관리자 API 비활성 (503)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "") or ""
+HISTORY_PAGE_MAX = int(os.getenv("HISTORY_PAGE_MAX", "200"))
+
+
+def require_admin(request: Request) -> None:
+    """X-Admin-Token 헤더 또는 ?token= 으로 인증"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=503, detail="admin api disabled")
+    tok = request.headers.get("X-Admin-Token") or request.query_params.get("token") or ""
+    if not hmac.compare_digest(tok, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="unauthorized")
+
+
+@router.get("/history/{user_id}", dependencies=[Depends(require_admin)])
+async def user_history(
+    user_id: str,
+    role: str | None = Query(None, pattern="^(user|bot)$"),
+    limit: int = Query(50, ge=1),
+    cursor: str | None = None,
+):
+    """
+    사용자 대화 이력 (최신순 keyset 페이지). 응답의 next_cursor 를 그대로 넘기면 다음 페이지
+    """
+    limit = min(limit, HISTORY_PAGE_MAX)
+    try:
+        async with get_session() as s:
+            rows, next_cursor = await get_history_page(s, user_id, role=role, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "user_id": user_id,
+        "items": [
+            {
+                "id": r.id,
+                "role": r.role,
+                "message": r.message,
+                "created_at": r.created_at.isoformat() if r.created_at else None,
+            }
+            for r in rows
+        ],
+        "next_cursor": next_cursor,
+    }
+
+
+@router.get("/archive/chat_logs", dependencies=[Depends(require_admin)])
+async def archived_chat_logs(
+    user_id: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    role: str | None = Query(None, pattern="^(user|bot|throttled)$"),
+    limit: int = Query(100, ge=1),
+):
+    """
+    보관 파일(DB 에서 내려간 월) 조회. 파일 순차 스캔이므로 user_id/기간으로 좁혀서 사용
+    """
+    limit = min(limit, HISTORY_PAGE_MAX * 5)
+    items = []
+    async for row in archive.iter_archived(user_id=user_id, since=since, until=until, role=role):
+        items.append(row)
+        if len(items) > limit:
+            break
+    return {"items": items[:limit], "truncated": len(items) > limit}
+
+
+@router.get("/db/pool", dependencies=[Depends(require_admin)])
+async def db_pool():
+    return {"mode": pool_mode(), **(pool_status() or {})}
+
+
+@router.post("/reload", dependencies=[Depends(require_admin)])
+async def reload_data(request: Request):
+    """
+    point/message 변경 반영 (bulk_load --notify 가 호출).
+    body {"partitions": ["point:2:toilet", ...]} 가 없으면 전체 무효화 + 축제/키워드 정의 재로드
+    """
+    try:
+        body = await request.json()
+    except Exception:
+        body = {}
+    partitions = body.get("partitions") if isinstance(body, dict) else None
+    if partitions:
+        n = await reply_table.data_changed(partitions)
+        return {"ok": True, "partitions": n}
+
+    spatial_index.invalidate()
+    await cache.invalidate_prefix("point:")
+    await cache.invalidate_prefix("notice:")
+    reply_table.mark_stale()
+    await intent_router.refresh(force=True)
+    return {"ok": True, "partitions": "all"}
+
+
+@router.post("/faq", dependencies=[Depends(require_admin)])
+async def add_faq(request: Request):
+    """
+    FAQ 등록/수정. body {"question", "answer", "id"?, "source"?: "curated"|"inquiry", "enabled"?}
+    답변 완료된 문의는 source="inquiry" 로 승격. 이 인스턴스 색인에는 즉시, 다른 인스턴스는 FAQ_TTL 안에 반영
+    """
+    from api.db.models import FaqEntry
+
+    try:
+        body = await request.json()
+    except Exception:
+        raise HTTPException(status_code=400, detail="json body required")
+    question = (body.get("question") or "").strip() if isinstance(body, dict) else ""
+    answer = (body.get("answer") or "").strip() if isinstance(body, dict) else ""
+    if not question or not answer:
+        raise HTTPException(status_code=400, detail="question and answer required")
+    source = body.get("source") or "curated"
+    if source not in ("curated", "inquiry"):
+        raise HTTPException(status_code=400, detail="source must be curated|inquiry")
+    enabled = bool(body.get("enabled", True))
+
+    async with get_session() as s:
+        entry = await s.get(FaqEntry, int(body["id"])) if body.get("id") is not None else None
+        if entry is None:
+            entry = FaqEntry(question=question, answer=answer, source=source, enabled=enabled)
+            s.add(entry)
+        else:
+            entry.question, entry.answer, entry.source, entry.enabled = question, answer, source, enabled
+        await s.commit()
+        doc_id = entry.id
+
+    if enabled:
+        faq.upsert(doc_id, question, answer)
+    else:
+        faq.remove(doc_id)
+    return {"ok": True, "id": doc_id, "entries": len(faq.current())}
+
+
+@router.get("/faq/match", dependencies=[Depends(require_admin)])
+async def match_faq(q: str, k: int = Query(3, ge=1, le=20)):
+    """매칭 점검용: 상위 k 후보와 confidence (FAQ_MIN_CONFIDENCE 이상이면 자동 답변)"""
+    ix = await faq.refresh()
+    return {
+        "threshold": faq.FAQ_MIN_CONFIDENCE,
+        "items": [h._asdict() for h in ix.search(q, k)],
+    }
+
+
+@router.get("/outbox", dependencies=[Depends(require_admin)])
+async def outbox_status():
+    """상태별 건수(pending = backlog) + 가장 오래된 pending 나이"""
+    return {"enabled": outbox.OUTBOX_ENABLED, **(await outbox.status_counts()), "stats": outbox.stats}
+
+
+@router.post("/outbox/dispatch", dependencies=[Depends(require_admin)])
+async def outbox_dispatch(limit: int = Query(outbox.OUTBOX_BATCH, ge=1, le=1000)):
+    """기한이 된 pending 한 배치 전송 (서버리스 cron 용)"""
+    return await outbox.dispatch_once(limit=limit)
+
+
+# ===== 웹훅 처리 상태 (카운터는 /metrics 에도 있다) =====
+@router.get("/queue", dependencies=[Depends(require_admin)])
+async def queue_status():
+    from api.routers.channel_webhook import WEBHOOK_ASYNC
+    return {"async": WEBHOOK_ASYNC, "depth": webhook_queue.depth(), **webhook_queue.stats}
+
+
+@router.get("/dedup", dependencies=[Depends(require_admin)])
+async def dedup_status():
+    return {"size": len(dedup), **dedup.stats}
+
+
+@router.get("/stream", dependencies=[Depends(require_admin)])
+async def stream_status():
+    """샤드마다 Redis 조회가 한 번씩 든다"""
+    return {"enabled": event_stream.enabled(), "shards": await event_stream.stream_lag(), **event_stream.stats}
+
+
+@router.get("/ratelimit", dependencies=[Depends(require_admin)])
+async def ratelimit_status():
+    return {"keys": len(rate_limiter), **rate_limiter.stats}
+
+
+@router.get("/export/chat_logs", dependencies=[Depends(require_admin)])
+async def export_chat_logs(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    since: datetime | None = None,
+    until: datetime | None = None,
+    festival: str | None = None,
+    role: str | None = Query(None, pattern="^(user|bot)$"),
+):
+    """
+    chat_logs 를 gzip 압축 NDJSON/CSV 로 스트리밍 (since 이상, until 미만)
+    """
+    body = export.gzip_stream(
+        export.export_rows(format, since=since, until=until, festival=festival, role=role)
+    )
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return StreamingResponse(
+        body,
+        media_type="application/gzip",
+        headers={"Content-Disposition": f'attachment; filename="chat_logs-{stamp}.{format}.gz"'},
+    )
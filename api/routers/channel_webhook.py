@@ -1,26 +1,37 @@
 # api/routers/channel_webhook.py
-import os, json, hmac, hashlib, base64, logging
+import os, hmac, hashlib, base64, logging
 from fastapi import APIRouter, Request, HTTPException
 from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
 
 from api.clients.channeltalk_client import send_message_to_userchat
 from api.db.session import get_session
-from api.db.crud import upsert_user, add_inquery, get_recent_inqueries
-from api.db.models import ChatLog  # 봇 로그 저장에 사용
-
-# ==== 추가 ====
-from sqlalchemy import text as sa_text
-# ==============
+from api.db.crud import record_message, record_message_with_reply, get_recent_inqueries
+from api.db import queries
+from api.db.queries import PointRow
+from api.services import spatial_index, cache, intent_router, reply_table, faq
+from api.services.work_queue import queue as webhook_queue
+from api.services.dedup import dedup
+from api.services.rate_limit import limiter as rate_limiter, RATE_LIMIT_LOG
+from api.db.chatlog_writer import writer as chatlog_writer
+from api.services.webhook_event import parse_event
+from api.services import metrics
+from api.services.metrics import stage
+from api.services import logs, event_stream, outbox
 
 load_dotenv()
-logging.basicConfig(level=logging.INFO)
+
+log = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/channel", tags=["channel"])
 
 WEBHOOK_SIGNING_SECRET = os.getenv("CHANNELTALK_WEBHOOK_SECRET", "") or ""
 WEBHOOK_QUERY_TOKEN    = os.getenv("CHANNELTALK_WEBHOOK_TOKEN", "") or ""
 CHANNEL_DEBUG          = os.getenv("CHANNEL_DEBUG", "false").lower() in ("1", "true", "yes", "y")
+# true면 검증/파싱 후 즉시 200 응답, 실제 처리는 백그라운드 워커 큐에서 (상주 프로세스 전용)
+WEBHOOK_ASYNC          = os.getenv("WEBHOOK_ASYNC", "false").lower() in ("1", "true", "yes", "y")
+
+THROTTLED_REPLY = "메시지가 너무 많아요. 잠시 후 다시 보내 주세요 🙏"
 
 SIGNING_ENABLED = bool(WEBHOOK_SIGNING_SECRET)
 TOKEN_ENABLED   = bool(WEBHOOK_QUERY_TOKEN)
@@ -48,75 +59,7 @@ def is_verified(request: Request, raw: bytes) -> bool:
         or verify_query_token(request.query_params.get("token"))
 
 
-# ===== 추출 유틸 =====
-def extract_user_chat_id(payload: dict) -> str | None:
-    ent = payload.get("entity") or {}
-    if isinstance(ent, dict) and ent.get("chatId") is not None:
-        return str(ent["chatId"])
-
-    data = payload.get("data") or {}
-    for k in ("userChatId", "chatId"):
-        v = data.get(k)
-        if v is not None:
-            return str(v)
-
-    msgs = payload.get("messages")
-    if isinstance(msgs, list) and msgs and isinstance(msgs[0], dict):
-        cid = msgs[0].get("chatId")
-        if cid is not None:
-            return str(cid)
-
-    return None
-
-def extract_text(payload: dict) -> str:
-    ent = payload.get("entity") or {}
-    if isinstance(ent, dict):
-        t = (ent.get("plainText") or "").strip()
-        if t:
-            return t
-        blocks = ent.get("blocks") or []
-        if isinstance(blocks, list) and blocks and isinstance(blocks[0], dict):
-            if blocks[0].get("type") == "text":
-                t = (blocks[0].get("value") or "").strip()
-                if t:
-                    return t
-
-    msgs = payload.get("messages") or []
-    if isinstance(msgs, list) and msgs and isinstance(msgs[0], dict):
-        t = (msgs[0].get("plainText") or "").strip()
-        if t:
-            return t
-        blocks = msgs[0].get("blocks") or []
-        if isinstance(blocks, list) and blocks and isinstance(blocks[0], dict):
-            if blocks[0].get("type") == "text":
-                t = (blocks[0].get("value") or "").strip()
-                if t:
-                    return t
-
-    data = payload.get("data")
-    if isinstance(data, dict):
-        t = (data.get("plainText") or "").strip()
-        if t:
-            return t
-
-    return ""
-
-def extract_fullname(payload: dict) -> str | None:
-    refers = payload.get("refers") or {}
-    if isinstance(refers, dict):
-        u = refers.get("user") or {}
-        if isinstance(u, dict):
-            name = u.get("name")
-            return str(name) if name else None
-
-    ent = payload.get("entity") or {}
-    if isinstance(ent, dict):
-        name = ent.get("name")
-        if name:
-            return str(name)
-
-    return None
-
+# ===== 이름 유틸 (payload 추출은 webhook_event.parse_event) =====
 def split_name(fullname: str | None):
     if not fullname:
         return None, None
@@ -128,161 +71,153 @@ def combine_name(first: str | None, last: str | None) -> str | None:
         return f"{first} {last}"
     return first or last or None
 
-def classify_actor(payload: dict) -> str:
-    ent = payload.get("entity") or {}
-    if isinstance(ent, dict):
-        pt = ent.get("personType")
-        if pt in ("user", "bot"):
-            return pt
-
-    msgs = payload.get("messages")
-    if isinstance(msgs, list) and msgs:
-        pt = (msgs[0] or {}).get("personType")
-        if pt in ("user", "bot"):
-            return pt
-
-    refers = payload.get("refers") or {}
-    online = refers.get("online") or {}
-    if isinstance(online, dict):
-        pt = online.get("personType")
-        if pt in ("user", "bot"):
-            return pt
-
-    return "unknown"
-
-def extract_owner_id(payload: dict) -> str | None:
-    refers = payload.get("refers") or {}
-    if isinstance(refers, dict):
-        user_chat = refers.get("userChat") or {}
-        if isinstance(user_chat, dict) and user_chat.get("userId"):
-            return str(user_chat["userId"])
-        u = refers.get("user") or {}
-        if isinstance(u, dict) and u.get("id"):
-            return str(u["id"])
-        online = refers.get("online") or {}
-        if isinstance(online, dict) and online.get("personId"):
-            return str(online["personId"])
-
-    ent = payload.get("entity") or {}
-    if isinstance(ent, dict) and ent.get("personId"):
-        return str(ent["personId"])
-
-    return None
-
-
-# ==== 추가: RAW SQL (async) ====
-async def execute_raw_query(sql: str):
-    async with get_session() as s:
-        res = await s.execute(sa_text(sql))
-        return res.fetchall()
-# =======================
 
+async def fetch_notice(loc: int, msg_type: str) -> str | None:
+    """
+    (loc, msg_type) 최신 공지 본문. 캐시(로컬 LRU → Redis) 경유
+    """
+    async def load():
+        async with get_session() as s:
+            return await queries.fetch_notice(s, loc, msg_type)
 
-# ===== 비즈 유틸 =====
-async def route_reply(text: str) -> str:
+    return await cache.get_or_load(cache.notice_key(loc, msg_type), load)
+
+
+async def fetch_point_rows(loc: int, pos_type: str) -> list[PointRow]:
     """
-    (대동제/락페/해키) + (화장실/무대/안내/부스/금지물품/분실물)
-    → DB 조회 후 가장 가까운 지점 링크 또는 공지 메시지 반환
+    (loc, pos_type) point 행 목록. 캐시(로컬 LRU → Redis) 경유
     """
-    if not text:
-        return "문의가 접수되었어요. 최대한 빨리 답변드릴게요 🙏"
+    async def load():
+        async with get_session() as s:
+            return [list(r) for r in await queries.fetch_points(s, loc, pos_type)]
 
-    t = text.strip()
-
-    # prefix → loc & 임시 사용자 좌표 (실좌표 있으면 대체)
-    prefix_map = {
-        "대동제": {"loc": 1, "user_long": 0.0,   "user_lati": 0.0},
-        "락페":  {"loc": 2, "user_long": 126.0, "user_lati": 37.0},
-        "해키":  {"loc": 3, "user_long": 0.0,   "user_lati": 0.0},
-    }
-    matched_prefix = next((p for p in prefix_map.keys() if t.startswith(p)), None)
-    if not matched_prefix:
-        # 기타 일반 명령 처리(/ping, /help 등)는 아래에서 처리하도록 빠져나감
-        pass
-    else:
-        loc = prefix_map[matched_prefix]["loc"]
-        user_long = float(prefix_map[matched_prefix]["user_long"])
-        user_lati = float(prefix_map[matched_prefix]["user_lati"])
-
-        def ends(sfx: str) -> bool:
-            return t.endswith(sfx)
-
-        # 공지
-        if ends("금지물품"):
-            row = await execute_raw_query(
-                f"select * from message where msg_type = '물품 공지' and loc = {loc} order by id limit 1"
-            )
-            row = row[0] if row else None
-            return row[3] if row else "등록된 금지물품 공지가 아직 없어요."
+    rows = await cache.get_or_load(cache.point_key(loc, pos_type), load)
+    return [PointRow(*r) for r in rows or []]
 
-        if ends("분실물"):
-            row = await execute_raw_query(
-                f"select * from message where msg_type = '분실물 공지' and loc = {loc} order by id limit 1"
-            )
-            row = row[0] if row else None
-            return row[3] if row else "등록된 분실물 공지가 아직 없어요."
-
-        # 공통 유틸
-        def find_closest(rows, user_long: float, user_lati: float):
-            best_row, best_dist = None, float("inf")
-            for r in rows or []:
-                try:
-                    pos_long = float(r[4])
-                    pos_lati = float(r[5])
-                except (ValueError, TypeError, IndexError):
-                    continue
-                d = (pos_long - user_long) ** 2 + (pos_lati - user_lati) ** 2
-                if d < best_dist:
-                    best_dist, best_row = d, r
-            return best_row
-
-        def make_map_msg(kind_label: str, r) -> str:
-            if not r:
-                return f"{kind_label} 정보가 아직 없어요."
-            title = str(r[3])
-            lng = str(r[4])
-            lat = str(r[5])
-            return f'가장 가까운 {kind_label}은(는) "https://map.naver.com?lng={lng}&lat={lat}&title={title}" 입니다'
-
-        # 좌표형
-        if ends("화장실"):
-            rows = await execute_raw_query(
-                f"select * from point where pos_type = 'toilet' and loc = {loc}"
-            )
-            return make_map_msg("화장실", find_closest(rows, user_long, user_lati))
 
-        if ends("무대"):
-            rows = await execute_raw_query(
-                f"select * from point where pos_type = 'stage' and loc = {loc}"
-            )
-            return make_map_msg("무대", find_closest(rows, user_long, user_lati))
+async def load_points(loc: int, pos_type: str):
+    """
+    spatial_index 용 로더: (lng, lat, row) 목록. 좌표가 잘못된 행은 건너뜀
+    """
+    items = []
+    for r in await fetch_point_rows(loc, pos_type):
+        try:
+            items.append((float(r.lng), float(r.lat), r))
+        except (ValueError, TypeError):
+            continue
+    return items
 
-        if ends("안내"):
-            rows = await execute_raw_query(
-                f"select * from point where pos_type = 'helpdesk' and loc = {loc}"
-            )
-            return make_map_msg("안내데스크", find_closest(rows, user_long, user_lati))
 
-        if ends("부스"):
-            rows = await execute_raw_query(
-                f"select * from point where pos_type = 'booth' and loc = {loc}"
-            )
-            return make_map_msg("부스", find_closest(rows, user_long, user_lati))
+# ===== 비즈 유틸 =====
+def make_map_msg(kind_label: str, r: PointRow | None) -> str:
+    if not r:
+        return f"{kind_label} 정보가 아직 없어요."
+    title = str(r.title)
+    lng = str(r.lng)
+    lat = str(r.lat)
+    return f'가장 가까운 {kind_label}은(는) "https://map.naver.com?lng={lng}&lat={lat}&title={title}" 입니다'
+
+
+async def static_reply(fest, kw, user_pos: tuple[float, float] | None = None) -> str:
+    """
+    (축제, 키워드) 라이브 조회. user_pos 가 없으면 축제 고정 좌표(임시 사용자 좌표) 기준
+    reply_table 사전계산도 이 함수로 한다
+    """
+    if kw.intent == "notice":
+        msg = await fetch_notice(fest.loc, kw.target)
+        return msg or f"등록된 {kw.label} 공지가 아직 없어요."
+
+    if user_pos is None:
+        user_pos = (float(fest.user_long or 0.0), float(fest.user_lati or 0.0))
+    hits = await spatial_index.nearest_points(
+        fest.loc, kw.target, user_pos[0], user_pos[1], loader=load_points, k=1
+    )
+    return make_map_msg(kw.label, hits[0][1] if hits else None)
 
-        # prefix는 맞지만 상세 키워드가 없을 때
-        return "원하시는 항목(화장실/무대/안내/부스/금지물품/분실물)을 붙여서 다시 말씀해 주세요."
+
+async def route_reply(text: str, user_pos: tuple[float, float] | None = None) -> str:
+    """
+    (축제 이름/별칭) + (키워드) → 가장 가까운 지점 링크 또는 공지 메시지 반환
+    축제/키워드 정의는 intent_router 스냅샷(festivals / intent_keywords 테이블)에서 온다
+    좌표와 무관한 답은 reply_table 사전계산 값 (아직 없거나 낡았으면 라이브), 실제 사용자 좌표(user_pos)가 있을 때만 라이브 조회
+    """
+    if not text:
+        metrics.INTENTS.inc("empty")
+        return "문의가 접수되었어요. 최대한 빨리 답변드릴게요 🙏"
+
+    reply_table.ensure_snapshot()
+    snapshot = await intent_router.refresh()
+    intent = snapshot.match(text)
+    if intent is not None:
+        fest, kw = intent
+        if kw is None:
+            # 축제는 맞지만 상세 키워드가 없을 때
+            metrics.INTENTS.inc("festival_only")
+            names = "/".join(k.keyword for k in snapshot.keywords)
+            return f"원하시는 항목({names})을 붙여서 다시 말씀해 주세요."
+
+        metrics.INTENTS.inc(f"{kw.intent}:{kw.target}")
+        if user_pos is None or kw.intent == "notice":
+            reply_table.refresh_soon(static_reply)   # 빌드/갱신은 백그라운드, 미스면 아래 라이브 조회
+            msg = reply_table.lookup(snapshot, fest, kw)
+            if msg is not None:
+                return msg
+        return await static_reply(fest, kw, user_pos)
 
     # === 일반 명령 처리 ===
     lower = (text or "").lower().strip()
     if lower == "/ping":
+        metrics.INTENTS.inc("command:ping")
         return "pong 🏓"
     if lower.startswith("/help"):
+        metrics.INTENTS.inc("command:help")
         return "명령어: /ping, /help, /history (최근 문의 5건), /inq <내용>"
 
+    # === FAQ (큐레이션 Q/A + 승격된 과거 문의) — 확신할 때만 바로 답변 ===
+    if not lower.startswith("/"):
+        hit = await faq.answer(text)
+        if hit is not None:
+            metrics.INTENTS.inc("faq")
+            return hit.answer
+
+    metrics.INTENTS.inc("fallback")
     return "문의가 접수되었어요. 최대한 빨리 답변드릴게요 🙏"
 
 
 # ===== 사용자 메시지 처리 =====
+async def _reply(user_chat_id: str, text: str):
+    with stage("send"):
+        return await send_message_to_userchat(user_chat_id, text)
+
+
+async def _reply_once(user_chat_id: str, text: str):
+    """outbox.send_once 를 send 단계로 관측 (실패분은 dispatcher 가 backoff 로)"""
+    with stage("send"):
+        return await outbox.send_once(user_chat_id, text)
+
+
+async def _record_and_reply(owner_id: str, display_name: str | None, user_chat_id: str, content: str, reply: str):
+    """
+    사용자 ChatLog 와 보낼 응답(outbox)을 한 트랜잭션으로 저장한 뒤 재시도 없이 바로 한 번 전송.
+    실패한 응답은 outbox dispatcher 가 next_attempt_at 에 맞춰 다시 보낸다
+    """
+    if not outbox.OUTBOX_ENABLED:
+        with stage("db_write"):
+            async with get_session() as s:
+                log_id = await record_message(s, owner_id, display_name, "user", content)
+        await _reply(user_chat_id, reply)
+        return log_id
+
+    with stage("db_write"):
+        async with get_session() as s:
+            log_id, ob_id = await record_message_with_reply(
+                s, owner_id, display_name, content, user_chat_id, reply,
+                next_attempt_at=outbox.claimed_until(),
+            )
+    await outbox.deliver(ob_id, user_chat_id, reply, _reply_once)
+    return log_id
+
+
 async def _process_user_and_reply(
     owner_id: str,
     f_name: str | None,
@@ -294,79 +229,209 @@ async def _process_user_and_reply(
     t = (text or "").lower().strip()
 
     if t.startswith("/history"):
-        async with get_session() as s:
-            rows = await get_recent_inqueries(s, user_id=owner_id, limit=5)
+        metrics.INTENTS.inc("command:history")
+        with stage("db_read"):
+            async with get_session() as s:
+                rows = await get_recent_inqueries(s, user_id=owner_id, limit=5)
         lines = [f"- {r.message}" for r in rows] or ["(문의 없음)"]
         reply = "최근 문의:\n" + "\n".join(lines)
-        await send_message_to_userchat(user_chat_id, reply)
+        await _reply(user_chat_id, reply)
         return
 
     if t.startswith("/inq"):
         body = text.split(" ", 1)[1].strip() if " " in (text or "") else ""
-        async with get_session() as s:
-            await upsert_user(s, user_id=owner_id, name=display_name)
-            await add_inquery(s, user_id=owner_id, content=(body or "(내용 없음)"))
-        await send_message_to_userchat(user_chat_id, "문의가 접수되었어요. 최대한 빨리 답변드릴게요 🙏")
+        metrics.INTENTS.inc("command:inq")
+        await _record_and_reply(owner_id, display_name, user_chat_id, body or "(내용 없음)",
+                                "문의가 접수되었어요. 최대한 빨리 답변드릴게요 🙏")
         return
 
-    async with get_session() as s:
-        await upsert_user(s, user_id=owner_id, name=display_name)
-        log_id = await add_inquery(s, user_id=owner_id, content=(text or "(내용 없음)"))
-        if CHANNEL_DEBUG:
-            logging.info("DBG :: saved user log_id=%s uid=%s msg=%r", log_id, owner_id, text)
+    # 응답을 먼저 만들어 사용자 메시지와 함께 저장
+    with stage("route_reply"):
+        reply_msg = await route_reply(text)
+    log_id = await _record_and_reply(owner_id, display_name, user_chat_id, text or "(내용 없음)", reply_msg)
+    if CHANNEL_DEBUG:
+        log.info("saved user log", extra={"log_id": log_id, "owner": owner_id, "text": text})
 
-    reply_msg = await route_reply(text)
-    await send_message_to_userchat(user_chat_id, reply_msg)
+
+async def _store_bot_log(owner_id: str, f_name: str | None, l_name: str | None, text: str):
+    with stage("db_write"):
+        async with get_session() as s:
+            bot_log_id = await record_message(
+                s, owner_id, combine_name(f_name, l_name), "bot", text or "(내용 없음)"
+            )
+    if CHANNEL_DEBUG:
+        log.info("saved bot log", extra={"log_id": bot_log_id, "owner": owner_id, "text": text})
 
 
 # ===== 웹훅 엔드포인트 =====
 @router.post("/webhook")
 async def channel_webhook(request: Request):
+    with stage("total"):
+        return await _handle_webhook(request)
+
+
+async def _handle_webhook(request: Request):
     raw = await request.body()
 
-    if CHANNEL_DEBUG:
-        try:
-            raw_text = raw.decode("utf-8", errors="replace")
-        except Exception:
-            raw_text = "<decode failed>"
-        logging.info("\n===== WEBHOOK RAW PAYLOAD START =====\n%s\n===== WEBHOOK RAW PAYLOAD END =====", raw_text)
+    # 원시 payload 는 LOG_PAYLOAD_SAMPLE 비율만 (출력은 로그 리스너 스레드에서)
+    if CHANNEL_DEBUG and logs.should_sample_payload():
+        logs.log_payload(log, raw)
 
-    if not is_verified(request, raw):
+    with stage("verify"):
+        verified = is_verified(request, raw)
+    if not verified:
+        metrics.WEBHOOKS.inc("unauthorized")
         raise HTTPException(status_code=401, detail="unauthorized webhook")
 
-    try:
-        payload = json.loads(raw.decode("utf-8"))
-    except Exception:
-        payload = {}
-
-    actor    = classify_actor(payload)
-    chat_id  = extract_user_chat_id(payload)
-    text     = extract_text(payload)
-    owner_id = extract_owner_id(payload) or "unknown"
-    fullname = extract_fullname(payload)
+    with stage("parse"):
+        ev = parse_event(raw)
+    actor    = ev.actor
+    chat_id  = ev.chat_id
+    text     = ev.text
+    owner_id = ev.owner_id or "unknown"
+    fullname = ev.fullname
     f_name, l_name = split_name(fullname)
 
     if CHANNEL_DEBUG:
-        logging.info("DBG :: actor=%s owner=%s chat=%s text=%r fullname=%r", actor, owner_id, chat_id, text, fullname)
+        log.info("webhook event", extra={"actor": actor, "owner": owner_id, "chat": chat_id,
+                                         "text": text, "fullname": fullname})
 
     if not chat_id:
+        metrics.WEBHOOKS.inc("no_chat_id")
         return JSONResponse({"ok": False, "reason": "no_userChatId_in_payload"})
 
+    event_id = ev.event_id if actor in ("user", "bot") else None
+    if event_id:
+        with stage("dedup"):
+            duplicate = await dedup.is_duplicate(event_id)
+        if duplicate:
+            metrics.WEBHOOKS.inc("duplicate")
+            if CHANNEL_DEBUG:
+                log.info("duplicate delivery", extra={"event": event_id})
+            return JSONResponse({"ok": True, "duplicate": True})
+
+    if actor == "user":
+        with stage("rate_limit"):
+            decision = await rate_limiter.check(ev.owner_id, chat_id)   # owner 없으면 상담 버킷만
+        if not decision.allowed:
+            return await _throttled(decision, owner_id, chat_id, text)
+
+    try:
+        resp = await _dispatch(actor, owner_id, f_name, l_name, chat_id, text, event_id)
+        metrics.WEBHOOKS.inc(actor)
+        return resp
+    except BaseException:
+        # 처리·큐 등록이 실패하거나 (대기 중 연결이 끊겨) 취소된 이벤트는 재전송 시 다시 처리되도록 기록 삭제
+        metrics.WEBHOOKS.inc("error")
+        if event_id:
+            await dedup.forget(event_id)
+        raise
+
+
+async def _throttled(decision, owner_id: str, chat_id: str, text: str):
+    """
+    한도 초과 이벤트: 처리/응답 없이 200 으로 ack (재전송 방지).
+    기록은 write-behind 배치로만, 안내 메시지는 스로틀 구간마다 한 번
+    """
+    metrics.WEBHOOKS.inc("throttled")
+    if CHANNEL_DEBUG:
+        log.info("throttled", extra={"scope": decision.scope, "owner": owner_id, "chat": chat_id})
+    if RATE_LIMIT_LOG:
+        try:
+            await chatlog_writer.enqueue(owner_id, "throttled", text or "(내용 없음)")
+        except Exception as e:
+            log.warning("throttled log enqueue failed: %r", e)
+    if decision.notify:
+        try:
+            await _reply(chat_id, THROTTLED_REPLY)
+        except Exception as e:
+            log.warning("throttled notice failed chat=%s: %r", chat_id, e)
+    return JSONResponse({"ok": True, "throttled": decision.scope})
+
+
+def _forget_on_failure(job, event_id: str | None):
+    """WEBHOOK_ASYNC 작업: 큐 워커에서 실패하면 dedup 기록 삭제 (재전송이 다시 처리되도록)"""
+    if not event_id:
+        return job
+
+    async def run():
+        try:
+            await job()
+        except Exception:
+            await dedup.forget(event_id)
+            raise
+    return run
+
+
+async def _dispatch(
+    actor: str,
+    owner_id: str,
+    f_name: str | None,
+    l_name: str | None,
+    chat_id: str,
+    text: str,
+    event_id: str | None = None,
+):
+    if actor in ("user", "bot") and event_stream.enabled():
+        # 워커 모드: 상담 id 로 샤딩된 스트림에 넣고 바로 응답. Redis 실패 시 아래 경로로 직접 처리
+        # (스트림에 들어간 뒤 실패는 워커가 재시도/dead-letter 하므로 dedup 기록은 그대로 둔다)
+        eid = await event_stream.publish(chat_id, {
+            "actor": actor, "owner_id": owner_id, "f_name": f_name, "l_name": l_name,
+            "chat_id": chat_id, "text": text or "", "request_id": logs.request_id.get(),
+        })
+        if eid is not None:
+            return JSONResponse({"ok": True, "queued": "stream"})
+
     if actor == "user":
+        if WEBHOOK_ASYNC:
+            await webhook_queue.submit(chat_id, _forget_on_failure(
+                lambda: _process_user_and_reply(owner_id, f_name, l_name, chat_id, text), event_id
+            ))
+            return JSONResponse({"ok": True, "queued": "user"})
         await _process_user_and_reply(owner_id, f_name, l_name, chat_id, text)
         return JSONResponse({"ok": True, "handled": "user"})
 
     if actor == "bot":
-        async with get_session() as s:
-            await upsert_user(s, user_id=owner_id, name=combine_name(f_name, l_name))
-            bot_log = ChatLog(channel_user_id=owner_id, role="bot", message=(text or "(내용 없음)"))
-            s.add(bot_log)
-            await s.commit()
-            await s.refresh(bot_log)
-        if CHANNEL_DEBUG:
-            logging.info("DBG :: saved bot log_id=%s uid=%s msg=%r", bot_log.id, owner_id, text)
+        if WEBHOOK_ASYNC:
+            await webhook_queue.submit(chat_id, _forget_on_failure(
+                lambda: _store_bot_log(owner_id, f_name, l_name, text), event_id
+            ))
+            return JSONResponse({"ok": True, "queued": "bot"})
+        await _store_bot_log(owner_id, f_name, l_name, text)
         return JSONResponse({"ok": True, "stored": "bot"})
 
     if CHANNEL_DEBUG:
-        logging.info("DBG :: skipped unknown actor")
+        log.info("skipped unknown actor")
     return JSONResponse({"ok": True, "skipped": "unknown-actor"})
+
+
+async def handle_stream_event(data: dict) -> None:
+    """stream_worker 가 호출: 웹훅 경로와 같은 처리 (예외는 워커가 재시도)"""
+    token = logs.request_id.set(data.get("request_id"))
+    try:
+        if data.get("actor") == "user":
+            await _process_user_and_reply(
+                data.get("owner_id") or "unknown", data.get("f_name"), data.get("l_name"),
+                data["chat_id"], data.get("text", ""),
+            )
+        elif data.get("actor") == "bot":
+            await _store_bot_log(data.get("owner_id") or "unknown", data.get("f_name"), data.get("l_name"),
+                                 data.get("text", ""))
+    finally:
+        logs.request_id.reset(token)
+
+
+metrics.GaugeCallback("eventlive_webhook_queue_depth", "Jobs waiting in the webhook worker queue", webhook_queue.depth)
+metrics.stats_gauge("eventlive_webhook_queue", "Webhook worker queue counters", lambda: webhook_queue.stats)
+metrics.stats_gauge("eventlive_dedup", "Webhook de-duplication counters", lambda: dedup.stats)
+metrics.stats_gauge("eventlive_rate_limit", "Webhook ingestion rate limiter counters", lambda: rate_limiter.stats)
+metrics.stats_gauge("eventlive_cache", "Read-through cache counters", lambda: cache.stats)
+metrics.stats_gauge("eventlive_reply_table", "Precomputed reply table counters", lambda: reply_table.stats)
+metrics.GaugeCallback("eventlive_reply_table_entries", "Precomputed reply table size", lambda: len(reply_table.current()))
+metrics.stats_gauge("eventlive_stream", "Redis Streams producer/worker counters", lambda: event_stream.stats)
+metrics.GaugeCallback("eventlive_stream_lag", "Undelivered + pending entries per stream shard",
+                      lambda: {(k,): v for k, v in event_stream.lag.items()}, ("shard",))
+metrics.stats_gauge("eventlive_outbox", "Outbound message outbox counters (backlog = pending rows)", lambda: outbox.stats)
+metrics.stats_gauge("eventlive_logging", "Queued logging counters", lambda: logs.stats)
+metrics.stats_gauge("eventlive_faq", "FAQ matcher counters", lambda: faq.stats)
+metrics.GaugeCallback("eventlive_faq_entries", "Indexed FAQ entries", lambda: len(faq.current()))
@@ -0,0 +1,258 @@
+# api/scripts/bench_parse.py
+"""
+웹훅 파싱 경로 마이크로벤치마크
+  기존: json.loads + classify_actor / extract_* 5회 순회 (웹훅 라우터에 있던 구현을 비교 기준으로 아래에 보관)
+  신규: webhook_event.parse_event (단일 순회, orjson 있으면 사용)
+
+  python -m api.scripts.bench_parse [-n 20000]
+"""
+import json, time, argparse, statistics
+
+from api.services.webhook_event import parse_event, JSON_BACKEND
+
+USER_MSG = {
+    "event": "push",
+    "type": "message",
+    "entity": {
+        "chatKey": "userChat-690de166da69bd309487",
+        "id": "690e0f3c5b1d2a7f9c11",
+        "channelId": "197228",
+        "chatType": "userChat",
+        "chatId": "690de166da69bd309487",
+        "personType": "user",
+        "personId": "690de15f8e2b4c1a2d77",
+        "createdAt": 1762521916000,
+        "version": 0,
+        "blocks": [{"type": "text", "value": "락페 화장실 어디야"}],
+        "plainText": "락페 화장실 어디야",
+        "options": ["actAsManager"],
+    },
+    "refers": {
+        "user": {
+            "id": "690de15f8e2b4c1a2d77",
+            "channelId": "197228",
+            "memberId": "m-1234",
+            "type": "member",
+            "name": "김 민수",
+            "profile": {"name": "김 민수", "mobileNumber": "+821000000000"},
+            "tags": ["vip", "festival"],
+            "createdAt": 1762521000000,
+        },
+        "userChat": {
+            "id": "690de166da69bd309487",
+            "channelId": "197228",
+            "userId": "690de15f8e2b4c1a2d77",
+            "state": "opened",
+            "managed": False,
+            "tags": [],
+        },
+    },
+}
+
+BOT_MSG = {
+    "event": "push",
+    "type": "message",
+    "entity": {
+        "id": "690e0f3c5b1d2a7f9c12",
+        "chatId": "690de166da69bd309487",
+        "personType": "bot",
+        "personId": "12345",
+        "blocks": [{"type": "text", "value": "가장 가까운 화장실은..."}],
+    },
+    "refers": {
+        "userChat": {"id": "690de166da69bd309487", "userId": "690de15f8e2b4c1a2d77"},
+        "user": {"id": "690de15f8e2b4c1a2d77", "name": "김 민수"},
+    },
+}
+
+UNKNOWN_EVT = {
+    "event": "update",
+    "type": "userChat",
+    "data": {"userChatId": "690de166da69bd309487", "state": "closed"},
+    "refers": {"online": {"personType": "manager", "personId": "m-9"}},
+}
+
+CASES = {"user": USER_MSG, "bot": BOT_MSG, "unknown": UNKNOWN_EVT}
+
+
+# ===== 기존 파서 (payload 를 필드마다 다시 순회) =====
+def extract_user_chat_id(payload: dict) -> str | None:
+    ent = payload.get("entity") or {}
+    if isinstance(ent, dict) and ent.get("chatId") is not None:
+        return str(ent["chatId"])
+
+    data = payload.get("data") or {}
+    for k in ("userChatId", "chatId"):
+        v = data.get(k)
+        if v is not None:
+            return str(v)
+
+    msgs = payload.get("messages")
+    if isinstance(msgs, list) and msgs and isinstance(msgs[0], dict):
+        cid = msgs[0].get("chatId")
+        if cid is not None:
+            return str(cid)
+
+    return None
+
+
+def extract_text(payload: dict) -> str:
+    ent = payload.get("entity") or {}
+    if isinstance(ent, dict):
+        t = (ent.get("plainText") or "").strip()
+        if t:
+            return t
+        blocks = ent.get("blocks") or []
+        if isinstance(blocks, list) and blocks and isinstance(blocks[0], dict):
+            if blocks[0].get("type") == "text":
+                t = (blocks[0].get("value") or "").strip()
+                if t:
+                    return t
+
+    msgs = payload.get("messages") or []
+    if isinstance(msgs, list) and msgs and isinstance(msgs[0], dict):
+        t = (msgs[0].get("plainText") or "").strip()
+        if t:
+            return t
+        blocks = msgs[0].get("blocks") or []
+        if isinstance(blocks, list) and blocks and isinstance(blocks[0], dict):
+            if blocks[0].get("type") == "text":
+                t = (blocks[0].get("value") or "").strip()
+                if t:
+                    return t
+
+    data = payload.get("data")
+    if isinstance(data, dict):
+        t = (data.get("plainText") or "").strip()
+        if t:
+            return t
+
+    return ""
+
+
+def extract_fullname(payload: dict) -> str | None:
+    refers = payload.get("refers") or {}
+    if isinstance(refers, dict):
+        u = refers.get("user") or {}
+        if isinstance(u, dict):
+            name = u.get("name")
+            return str(name) if name else None
+
+    ent = payload.get("entity") or {}
+    if isinstance(ent, dict):
+        name = ent.get("name")
+        if name:
+            return str(name)
+
+    return None
+
+
+def classify_actor(payload: dict) -> str:
+    ent = payload.get("entity") or {}
+    if isinstance(ent, dict):
+        pt = ent.get("personType")
+        if pt in ("user", "bot"):
+            return pt
+
+    msgs = payload.get("messages")
+    if isinstance(msgs, list) and msgs:
+        pt = (msgs[0] or {}).get("personType")
+        if pt in ("user", "bot"):
+            return pt
+
+    refers = payload.get("refers") or {}
+    online = refers.get("online") or {}
+    if isinstance(online, dict):
+        pt = online.get("personType")
+        if pt in ("user", "bot"):
+            return pt
+
+    return "unknown"
+
+
+def extract_event_id(payload: dict) -> str | None:
+    """
+    재전송 중복 제거 키: 메시지 id (entity.id → messages[0].id)
+    """
+    ent = payload.get("entity") or {}
+    if isinstance(ent, dict) and ent.get("id"):
+        return str(ent["id"])
+
+    msgs = payload.get("messages")
+    if isinstance(msgs, list) and msgs and isinstance(msgs[0], dict) and msgs[0].get("id"):
+        return str(msgs[0]["id"])
+
+    return None
+
+
+def extract_owner_id(payload: dict) -> str | None:
+    refers = payload.get("refers") or {}
+    if isinstance(refers, dict):
+        user_chat = refers.get("userChat") or {}
+        if isinstance(user_chat, dict) and user_chat.get("userId"):
+            return str(user_chat["userId"])
+        u = refers.get("user") or {}
+        if isinstance(u, dict) and u.get("id"):
+            return str(u["id"])
+        online = refers.get("online") or {}
+        if isinstance(online, dict) and online.get("personId"):
+            return str(online["personId"])
+
+    ent = payload.get("entity") or {}
+    if isinstance(ent, dict) and ent.get("personId"):
+        return str(ent["personId"])
+
+    return None
+
+
+def legacy(raw: bytes):
+    try:
+        payload = json.loads(raw.decode("utf-8"))
+    except Exception:
+        payload = {}
+    return (
+        classify_actor(payload),
+        extract_user_chat_id(payload),
+        extract_text(payload),
+        extract_owner_id(payload),
+        extract_fullname(payload),
+        extract_event_id(payload),
+    )
+
+
+def single_pass(raw: bytes):
+    ev = parse_event(raw)
+    return (ev.actor, ev.chat_id, ev.text, ev.owner_id, ev.fullname, ev.event_id)
+
+
+def bench(fn, raw: bytes, n: int, repeat: int = 5) -> float:
+    """반복 중 최솟값 기준 1회당 µs"""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            fn(raw)
+        best = min(best, (time.perf_counter() - t0) / n)
+    return best * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", type=int, default=20000)
+    args = ap.parse_args()
+
+    print(f"json backend: {JSON_BACKEND}")
+    print(f"{'case':<8} {'legacy µs':>10} {'single µs':>10} {'speedup':>8}")
+    speedups = []
+    for name, payload in CASES.items():
+        raw = json.dumps(payload, ensure_ascii=False).encode()
+        assert legacy(raw) == single_pass(raw), (name, legacy(raw), single_pass(raw))
+        a = bench(legacy, raw, args.n)
+        b = bench(single_pass, raw, args.n)
+        speedups.append(a / b)
+        print(f"{name:<8} {a:>10.2f} {b:>10.2f} {a / b:>7.2f}x")
+    print(f"geomean speedup: {statistics.geometric_mean(speedups):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
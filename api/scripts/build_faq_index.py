@@ -0,0 +1,49 @@
+# api/scripts/build_faq_index.py
+"""
+FAQ 색인 스냅샷 생성 (배포 빌드 단계에서 실행)
+  python -m api.scripts.build_faq_index -o faq_index.json
+  python -m api.scripts.build_faq_index --import faq.csv   # question,answer[,source] CSV 등록 후 스냅샷
+런타임에 FAQ_SNAPSHOT=faq_index.json 이면 콜드 스타트에서 DB 전체 조회 없이 변경분만 읽는다
+"""
+import csv, time, asyncio, argparse
+
+from api.services import faq
+
+
+async def import_csv(path: str) -> int:
+    from api.db.session import get_session
+    from api.db.models import FaqEntry
+
+    n = 0
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        rows = [r for r in csv.DictReader(f) if (r.get("question") or "").strip() and (r.get("answer") or "").strip()]
+    async with get_session() as s:
+        for r in rows:
+            source = (r.get("source") or "curated").strip()
+            s.add(FaqEntry(question=r["question"].strip(), answer=r["answer"].strip(),
+                           source=source if source in ("curated", "inquiry") else "curated"))
+            n += 1
+        await s.commit()
+    return n
+
+
+async def run(path: str, csv_path: str | None) -> None:
+    if csv_path:
+        print(f"imported {await import_csv(csv_path)} rows from {csv_path}")
+    t0 = time.perf_counter()
+    ix = await faq.refresh(force=True)
+    faq.save_snapshot(path)
+    print(f"faq index: {len(ix)} entries, {len(ix.postings)} grams "
+          f"({time.perf_counter() - t0:.2f}s) -> {path}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="build faq index snapshot")
+    ap.add_argument("-o", "--output", default="faq_index.json")
+    ap.add_argument("--import", dest="csv_path", help="question,answer[,source] CSV 를 먼저 등록")
+    args = ap.parse_args()
+    asyncio.run(run(args.output, args.csv_path))
+
+
+if __name__ == "__main__":
+    main()
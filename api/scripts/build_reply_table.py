@@ -0,0 +1,29 @@
+# api/scripts/build_reply_table.py
+"""
+(축제, 키워드) 응답 테이블 스냅샷 생성 (배포 빌드 단계에서 실행)
+  python -m api.scripts.build_reply_table -o reply_table.json
+런타임에 REPLY_TABLE_SNAPSHOT=reply_table.json 이면 콜드 스타트에서 DB 없이 응답
+"""
+import asyncio, argparse
+
+from api.services import intent_router, reply_table
+
+
+async def run(path: str) -> None:
+    from api.routers.channel_webhook import static_reply
+    await intent_router.refresh(force=True)
+    table = await reply_table.refresh(static_reply, force=True)
+    reply_table.save_snapshot(path)
+    print(f"reply table {table.version}: {len(table)} entries, "
+          f"{len(table.partitions)} partitions -> {path}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="build reply table snapshot")
+    ap.add_argument("-o", "--output", default="reply_table.json")
+    args = ap.parse_args()
+    asyncio.run(run(args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+# api/scripts/bulk_load.py
+"""
+축제 지점(point) / 공지(message) 대량 적재
+  python -m api.scripts.bulk_load points.csv                 # loc,pos_type,title,lng,lat
+  python -m api.scripts.bulk_load booths.geojson --loc 2 --type booth
+  python -m api.scripts.bulk_load notices.csv --kind notice  # loc,msg_type,content
+  옵션: --mode merge|replace  --chunk 1000  --dry-run  --notify http://host  (관리자 토큰: ADMIN_TOKEN)
+
+merge   : 자연키(지점: loc+pos_type+좌표 6자리 / 공지: loc+msg_type)가 같으면 제목·본문만 갱신, 없으면 추가
+replace : 파일에 나온 (loc, 종류) 파티션을 지우고 다시 채움 (파티션마다 한 트랜잭션)
+적재 후 캐시/공간 인덱스/응답 테이블 무효화. --notify 면 실행 중인 앱의 /admin/reload 도 호출
+"""
+import os, sys, csv, json, time, asyncio, argparse
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, insert, update, delete, bindparam
+
+from api.db import legacy
+from api.db.legacy import LegacyTable
+
+POINT_ALIASES = {
+    "loc": ("loc", "festival_loc"),
+    "pos_type": ("pos_type", "type", "kind"),
+    "title": ("title", "name"),
+    "lng": ("lng", "lon", "long", "longitude", "pos_long", "x"),
+    "lat": ("lat", "latitude", "pos_lati", "y"),
+}
+NOTICE_ALIASES = {
+    "loc": ("loc", "festival_loc"),
+    "msg_type": ("msg_type", "type"),
+    "content": ("content", "body", "text"),
+}
+
+
+class Report:
+    def __init__(self):
+        self.read = 0
+        self.invalid: List[Tuple[int, str]] = []
+        self.duplicates = 0     # 파일 안 중복
+        self.unchanged = 0      # DB 와 동일
+        self.inserted = 0
+        self.updated = 0
+        self.deleted = 0
+        self.partitions: set = set()
+
+    def reject(self, line: int, reason: str) -> None:
+        self.invalid.append((line, reason))
+
+
+# ===== 읽기 =====
+def _pick(row: dict, aliases: Iterable[str]):
+    for a in aliases:
+        v = row.get(a)
+        if v not in (None, ""):
+            return v
+    return None
+
+
+def read_records(path: str) -> Tuple[str, List[Tuple[int, dict]]]:
+    """(형식, [(줄/피처 번호, 레코드)]) — CSV 헤더는 소문자로 맞춤"""
+    if path.lower().endswith((".geojson", ".json")):
+        with open(path, "r", encoding="utf-8") as f:
+            doc = json.load(f)
+        feats = doc.get("features", []) if isinstance(doc, dict) else doc
+        out = []
+        for i, ft in enumerate(feats, 1):
+            props = {str(k).lower(): v for k, v in (ft.get("properties") or {}).items()}
+            geom = ft.get("geometry") or {}
+            if geom.get("type") == "Point" and len(geom.get("coordinates") or ()) >= 2:
+                props.setdefault("lng", geom["coordinates"][0])
+                props.setdefault("lat", geom["coordinates"][1])
+            out.append((i, props))
+        return "geojson", out
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        rd = csv.DictReader(f)
+        return "csv", [
+            (i, {(k or "").strip().lower(): (v or "").strip() for k, v in row.items()})
+            for i, row in enumerate(rd, 2)
+        ]
+
+
+# ===== 검증 + 파일 내 중복 제거 =====
+def clean_points(records, rep: Report, default_loc: Optional[int], default_type: Optional[str]) -> List[dict]:
+    seen = set()
+    out = []
+    for line, r in records:
+        rep.read += 1
+        try:
+            loc = int(_pick(r, POINT_ALIASES["loc"]) or default_loc)
+        except (TypeError, ValueError):
+            rep.reject(line, "loc")
+            continue
+        pos_type = str(_pick(r, POINT_ALIASES["pos_type"]) or default_type or "").strip()
+        if not pos_type or len(pos_type) > 50:
+            rep.reject(line, "pos_type")
+            continue
+        try:
+            lng = float(_pick(r, POINT_ALIASES["lng"]))
+            lat = float(_pick(r, POINT_ALIASES["lat"]))
+        except (TypeError, ValueError):
+            rep.reject(line, "coordinates")
+            continue
+        if not (-180 <= lng <= 180 and -90 <= lat <= 90) or (lng == 0 and lat == 0):
+            rep.reject(line, "coordinates out of range")
+            continue
+        title = str(_pick(r, POINT_ALIASES["title"]) or pos_type).strip()[:255]
+        key = (loc, pos_type, round(lng, 6), round(lat, 6))
+        if key in seen:
+            rep.duplicates += 1
+            continue
+        seen.add(key)
+        out.append({"loc": loc, "pos_type": pos_type, "title": title, "pos_long": lng, "pos_lati": lat})
+    return out
+
+
+def clean_notices(records, rep: Report, default_loc: Optional[int], default_type: Optional[str]) -> List[dict]:
+    latest: Dict[Tuple[int, str], dict] = {}
+    for line, r in records:
+        rep.read += 1
+        try:
+            loc = int(_pick(r, NOTICE_ALIASES["loc"]) or default_loc)
+        except (TypeError, ValueError):
+            rep.reject(line, "loc")
+            continue
+        msg_type = str(_pick(r, NOTICE_ALIASES["msg_type"]) or default_type or "").strip()
+        content = str(_pick(r, NOTICE_ALIASES["content"]) or "").strip()
+        if not msg_type or len(msg_type) > 50:
+            rep.reject(line, "msg_type")
+            continue
+        if not content:
+            rep.reject(line, "content")
+            continue
+        key = (loc, msg_type)
+        if key in latest:
+            rep.duplicates += 1   # 같은 공지가 여러 번 나오면 마지막 값
+        latest[key] = {"loc": loc, "msg_type": msg_type, "content": content}
+    return list(latest.values())
+
+
+def _chunks(rows: List[dict], n: int):
+    for i in range(0, len(rows), n):
+        yield rows[i:i + n]
+
+
+# ===== 쓰기 =====
+def _update_stmt(lt: LegacyTable, attr: str):
+    """id 기준 한 컬럼 bulk UPDATE (executemany, 파라미터 b_id / b_value)"""
+    return (
+        update(lt.table)
+        .where(lt.c["id"] == bindparam("b_id"))
+        .values({lt.c[attr].name: bindparam("b_value")})
+    )
+
+
+async def write_points(rows: List[dict], rep: Report, mode: str, chunk: int) -> None:
+    from api.db.session import get_session
+
+    by_part: Dict[Tuple[int, str], List[dict]] = defaultdict(list)
+    for r in rows:
+        by_part[(r["loc"], r["pos_type"])].append(r)
+
+    for (loc, pos_type), part in by_part.items():
+        rep.partitions.add(f"point:{loc}:{pos_type}")
+        async with get_session() as s:
+            pt, _ = await legacy.tables(s)
+            if mode == "replace":
+                # 파티션 교체는 한 트랜잭션 (중간 상태가 보이지 않게)
+                res = await s.execute(delete(pt.table).where(pt.c["loc"] == loc, pt.c["pos_type"] == pos_type))
+                rep.deleted += res.rowcount or 0
+                for c in _chunks(part, chunk):
+                    await s.execute(insert(pt.table), [pt.row(r) for r in c])   # executemany → multi-row INSERT
+                    rep.inserted += len(c)
+                await s.commit()
+                continue
+
+            existing = {
+                (round(lng, 6), round(lat, 6)): (pid, title)
+                for pid, title, lng, lat in (await s.execute(
+                    select(pt.c["id"], pt.c["title"], pt.c["pos_long"], pt.c["pos_lati"])
+                    .where(pt.c["loc"] == loc, pt.c["pos_type"] == pos_type)
+                )).all()
+                if lng is not None and lat is not None
+            }
+            new_rows, changes = [], []
+            for r in part:
+                hit = existing.get((round(r["pos_long"], 6), round(r["pos_lati"], 6)))
+                if hit is None:
+                    new_rows.append(r)
+                elif hit[1] != r["title"]:
+                    changes.append({"b_id": hit[0], "b_value": r["title"]})
+                else:
+                    rep.unchanged += 1
+            for c in _chunks(changes, chunk):
+                await s.execute(_update_stmt(pt, "title"), c)       # PK 기준 bulk UPDATE
+                await s.commit()
+                rep.updated += len(c)
+            for c in _chunks(new_rows, chunk):
+                await s.execute(insert(pt.table), [pt.row(r) for r in c])
+                await s.commit()
+                rep.inserted += len(c)
+
+
+async def write_notices(rows: List[dict], rep: Report, mode: str, chunk: int) -> None:
+    from api.db.session import get_session
+
+    async with get_session() as s:
+        _, msg = await legacy.tables(s)
+        if mode == "replace":
+            for r in rows:
+                res = await s.execute(delete(msg.table).where(msg.c["loc"] == r["loc"], msg.c["msg_type"] == r["msg_type"]))
+                rep.deleted += res.rowcount or 0
+            for c in _chunks(rows, chunk):
+                await s.execute(insert(msg.table), [msg.row(r) for r in c])
+                rep.inserted += len(c)
+            await s.commit()
+        else:
+            # route_reply 는 (loc, msg_type) 중 id 가 가장 작은 공지를 쓴다 → 그 행을 갱신
+            first: Dict[Tuple[int, str], Tuple[int, Optional[str]]] = {}
+            locs = sorted({r["loc"] for r in rows})
+            for mid, loc, msg_type, content in (await s.execute(
+                select(msg.c["id"], msg.c["loc"], msg.c["msg_type"], msg.c["content"])
+                .where(msg.c["loc"].in_(locs)).order_by(msg.c["id"])
+            )).all():
+                first.setdefault((loc, msg_type), (mid, content))
+            new_rows, changes = [], []
+            for r in rows:
+                hit = first.get((r["loc"], r["msg_type"]))
+                if hit is None:
+                    new_rows.append(r)
+                elif hit[1] != r["content"]:
+                    changes.append({"b_id": hit[0], "b_value": r["content"]})
+                else:
+                    rep.unchanged += 1
+            for c in _chunks(changes, chunk):
+                await s.execute(_update_stmt(msg, "content"), c)
+                rep.updated += len(c)
+            for c in _chunks(new_rows, chunk):
+                await s.execute(insert(msg.table), [msg.row(r) for r in c])
+                rep.inserted += len(c)
+            await s.commit()
+    rep.partitions.update(f"notice:{r['loc']}:{r['msg_type']}" for r in rows)
+
+
+# ===== 무효화 =====
+async def invalidate(rep: Report, notify: Optional[str]) -> None:
+    from api.services import reply_table
+    await reply_table.data_changed(rep.partitions)
+    if not notify:
+        return
+    import httpx
+    token = os.getenv("ADMIN_TOKEN", "")
+    async with httpx.AsyncClient(timeout=10) as c:
+        r = await c.post(
+            notify.rstrip("/") + "/admin/reload",
+            headers={"X-Admin-Token": token},
+            json={"partitions": sorted(rep.partitions)},
+        )
+        print(f"notify {notify}: {r.status_code} {r.text[:200]}", file=sys.stderr)
+
+
+def detect_kind(records) -> str:
+    keys = set().union(*(r.keys() for _, r in records[:20])) if records else set()
+    return "notice" if keys & set(NOTICE_ALIASES["content"]) else "point"
+
+
+async def run(args) -> Report:
+    rep = Report()
+    fmt, records = read_records(args.path)
+    kind = args.kind or detect_kind(records)
+    t0 = time.perf_counter()
+    if kind == "point":
+        rows = clean_points(records, rep, args.loc, args.type)
+    else:
+        rows = clean_notices(records, rep, args.loc, args.type)
+    t_parse = time.perf_counter() - t0
+
+    if not args.dry_run:
+        if kind == "point":
+            await write_points(rows, rep, args.mode, args.chunk)
+        else:
+            await write_notices(rows, rep, args.mode, args.chunk)
+        await invalidate(rep, args.notify)
+    elapsed = time.perf_counter() - t0
+
+    written = rep.inserted + rep.updated
+    print(f"{kind} ({fmt}) {args.path}: read={rep.read} valid={len(rows)} invalid={len(rep.invalid)} "
+          f"dup={rep.duplicates} unchanged={rep.unchanged} inserted={rep.inserted} updated={rep.updated} deleted={rep.deleted} "
+          f"partitions={len(rep.partitions)}", file=sys.stderr)
+    print(f"parse {t_parse * 1000:.0f} ms, total {elapsed:.2f}s → "
+          f"{(written / elapsed) if elapsed and written else 0:,.0f} rows/s written"
+          f"{' (dry run)' if args.dry_run else ''}", file=sys.stderr)
+    for line, reason in rep.invalid[:20]:
+        print(f"  invalid #{line}: {reason}", file=sys.stderr)
+    if len(rep.invalid) > 20:
+        print(f"  ... {len(rep.invalid) - 20} more", file=sys.stderr)
+    return rep
+
+
+def main():
+    ap = argparse.ArgumentParser(description="bulk load festival points / notices")
+    ap.add_argument("path", help="CSV 또는 GeoJSON")
+    ap.add_argument("--kind", choices=("point", "notice"), help="생략 시 컬럼으로 판단")
+    ap.add_argument("--loc", type=int, help="파일에 loc 가 없을 때 기본값")
+    ap.add_argument("--type", help="파일에 pos_type/msg_type 이 없을 때 기본값")
+    ap.add_argument("--mode", choices=("merge", "replace"), default="merge")
+    ap.add_argument("--chunk", type=int, default=1000, help="multi-row INSERT/UPDATE 한 번의 행 수")
+    ap.add_argument("--dry-run", action="store_true")
+    ap.add_argument("--notify", help="실행 중인 앱 base URL (/admin/reload 호출)")
+    args = ap.parse_args()
+    rep = asyncio.run(run(args))
+    sys.exit(1 if rep.invalid and not (rep.inserted or rep.updated) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# api/scripts/chatlog_archive.py
+"""
+chat_logs 파티션/보관 관리
+  python -m api.scripts.chatlog_archive list
+  python -m api.scripts.chatlog_archive migrate --first-month 2025-09 [--apply]   # 월 파티션 전환 DDL (기본은 출력만)
+  python -m api.scripts.chatlog_archive ensure [--ahead 2]                        # 다가올 월 파티션 생성 (월 1회 cron)
+  python -m api.scripts.chatlog_archive archive [--keep-months 3] [--dry-run]     # 오래된 월 → gzip NDJSON + DROP
+  python -m api.scripts.chatlog_archive search --user U [--since 2026-01-01] [--until ...] [--limit 50]
+"""
+import sys, json, asyncio, argparse
+from datetime import date, datetime
+
+from api.db import partitions as P
+from api.services import archive
+
+
+async def cmd_list(args):
+    from api.db.session import get_engine
+    async with get_engine().connect() as conn:
+        parts = await P.list_partitions(conn)
+    if not parts:
+        print("chat_logs is not partitioned (or not MySQL)")
+    for p in parts:
+        print(f"{p.name:10s} < {p.bound or 'MAXVALUE':12s} ~{p.rows:,} rows")
+    entries = archive.load_manifest()
+    print(f"\narchived ({archive.CHATLOG_ARCHIVE_DIR}): {len(entries)} file(s), "
+          f"{sum(e['rows'] for e in entries):,} rows")
+    for e in entries:
+        print(f"  {e['month']}  {e['rows']:>10,}  {e['file']}")
+
+
+async def cmd_migrate(args):
+    stmts = P.migration_sql(date.fromisoformat(args.first_month + "-01"), args.ahead)
+    if not args.apply:
+        print(";\n\n".join(stmts) + ";")
+        return
+    from api.db.session import get_engine
+    async with get_engine().begin() as conn:
+        if not P.is_supported(conn):
+            sys.exit("partitioning requires MySQL")
+        for s in stmts:
+            print(s.splitlines()[0], "...", file=sys.stderr)
+            await conn.exec_driver_sql(s)
+
+
+async def cmd_ensure(args):
+    from api.db.session import get_engine
+    async with get_engine().begin() as conn:
+        made = await P.ensure_future_partitions(conn, args.ahead)
+    print("created:", ", ".join(made) if made else "(none)")
+
+
+async def cmd_archive(args):
+    results = await archive.archive_cold(args.keep_months, dry_run=args.dry_run)
+    if not results:
+        print("nothing to archive")
+    for r in results:
+        print(json.dumps(r, ensure_ascii=False))
+
+
+async def cmd_search(args):
+    n = 0
+    async for row in archive.iter_archived(user_id=args.user, since=args.since, until=args.until, role=args.role):
+        print(json.dumps(row, ensure_ascii=False))
+        n += 1
+        if n >= args.limit:
+            break
+
+
+def main():
+    ap = argparse.ArgumentParser(description="chat_logs partitions / archive")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list")
+    m = sub.add_parser("migrate")
+    m.add_argument("--first-month", required=True, help="YYYY-MM (이전 행은 첫 파티션에 포함)")
+    m.add_argument("--ahead", type=int, default=2)
+    m.add_argument("--apply", action="store_true")
+    e = sub.add_parser("ensure")
+    e.add_argument("--ahead", type=int, default=2)
+    a = sub.add_parser("archive")
+    a.add_argument("--keep-months", type=int, default=archive.CHATLOG_HOT_MONTHS)
+    a.add_argument("--dry-run", action="store_true")
+    s = sub.add_parser("search")
+    s.add_argument("--user")
+    s.add_argument("--role", choices=("user", "bot", "throttled"))
+    s.add_argument("--since", type=datetime.fromisoformat)
+    s.add_argument("--until", type=datetime.fromisoformat)
+    s.add_argument("--limit", type=int, default=100)
+    args = ap.parse_args()
+    asyncio.run(globals()[f"cmd_{args.cmd}"](args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# api/scripts/export_logs.py
+"""
+chat_logs 스트리밍 내보내기
+  python -m api.scripts.export_logs -o logs.ndjson.gz [--format csv] [--since 2026-05-01] [--until 2026-05-04]
+                                    [--festival 대동제] [--role user] [--no-gzip] [--chunk 2000]
+-o 생략 시 stdout 으로 출력. 진행 상황은 stderr
+"""
+import sys, time, asyncio, argparse
+from datetime import datetime
+
+from api.services import export
+
+
+async def run(args) -> dict:
+    stats: dict = {}
+    body = export.export_rows(
+        args.format,
+        since=args.since,
+        until=args.until,
+        festival=args.festival,
+        role=args.role,
+        chunk_rows=args.chunk,
+        stats=stats,
+    )
+    if not args.no_gzip:
+        body = export.gzip_stream(body)
+
+    out = open(args.output, "wb") if args.output and args.output != "-" else sys.stdout.buffer
+    t0 = time.perf_counter()
+    written = 0
+    reported = 0
+    try:
+        async for chunk in body:
+            out.write(chunk)
+            written += len(chunk)
+            if stats.get("chunks", 0) >= reported + 50:
+                reported = stats["chunks"]
+                print(f"  ... {stats['rows']:,} rows", file=sys.stderr)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+        else:
+            out.flush()
+    elapsed = time.perf_counter() - t0
+    stats.update(bytes=written, seconds=round(elapsed, 3),
+                 rows_per_sec=round(stats.get("rows", 0) / elapsed, 1) if elapsed else 0.0)
+    return stats
+
+
+def main():
+    ap = argparse.ArgumentParser(description="stream chat_logs as gzip NDJSON/CSV")
+    ap.add_argument("-o", "--output", default="-")
+    ap.add_argument("--format", choices=export.FORMATS, default="ndjson")
+    ap.add_argument("--since", type=datetime.fromisoformat, help="이상 (ISO 8601)")
+    ap.add_argument("--until", type=datetime.fromisoformat, help="미만 (ISO 8601)")
+    ap.add_argument("--festival", help="축제 이름/별칭/loc")
+    ap.add_argument("--role", choices=("user", "bot"))
+    ap.add_argument("--chunk", type=int, default=export.EXPORT_CHUNK_ROWS)
+    ap.add_argument("--no-gzip", action="store_true")
+    args = ap.parse_args()
+
+    stats = asyncio.run(run(args))
+    print(f"exported {stats.get('rows', 0):,} rows, {stats['bytes']:,} bytes "
+          f"in {stats['seconds']}s ({stats['rows_per_sec']:,} rows/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+# api/scripts/loadtest.py
+"""
+/channel/webhook 부하 측정 (프로세스 내 ASGI 구동)
+  - DB: SQLite(aiosqlite) 스탠드인 + point/message 시드
+  - 채널톡: mock_channeltalk (지연/429 주입)
+  - 페이로드: user/bot/unknown, 모든 축제×키워드, 명령어, 서명/토큰 인증 혼합
+
+  python -m api.scripts.loadtest -n 3000 -c 50 --latency-ms 30 --rate-429 0.02 [--ct-rate 10]
+  python -m api.scripts.loadtest --save base.json
+  python -m api.scripts.loadtest --baseline base.json --tolerance 0.25   # 회귀 시 exit 1
+"""
+import os, sys, json, time, hmac, base64, random, hashlib, argparse, asyncio, tempfile
+from collections import defaultdict
+
+# --- 앱 임포트 전에 환경 고정 (.env 의 실DB/실키가 쓰이지 않도록) ---
+_DB_FILE = os.path.join(tempfile.gettempdir(), f"eventlive_loadtest_{os.getpid()}.db")
+os.environ["DB_URL"] = f"sqlite+aiosqlite:///{_DB_FILE}"
+os.environ["DB_SCHEMA_CHECK"] = "always"
+os.environ["REDIS_URL"] = ""
+os.environ["CHANNEL_DEBUG"] = "false"
+os.environ["CHANNELTALK_API_BASE"] = "http://channeltalk.mock/open/v5"
+os.environ["CHANNELTALK_ACCESS_KEY"] = "loadtest-key"
+os.environ["CHANNELTALK_ACCESS_SECRET"] = "loadtest-secret"
+os.environ["CHANNELTALK_WEBHOOK_SECRET"] = "loadtest-signing-secret"
+os.environ["CHANNELTALK_WEBHOOK_TOKEN"] = "loadtest-token"
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")   # 파이프라인 처리량 측정. 한도까지 보려면 true
+
+import logging
+import httpx
+from sqlalchemy import text
+
+from api.scripts.mock_channeltalk import MockChannelTalk
+
+SECRET = os.environ["CHANNELTALK_WEBHOOK_SECRET"].encode()
+TOKEN = os.environ["CHANNELTALK_WEBHOOK_TOKEN"]
+
+FESTIVALS = {"대동제": (1, 0.0, 0.0), "락페": (2, 126.0, 37.0), "해키": (3, 0.0, 0.0)}
+POINT_KEYWORDS = {"화장실": "toilet", "무대": "stage", "안내": "helpdesk", "부스": "booth"}
+NOTICE_KEYWORDS = {"금지물품": "물품 공지", "분실물": "분실물 공지"}
+COMMANDS = ["/ping", "/help", "/history", "/inq 분실물 찾았어요"]
+FREE_TEXT = ["안녕하세요", "몇 시에 시작해요?", "주차 가능한가요", "티켓 환불 문의"]
+
+
+# ===== 시드 =====
+async def seed(points_per_type: int, rng: random.Random):
+    from api.db.session import get_session, init_models
+    await init_models(force=True)
+    async with get_session() as s:
+        await s.execute(text(
+            "create table if not exists point (id integer primary key autoincrement, loc int, "
+            "pos_type varchar(20), title varchar(100), pos_long double, pos_lati double)"
+        ))
+        await s.execute(text(
+            "create table if not exists message (id integer primary key autoincrement, loc int, "
+            "msg_type varchar(20), content text)"
+        ))
+        rows = []
+        for loc, lng, lat in FESTIVALS.values():
+            base_lng, base_lat = (lng or 127.0), (lat or 37.5)
+            for pos_type in POINT_KEYWORDS.values():
+                for i in range(points_per_type):
+                    rows.append({
+                        "loc": loc, "pos_type": pos_type, "title": f"{pos_type}-{loc}-{i}",
+                        "lng": base_lng + rng.uniform(-0.01, 0.01),
+                        "lat": base_lat + rng.uniform(-0.01, 0.01),
+                    })
+        await s.execute(text(
+            "insert into point (loc, pos_type, title, pos_long, pos_lati) values (:loc, :pos_type, :title, :lng, :lat)"
+        ), rows)
+        notices = [
+            {"loc": loc, "t": t, "c": f"[{loc}] {t} 안내문"}
+            for loc, _, _ in FESTIVALS.values() for t in NOTICE_KEYWORDS.values()
+        ]
+        await s.execute(text("insert into message (loc, msg_type, content) values (:loc, :t, :c)"), notices)
+        await s.commit()
+
+
+# ===== 페이로드 생성 =====
+def _message_payload(actor: str, chat_id: str, user_id: str, text_: str, msg_id: str) -> dict:
+    return {
+        "event": "push",
+        "type": "message",
+        "entity": {
+            "id": msg_id,
+            "chatId": chat_id,
+            "chatType": "userChat",
+            "personType": actor,
+            "personId": user_id if actor == "user" else "bot-1",
+            "plainText": text_,
+            "blocks": [{"type": "text", "value": text_}],
+        },
+        "refers": {
+            "user": {"id": user_id, "name": f"사용자 {user_id[-3:]}"},
+            "userChat": {"id": chat_id, "userId": user_id},
+        },
+    }
+
+
+def generate(n: int, users: int, dup_rate: float, rng: random.Random):
+    """(code_path, body bytes, headers, query) 목록"""
+    cases = []
+    for fest in FESTIVALS:
+        for kw in POINT_KEYWORDS:
+            cases.append(("user:point", f"{fest} {kw}"))
+        for kw in NOTICE_KEYWORDS:
+            cases.append(("user:notice", f"{fest} {kw}"))
+        cases.append(("user:festival-only", fest))
+    cases += [("user:command", c) for c in COMMANDS[:2]]
+    cases += [("user:history", COMMANDS[2]), ("user:inq", COMMANDS[3])]
+    cases += [("user:free", t) for t in FREE_TEXT]
+
+    out = []
+    last = None
+    for i in range(n):
+        if last is not None and rng.random() < dup_rate:
+            out.append(("duplicate",) + last[1:])
+            continue
+        uid = f"user-{rng.randrange(users):05d}"
+        chat = f"chat-{uid}"
+        roll = rng.random()
+        if roll < 0.80:
+            path, text_ = rng.choice(cases)
+            payload = _message_payload("user", chat, uid, text_, f"m-{i}")
+        elif roll < 0.92:
+            path = "bot"
+            payload = _message_payload("bot", chat, uid, "봇 응답입니다", f"m-{i}")
+        else:
+            path = "unknown"
+            payload = {"event": "update", "type": "userChat",
+                       "data": {"userChatId": chat, "state": "opened"},
+                       "refers": {"online": {"personType": "manager", "personId": "mgr-1"}}}
+        raw = json.dumps(payload, ensure_ascii=False).encode()
+        if rng.random() < 0.5:
+            sig = base64.b64encode(hmac.new(SECRET, raw, hashlib.sha256).digest()).decode()
+            item = (path, raw, {"X-Signature": sig}, {})
+        else:
+            item = (path, raw, {}, {"token": TOKEN})
+        out.append(item)
+        last = item
+    return out
+
+
+# ===== 측정 =====
+def pct(sorted_ms, p: float) -> float:
+    if not sorted_ms:
+        return 0.0
+    k = min(len(sorted_ms) - 1, max(0, int(round(p / 100 * (len(sorted_ms) - 1)))))
+    return sorted_ms[k]
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    from api.clients import channeltalk_client
+    from api.main import app
+
+    mock = MockChannelTalk(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        rate_429=args.rate_429, retry_after=args.retry_after, seed=args.seed,
+    )
+    mock.keep_bodies = False
+    await channeltalk_client.use_transport(mock.transport())
+    await seed(args.points, rng)
+    for h in app.router.on_startup:
+        await h()
+
+    reqs = generate(args.requests, args.users, args.dup_rate, rng)
+    lat = defaultdict(list)
+    errors = defaultdict(int)
+    q: asyncio.Queue = asyncio.Queue()
+    for r in reqs:
+        q.put_nowait(r)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://app") as client:
+        async def worker():
+            while True:
+                try:
+                    path, raw, headers, params = q.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                t0 = time.perf_counter()
+                try:
+                    r = await client.post("/channel/webhook", content=raw, headers=headers, params=params)
+                    ok = r.status_code == 200
+                except Exception:
+                    ok = False
+                lat[path].append((time.perf_counter() - t0) * 1000)
+                if not ok:
+                    errors[path] += 1
+
+        t_start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - t_start
+
+    for h in app.router.on_shutdown:
+        await h()
+
+    report = {"total": {}, "paths": {}, "mock_status": dict(mock.status), "config": vars(args)}
+    all_ms = sorted(x for v in lat.values() for x in v)
+    report["total"] = {
+        "count": len(all_ms), "elapsed_s": elapsed, "rps": len(all_ms) / elapsed if elapsed else 0.0,
+        "p50": pct(all_ms, 50), "p95": pct(all_ms, 95), "p99": pct(all_ms, 99),
+        "errors": sum(errors.values()),
+    }
+    for path, v in sorted(lat.items()):
+        v.sort()
+        report["paths"][path] = {
+            "count": len(v), "rps": len(v) / elapsed if elapsed else 0.0,
+            "p50": pct(v, 50), "p95": pct(v, 95), "p99": pct(v, 99), "errors": errors[path],
+        }
+    return report
+
+
+def print_report(rep: dict) -> None:
+    t = rep["total"]
+    print(f"== {t['count']} req in {t['elapsed_s']:.2f}s → {t['rps']:.1f} req/s, errors={t['errors']} ==")
+    print(f"{'path':<20} {'count':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'err':>4}")
+    rows = list(rep["paths"].items()) + [("TOTAL", t)]
+    for path, s in rows:
+        print(f"{path:<20} {s['count']:>6} {s['rps']:>8.1f} {s['p50']:>8.2f} {s['p95']:>8.2f} {s['p99']:>8.2f} {s['errors']:>4}")
+    print(f"mock channeltalk status: {rep['mock_status']}")
+
+
+def compare(rep: dict, base: dict, tol: float, min_samples: int = 50) -> list:
+    """req/s 가 tol 이상 떨어지거나 p95 가 tol 이상 늘면 회귀 (표본이 적은 경로는 제외)"""
+    problems = []
+    pairs = [("TOTAL", rep["total"], base.get("total"))]
+    pairs += [(p, s, base.get("paths", {}).get(p)) for p, s in rep["paths"].items()]
+    for name, cur, old in pairs:
+        if not old or min(old.get("count", 0), cur["count"]) < min_samples:
+            continue
+        if cur["p95"] > old["p95"] * (1 + tol):
+            problems.append(f"{name}: p95 {old['p95']:.2f} → {cur['p95']:.2f} ms")
+        if name == "TOTAL" and cur["rps"] < old["rps"] * (1 - tol):
+            problems.append(f"{name}: rps {old['rps']:.1f} → {cur['rps']:.1f}")
+        if cur["errors"] > old.get("errors", 0):
+            problems.append(f"{name}: errors {old.get('errors', 0)} → {cur['errors']}")
+    return problems
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", "--requests", type=int, default=2000)
+    ap.add_argument("-c", "--concurrency", type=int, default=32)
+    ap.add_argument("--users", type=int, default=200)
+    ap.add_argument("--points", type=int, default=500, help="point rows per (festival, type)")
+    ap.add_argument("--latency-ms", type=float, default=30.0)
+    ap.add_argument("--jitter-ms", type=float, default=20.0)
+    ap.add_argument("--rate-429", type=float, default=0.0)
+    ap.add_argument("--retry-after", type=float, default=0.2)
+    ap.add_argument("--ct-rate", type=float, default=0.0,
+                    help="client-side ChannelTalk rate limit req/s (0 = off, measure the app itself)")
+    ap.add_argument("--dup-rate", type=float, default=0.0, help="fraction of redelivered payloads")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--save", help="write JSON report")
+    ap.add_argument("--baseline", help="compare against a saved JSON report")
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    args = ap.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    os.environ["CHANNELTALK_RATE_PER_SEC"] = str(args.ct_rate)
+
+    try:
+        rep = asyncio.run(run(args))
+    finally:
+        if os.path.exists(_DB_FILE):
+            os.remove(_DB_FILE)
+    print_report(rep)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(rep, f, indent=2, ensure_ascii=False)
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare(rep, json.load(f), args.tolerance)
+        if problems:
+            print("REGRESSION:\n  " + "\n  ".join(problems))
+            sys.exit(1)
+        print("no regression vs baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# api/scripts/mock_channeltalk.py
+"""
+로컬 채널톡 Open API v5 스탠드인 (httpx transport)
+  POST /open/v5/user-chats/{id}/messages 만 흉내 — 지연/429 주입 가능
+
+  mock = MockChannelTalk(latency_ms=80, jitter_ms=40, rate_429=0.05)
+  await channeltalk_client.use_transport(mock.transport())
+"""
+import re, json, random, asyncio
+from collections import Counter
+
+import httpx
+
+_MSG_PATH = re.compile(r"/user-chats/([^/]+)/messages$")
+
+
+class MockChannelTalk:
+    def __init__(
+        self,
+        latency_ms: float = 50.0,
+        jitter_ms: float = 0.0,
+        rate_429: float = 0.0,
+        retry_after: float = 0.2,
+        rate_5xx: float = 0.0,
+        seed: int | None = None,
+    ):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.rate_5xx = rate_5xx
+        self.rng = random.Random(seed)
+        self.status = Counter()
+        self.sent = []          # (user_chat_id, body)
+        self.keep_bodies = True
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        m = _MSG_PATH.search(request.url.path)
+        if request.method != "POST" or not m:
+            self.status[404] += 1
+            return httpx.Response(404, json={"message": "not found"})
+        if not request.headers.get("x-access-key") or not request.headers.get("x-access-secret"):
+            self.status[401] += 1
+            return httpx.Response(401, json={"message": "unauthorized"})
+
+        roll = self.rng.random()
+        if roll < self.rate_429:
+            self.status[429] += 1
+            return httpx.Response(429, headers={"Retry-After": f"{self.retry_after:g}"}, json={"message": "too many requests"})
+        if roll < self.rate_429 + self.rate_5xx:
+            self.status[503] += 1
+            return httpx.Response(503, json={"message": "unavailable"})
+
+        body = json.loads(request.content or b"{}")
+        if self.keep_bodies:
+            self.sent.append((m.group(1), body))
+        self.status[200] += 1
+        return httpx.Response(200, json={
+            "message": {
+                "chatId": m.group(1),
+                "personType": "bot",
+                "plainText": body.get("plainText"),
+                "blocks": body.get("blocks"),
+            }
+        })
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
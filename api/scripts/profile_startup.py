@@ -0,0 +1,134 @@
+# api/scripts/profile_startup.py
+"""
+콜드 스타트 프로파일
+  1) python -X importtime 으로 `import api.main` 모듈별 임포트 시간 집계
+  2) 새 프로세스에서 임포트 → startup 훅 → 첫 요청까지 구간별 지연 측정
+
+  python -m api.scripts.profile_startup [--top 15] [--path /health] [--json out.json]
+                                        [--max-import-ms 800] [--max-first-request-ms 1500]
+한도를 넘으면 exit 1 (회귀 감지용)
+"""
+import os, sys, json, argparse, subprocess
+from collections import defaultdict
+
+FIRST_REQUEST_CHILD = r"""
+import asyncio, json, sys, time
+t0 = time.perf_counter()
+import api.main as m
+t_import = time.perf_counter()
+
+async def run(path):
+    import httpx
+    t1 = time.perf_counter()
+    for h in m.app.router.on_startup:
+        await h()
+    t2 = time.perf_counter()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=m.app), base_url="http://local") as c:
+        r = await c.get(path)
+        t3 = time.perf_counter()
+        r2 = await c.get(path)
+        t4 = time.perf_counter()
+    for h in m.app.router.on_shutdown:
+        await h()
+    return {
+        "import_ms": (t_import - t0) * 1000,
+        "startup_ms": (t2 - t1) * 1000,
+        "first_request_ms": (t3 - t2) * 1000,
+        "warm_request_ms": (t4 - t3) * 1000,
+        "status": r.status_code,
+        "status_warm": r2.status_code,
+    }
+
+print(json.dumps(asyncio.run(run(sys.argv[1]))))
+"""
+
+
+def import_profile(module: str = "api.main"):
+    """-X importtime 출력 파싱 → [(module, self_us, cumulative_us)]"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=os.environ.copy(),
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr[-2000:])
+        raise SystemExit(f"import {module} failed")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            _, rest = line.split(":", 1)
+            self_us, cum_us, name = rest.split("|", 2)
+            rows.append((name.rstrip(), int(self_us), int(cum_us)))
+        except ValueError:
+            continue
+    return rows
+
+
+def summarize(rows, top: int):
+    total_us = sum(s for _, s, _ in rows)
+    per_pkg = defaultdict(int)
+    for name, self_us, _ in rows:
+        per_pkg[name.strip().split(".")[0]] += self_us
+    slowest = sorted(rows, key=lambda r: r[2], reverse=True)[:top]
+    return total_us, sorted(per_pkg.items(), key=lambda kv: kv[1], reverse=True)[:top], slowest
+
+
+def first_request(path: str):
+    proc = subprocess.run(
+        [sys.executable, "-c", FIRST_REQUEST_CHILD, path],
+        capture_output=True, text=True, env=os.environ.copy(),
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr[-2000:])
+        raise SystemExit("first request measurement failed")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--top", type=int, default=15)
+    ap.add_argument("--path", default="/health")
+    ap.add_argument("--json", dest="json_out")
+    ap.add_argument("--max-import-ms", type=float)
+    ap.add_argument("--max-first-request-ms", type=float)
+    args = ap.parse_args()
+
+    rows = import_profile()
+    total_us, per_pkg, slowest = summarize(rows, args.top)
+    print(f"== import api.main: {total_us / 1000:.1f} ms ({len(rows)} modules) ==")
+    print("-- by top-level package (self time) --")
+    for pkg, us in per_pkg:
+        print(f"{us / 1000:8.1f} ms  {pkg}")
+    print("-- slowest modules (cumulative) --")
+    for name, _, cum in slowest:
+        print(f"{cum / 1000:8.1f} ms  {name.strip()}")
+
+    fr = first_request(args.path)
+    print(f"== first request {args.path} ==")
+    for k in ("import_ms", "startup_ms", "first_request_ms", "warm_request_ms"):
+        print(f"{k:<18} {fr[k]:8.1f} ms")
+    print(f"status {fr['status']} / {fr['status_warm']}")
+
+    report = {
+        "import_total_ms": total_us / 1000,
+        "packages_ms": {p: us / 1000 for p, us in per_pkg},
+        "first_request": fr,
+    }
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failed = []
+    if args.max_import_ms is not None and report["import_total_ms"] > args.max_import_ms:
+        failed.append(f"import {report['import_total_ms']:.1f}ms > {args.max_import_ms}ms")
+    cold = fr["startup_ms"] + fr["first_request_ms"]
+    if args.max_first_request_ms is not None and cold > args.max_first_request_ms:
+        failed.append(f"startup+first request {cold:.1f}ms > {args.max_first_request_ms}ms")
+    if failed:
+        print("REGRESSION: " + "; ".join(failed))
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
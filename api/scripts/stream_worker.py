@@ -0,0 +1,79 @@
+# api/scripts/stream_worker.py
+"""
+Redis Streams 워커 (웹훅 쪽 WEBHOOK_STREAM=true 와 함께 사용)
+  python -m api.scripts.stream_worker [--name worker-1] [--metrics-port 9102]
+코어/노드마다 프로세스를 늘리면 샤드 임대가 살아 있는 워커 수에 맞춰 나눠진다 (STREAM_SHARDS 이하까지 확장)
+SIGTERM/SIGINT: 진행 중 항목까지 처리 → 임대 반납 → write-behind flush 후 종료
+"""
+import os, signal, asyncio, argparse, logging
+
+from api.services import logs, metrics, event_stream, outbox
+
+log = logging.getLogger("api.scripts.stream_worker")
+
+
+async def _serve_metrics(port: int):
+    """GET 아무 경로나 Prometheus text 로 응답하는 최소 HTTP 서버"""
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+            body = metrics.render().encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except Exception:
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, "0.0.0.0", port)
+
+
+async def run(name: str | None, metrics_port: int) -> None:
+    from api.db.session import init_models
+    from api.db.chatlog_writer import writer as chatlog_writer
+    from api.clients.redis_client import REDIS_URL, close_redis
+    from api.clients.channeltalk_client import close_client as close_channeltalk
+    from api.routers.channel_webhook import handle_stream_event
+
+    if not REDIS_URL:
+        raise SystemExit("REDIS_URL is required for the stream worker")
+    await init_models()
+    worker = event_stream.StreamWorker(handle_stream_event, name=name)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, worker.stop)
+        except NotImplementedError:  # pragma: no cover (Windows)
+            pass
+
+    server = await _serve_metrics(metrics_port) if metrics_port else None
+    try:
+        await worker.run()
+    finally:
+        if server is not None:
+            server.close()
+        await chatlog_writer.close()
+        await outbox.close()
+        await close_channeltalk()
+        await close_redis()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="webhook stream worker")
+    ap.add_argument("--name", help="consumer 이름 (기본: host-pid-random)")
+    ap.add_argument("--metrics-port", type=int, default=int(os.getenv("STREAM_WORKER_METRICS_PORT", "0")))
+    args = ap.parse_args()
+    logs.setup()
+    try:
+        asyncio.run(run(args.name, args.metrics_port))
+    finally:
+        logs.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+# api/services/archive.py
+"""
+chat_logs 보관(아카이브)
+- 보존 기간(CHATLOG_HOT_MONTHS)을 지난 월을 gzip NDJSON 파일로 옮기고 DB 에서 삭제
+  MySQL 월 파티션이면 DROP PARTITION, 아니면(SQLite/전환 전) id 청크 단위 DELETE
+- 파일 행 수가 DB COUNT 와 일치할 때만 삭제, 삭제가 끝난 뒤에야 manifest.json 에 올린다
+  (삭제가 실패하면 파일을 버리고 다음 실행에서 같은 달을 처음부터 — 같은 행이 두 파일에 남지 않도록)
+- iter_archived 로 보관 구간 조회 (파일 순차 스캔)
+"""
+import os, gzip, json, time, asyncio, hashlib, logging
+from datetime import date, datetime
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import select, delete, func
+
+from api.db.models import ChatLog
+from api.db import partitions as P
+from api.services import export
+
+CHATLOG_ARCHIVE_DIR  = Path(os.getenv("CHATLOG_ARCHIVE_DIR", "./archive/chat_logs"))
+CHATLOG_HOT_MONTHS   = int(os.getenv("CHATLOG_HOT_MONTHS", "3"))      # 이번 달 포함 DB 에 남길 개월 수
+CHATLOG_DELETE_CHUNK = int(os.getenv("CHATLOG_DELETE_CHUNK", "5000"))
+
+log = logging.getLogger(__name__)
+
+
+# ===== manifest =====
+def _manifest_path() -> Path:
+    return CHATLOG_ARCHIVE_DIR / "manifest.json"
+
+
+def load_manifest() -> List[dict]:
+    try:
+        with open(_manifest_path(), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def _save_manifest(entries: List[dict]) -> None:
+    CHATLOG_ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = _manifest_path().with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(sorted(entries, key=lambda e: (e["month"], e["file"])), f, ensure_ascii=False, indent=1)
+    os.replace(tmp, _manifest_path())
+
+
+def _archive_file(month: date) -> Path:
+    """같은 달을 다시 보관하면(늦게 들어온 행 등) .1, .2 ... 로 이어 붙인다"""
+    base = f"chat_logs-{month:%Y-%m}"
+    path = CHATLOG_ARCHIVE_DIR / f"{base}.ndjson.gz"
+    n = 0
+    while path.exists():
+        n += 1
+        path = CHATLOG_ARCHIVE_DIR / f"{base}.{n}.ndjson.gz"
+    return path
+
+
+# ===== 대상 구간 =====
+class ColdRange:
+    __slots__ = ("month", "since", "until", "partition")
+
+    def __init__(self, month: date, since: Optional[date], until: date, partition: Optional[str]):
+        self.month = month
+        self.since = since           # None = 처음부터 (첫 파티션)
+        self.until = until
+        self.partition = partition   # MySQL 파티션 이름 (없으면 DELETE)
+
+    def __repr__(self) -> str:
+        return f"ColdRange({self.month:%Y-%m}, {self.since}..{self.until}, {self.partition})"
+
+
+def hot_boundary(today: Optional[date] = None, hot_months: int = CHATLOG_HOT_MONTHS) -> date:
+    """이 날짜 이전은 cold"""
+    return P.add_months(P.month_start(today or date.today()), -(max(1, hot_months) - 1))
+
+
+async def cold_ranges(boundary: date) -> List[ColdRange]:
+    from api.db.session import get_engine
+    async with get_engine().connect() as conn:
+        parts = await P.list_partitions(conn)
+        if parts:
+            out, lower = [], None
+            for p in parts:
+                m = P.month_of(p.name)
+                if m is None or p.bound is None:
+                    break
+                until = date.fromisoformat(p.bound[:10])
+                if until > boundary:
+                    break
+                out.append(ColdRange(m, lower, until, p.name))
+                lower = until
+            return out
+
+        first = (await conn.execute(
+            select(func.min(ChatLog.created_at)).where(ChatLog.created_at < boundary)
+        )).scalar()
+    if first is None:
+        return []
+    if isinstance(first, str):   # SQLite 원시 문자열 대비
+        first = datetime.fromisoformat(first)
+    out, m = [], P.month_start(first.date() if isinstance(first, datetime) else first)
+    while m < boundary:
+        out.append(ColdRange(m, m, P.add_months(m, 1), None))
+        m = P.add_months(m, 1)
+    return out
+
+
+# ===== 보관 =====
+async def _count(r: ColdRange) -> int:
+    from api.db.session import get_session
+    conds = [ChatLog.created_at < r.until]
+    if r.since is not None:
+        conds.append(ChatLog.created_at >= r.since)
+    async with get_session() as s:
+        return int((await s.execute(select(func.count()).select_from(ChatLog).where(*conds))).scalar() or 0)
+
+
+async def _delete_range(r: ColdRange) -> int:
+    from api.db.session import get_session, get_engine
+    if r.partition:
+        async with get_engine().begin() as conn:
+            await P.drop_partition(conn, r.partition)
+        return -1
+    deleted = 0
+    conds = [ChatLog.created_at < r.until]
+    if r.since is not None:
+        conds.append(ChatLog.created_at >= r.since)
+    # 한 트랜잭션 (청크는 문장 크기만 나눈다) — 실패하면 하나도 지워지지 않아 파일만 버리고 다시 하면 된다
+    async with get_session() as s:
+        while True:
+            ids = (await s.execute(select(ChatLog.id).where(*conds).limit(CHATLOG_DELETE_CHUNK))).scalars().all()
+            if not ids:
+                break
+            await s.execute(delete(ChatLog).where(ChatLog.id.in_(ids)))
+            deleted += len(ids)
+        await s.commit()
+    return deleted
+
+
+async def archive_range(r: ColdRange, *, dry_run: bool = False) -> Dict:
+    """한 달치를 파일로 쓰고, 행 수가 맞으면 DB 에서 제거"""
+    expected = await _count(r)
+    result = {"month": f"{r.month:%Y-%m}", "partition": r.partition, "rows": expected}
+    if dry_run:
+        return result
+    if expected == 0:
+        if r.partition:
+            await _delete_range(r)
+            result["dropped"] = True
+        return result
+
+    CHATLOG_ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+    path = _archive_file(r.month)
+    tmp = path.with_name(path.name + ".part")
+    stats: dict = {}
+    h = hashlib.sha256()
+    t0 = time.perf_counter()
+    since = datetime.combine(r.since, datetime.min.time()) if r.since else None
+    until = datetime.combine(r.until, datetime.min.time())
+    with open(tmp, "wb") as f:
+        async for chunk in export.gzip_stream(export.export_rows("ndjson", since=since, until=until, stats=stats)):
+            f.write(chunk)
+            h.update(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+
+    if stats.get("rows", 0) != expected:
+        tmp.unlink(missing_ok=True)
+        raise RuntimeError(f"archive {result['month']}: wrote {stats.get('rows', 0)} rows, expected {expected}")
+    os.replace(tmp, path)
+
+    try:
+        deleted = await _delete_range(r)
+    except Exception:
+        path.unlink(missing_ok=True)
+        raise
+
+    entries = load_manifest()
+    entries.append({
+        "month": result["month"],
+        "file": path.name,
+        "rows": expected,
+        "since": r.since.isoformat() if r.since else None,
+        "until": r.until.isoformat(),
+        "sha256": h.hexdigest(),
+        "archived_at": datetime.now().isoformat(timespec="seconds"),
+    })
+    _save_manifest(entries)
+
+    result.update(file=str(path), seconds=round(time.perf_counter() - t0, 2),
+                  dropped=bool(r.partition), deleted=deleted if deleted >= 0 else expected)
+    log.info("archived chat_logs %s: %d rows -> %s", result["month"], expected, path.name)
+    return result
+
+
+async def archive_cold(hot_months: int = CHATLOG_HOT_MONTHS, *, dry_run: bool = False) -> List[Dict]:
+    out = []
+    for r in await cold_ranges(hot_boundary(hot_months=hot_months)):
+        out.append(await archive_range(r, dry_run=dry_run))
+    return out
+
+
+# ===== 조회 =====
+def _read_batch(fh, n: int) -> List[bytes]:
+    out = []
+    for _ in range(n):
+        line = fh.readline()
+        if not line:
+            break
+        out.append(line)
+    return out
+
+
+async def iter_archived(
+    *,
+    user_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    role: Optional[str] = None,
+) -> AsyncIterator[dict]:
+    """
+    보관 파일에서 조건에 맞는 행을 id 순으로 (월 단위 파일 순차 스캔, 파일 I/O 는 스레드에서)
+    """
+    from api.services.webhook_event import loads
+
+    lo = since.isoformat() if since else None
+    hi = until.isoformat() if until else None
+    for e in load_manifest():
+        if since is not None and e["until"] <= since.date().isoformat():
+            continue
+        if until is not None and e.get("since") and e["since"] > until.date().isoformat():
+            continue
+        path = CHATLOG_ARCHIVE_DIR / e["file"]
+        if not path.exists():
+            log.warning("archive file missing: %s", path)
+            continue
+        fh = await asyncio.to_thread(gzip.open, path, "rb")
+        try:
+            while True:
+                lines = await asyncio.to_thread(_read_batch, fh, 2000)
+                if not lines:
+                    break
+                for line in lines:
+                    row = loads(line)
+                    if user_id is not None and row.get("channel_user_id") != user_id:
+                        continue
+                    if role is not None and row.get("role") != role:
+                        continue
+                    ts = row.get("created_at") or ""
+                    if (lo and ts < lo) or (hi and ts >= hi):
+                        continue
+                    yield row
+        finally:
+            fh.close()
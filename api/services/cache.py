@@ -0,0 +1,207 @@
+# api/services/cache.py
+import os, json, time, asyncio, logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from api.clients.redis_client import get_redis
+
+CACHE_PREFIX     = os.getenv("CACHE_PREFIX", "eventlive:")
+CACHE_TTL        = float(os.getenv("CACHE_TTL", "300"))        # Redis TTL(초)
+CACHE_LOCAL_TTL  = float(os.getenv("CACHE_LOCAL_TTL", "10"))   # 프로세스 LRU TTL(초)
+CACHE_LOCAL_SIZE = int(os.getenv("CACHE_LOCAL_SIZE", "1024"))
+CACHE_LOCK_TTL   = float(os.getenv("CACHE_LOCK_TTL", "5"))     # 재계산 락 유지(초)
+CACHE_LOCK_WAIT  = float(os.getenv("CACHE_LOCK_WAIT", "1"))    # 락 대기 최대(초)
+
+log = logging.getLogger(__name__)
+
+_MISS = object()
+
+
+class LocalLRU:
+    """프로세스 로컬 LRU + 항목별 만료"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return _MISS
+        exp, value = item
+        if exp < time.monotonic():
+            self._data.pop(key, None)
+            return _MISS
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        for k in [k for k in self._data if k.startswith(prefix)]:
+            self._data.pop(k, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_local = LocalLRU(CACHE_LOCAL_SIZE)
+_inflight: Dict[str, "asyncio.Future[Any]"] = {}
+stats = {"local_hit": 0, "redis_hit": 0, "miss": 0, "load": 0, "redis_error": 0}
+
+
+def _dumps(value: Any) -> str:
+    # None도 캐시하기 위해 {"v": ...}로 감싼다. Decimal/datetime 등은 문자열로
+    return json.dumps({"v": value}, ensure_ascii=False, default=str)
+
+
+def _loads(raw: Any) -> Any:
+    return json.loads(raw)["v"]
+
+
+async def _redis_get(key: str) -> Any:
+    r = get_redis()
+    if r is None:
+        return _MISS
+    try:
+        raw = await r.get(CACHE_PREFIX + key)
+    except Exception as e:
+        stats["redis_error"] += 1
+        log.warning("cache redis get failed key=%s err=%r", key, e)
+        return _MISS
+    return _MISS if raw is None else _loads(raw)
+
+
+async def _redis_set(key: str, value: Any, ttl: float) -> None:
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        await r.set(CACHE_PREFIX + key, _dumps(value), px=int(ttl * 1000))
+    except Exception as e:
+        stats["redis_error"] += 1
+        log.warning("cache redis set failed key=%s err=%r", key, e)
+
+
+async def _load_shared(key: str, loader: Callable[[], Awaitable[Any]], ttl: float) -> Any:
+    """
+    Redis 조회 → 미스면 분산 락(SET NX)을 잡은 인스턴스만 loader 실행.
+    락을 못 잡은 쪽은 CACHE_LOCK_WAIT 동안 값이 채워지길 기다렸다가, 그래도 없으면 직접 로드.
+    """
+    value = await _redis_get(key)
+    if value is not _MISS:
+        stats["redis_hit"] += 1
+        return value
+
+    stats["miss"] += 1
+    r = get_redis()
+    got_lock = True
+    lock_key = f"{CACHE_PREFIX}lock:{key}"
+    if r is not None:
+        try:
+            got_lock = bool(await r.set(lock_key, "1", nx=True, px=int(CACHE_LOCK_TTL * 1000)))
+        except Exception:
+            stats["redis_error"] += 1
+            got_lock = True
+
+    if not got_lock:
+        deadline = time.monotonic() + CACHE_LOCK_WAIT
+        delay = 0.02
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.2)
+            value = await _redis_get(key)
+            if value is not _MISS:
+                stats["redis_hit"] += 1
+                return value
+
+    try:
+        stats["load"] += 1
+        value = await loader()
+        await _redis_set(key, value, ttl)
+        return value
+    finally:
+        if r is not None and got_lock:
+            try:
+                await r.delete(lock_key)
+            except Exception:
+                stats["redis_error"] += 1
+
+
+async def get_or_load(
+    key: str,
+    loader: Callable[[], Awaitable[Any]],
+    ttl: Optional[float] = None,
+) -> Any:
+    """
+    read-through 캐시: 로컬 LRU → Redis → loader 순서.
+    같은 프로세스 안의 동시 미스는 하나의 loader 호출로 합쳐진다(single-flight).
+    값은 JSON 직렬화 가능해야 한다.
+    """
+    ttl = CACHE_TTL if ttl is None else ttl
+    value = _local.get(key)
+    if value is not _MISS:
+        stats["local_hit"] += 1
+        return value
+
+    fut = _inflight.get(key)
+    if fut is not None:
+        return await asyncio.shield(fut)
+
+    fut = asyncio.get_running_loop().create_future()
+    _inflight[key] = fut
+    try:
+        value = await _load_shared(key, loader, ttl)
+        _local.set(key, value, min(ttl, CACHE_LOCAL_TTL))
+        fut.set_result(value)
+        return value
+    except BaseException as e:
+        fut.set_exception(e)
+        # 대기자가 없으면 "exception was never retrieved" 경고 방지
+        fut.exception()
+        raise
+    finally:
+        _inflight.pop(key, None)
+
+
+async def invalidate(key: str) -> None:
+    """해당 키를 로컬/Redis 양쪽에서 제거 (다른 인스턴스 로컬 LRU는 CACHE_LOCAL_TTL 내 만료)"""
+    _local.delete(key)
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        await r.delete(CACHE_PREFIX + key)
+    except Exception as e:
+        stats["redis_error"] += 1
+        log.warning("cache redis delete failed key=%s err=%r", key, e)
+
+
+async def invalidate_prefix(prefix: str) -> None:
+    _local.delete_prefix(prefix)
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        keys = [k async for k in r.scan_iter(match=f"{CACHE_PREFIX}{prefix}*", count=500)]
+        if keys:
+            await r.delete(*keys)
+    except Exception as e:
+        stats["redis_error"] += 1
+        log.warning("cache redis delete failed prefix=%s err=%r", prefix, e)
+
+
+# ===== 도메인 키 =====
+def notice_key(loc: int, msg_type: str) -> str:
+    return f"notice:{int(loc)}:{msg_type}"
+
+
+def point_key(loc: int, pos_type: str) -> str:
+    return f"point:v2:{int(loc)}:{pos_type}"   # v2: (id, title, lng, lat) 좁은 컬럼
@@ -0,0 +1,79 @@
+# api/services/dedup.py
+import os, time, logging
+from collections import OrderedDict
+
+from api.clients.redis_client import get_redis
+
+DEDUP_TTL    = float(os.getenv("DEDUP_TTL", "600"))     # 재전송 허용 창(초)
+DEDUP_MAX    = int(os.getenv("DEDUP_MAX", "50000"))     # 로컬 보관 최대 키 수
+DEDUP_PREFIX = os.getenv("DEDUP_PREFIX", "eventlive:dedup:")
+
+log = logging.getLogger(__name__)
+
+
+class Deduplicator:
+    """
+    웹훅 재전송 중복 제거.
+    로컬: TTL 창을 가진 bounded OrderedDict (삽입 순 = 만료 순)
+    공유: Redis SET NX EX — 다른 인스턴스가 먼저 받은 이벤트도 걸러낸다
+    """
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+        self.stats = {"hit": 0, "miss": 0, "local_hit": 0, "redis_hit": 0, "redis_error": 0}
+
+    def _evict(self, now: float) -> None:
+        seen = self._seen
+        while seen:
+            k, exp = next(iter(seen.items()))
+            if exp > now and len(seen) <= self.maxsize:
+                break
+            seen.popitem(last=False)
+
+    async def is_duplicate(self, key: str) -> bool:
+        """처음 보는 키면 기록하고 False, 창 안에서 이미 본 키면 True"""
+        now = time.monotonic()
+        self._evict(now)
+
+        exp = self._seen.get(key)
+        if exp is not None and exp > now:
+            self.stats["hit"] += 1
+            self.stats["local_hit"] += 1
+            return True
+        self._seen[key] = now + self.ttl
+        self._seen.move_to_end(key)
+
+        r = get_redis()
+        if r is not None:
+            try:
+                fresh = await r.set(DEDUP_PREFIX + key, "1", nx=True, px=int(self.ttl * 1000))
+                if not fresh:
+                    self.stats["hit"] += 1
+                    self.stats["redis_hit"] += 1
+                    return True
+            except Exception as e:
+                # Redis 장애 시 로컬 판단만으로 진행
+                self.stats["redis_error"] += 1
+                log.warning("dedup redis failed key=%s err=%r", key, e)
+
+        self.stats["miss"] += 1
+        return False
+
+    async def forget(self, key: str) -> None:
+        """처리 실패 시 호출: 재전송이 다시 처리되도록 기록 삭제"""
+        self._seen.pop(key, None)
+        r = get_redis()
+        if r is not None:
+            try:
+                await r.delete(DEDUP_PREFIX + key)
+            except Exception as e:
+                self.stats["redis_error"] += 1
+                log.warning("dedup redis forget failed key=%s err=%r", key, e)
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+
+dedup = Deduplicator(DEDUP_TTL, DEDUP_MAX)
@@ -0,0 +1,371 @@
+# api/services/event_stream.py
+"""
+Redis Streams 워커 모드 (WEBHOOK_STREAM=true)
+- 웹훅은 검증/파싱한 이벤트를 user_chat_id 해시로 고른 샤드 스트림에 XADD 하고 바로 200
+- 워커 프로세스(api.scripts.stream_worker)는 샤드 임대(lease)를 잡은 스트림만 소비한다.
+  한 샤드는 한 시점에 한 워커만, 순서대로 처리하므로 상담별 순서가 유지되고
+  샤드 수만큼 코어/노드로 나눠진다. 살아 있는 워커 수에 맞춰 임대를 나눠 갖는다
+- 처리 성공 시 XACK. 실패하면 그 자리에서 backoff 로 재시도하고 (뒤 항목으로 넘어가지 않아 순서 유지)
+  STREAM_MAX_DELIVERIES 번 실패하면 dead-letter 스트림으로 옮긴 뒤 다음 항목으로
+- 워커가 죽어 남은 pending 은 STREAM_CLAIM_IDLE_MS 뒤 XAUTOCLAIM 으로 이어받는다
+- 샤드 임대를 새로 잡으면 이전 소유자의 pending 부터 처리 (순서 보존)
+"""
+import os, time, uuid, zlib, socket, asyncio, logging
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from api.clients.redis_client import get_redis, REDIS_URL
+
+WEBHOOK_STREAM         = os.getenv("WEBHOOK_STREAM", "false").lower() in ("1", "true", "yes", "y")
+STREAM_PREFIX          = os.getenv("STREAM_PREFIX", "eventlive:events:")
+STREAM_SHARDS          = int(os.getenv("STREAM_SHARDS", "8"))
+STREAM_GROUP           = os.getenv("STREAM_GROUP", "webhook-workers")
+STREAM_MAXLEN          = int(os.getenv("STREAM_MAXLEN", "100000"))     # 샤드당 대략적 상한 (XADD MAXLEN ~)
+STREAM_BATCH           = int(os.getenv("STREAM_BATCH", "32"))
+STREAM_BLOCK_MS        = int(os.getenv("STREAM_BLOCK_MS", "2000"))
+STREAM_CLAIM_IDLE_MS   = int(os.getenv("STREAM_CLAIM_IDLE_MS", "30000"))
+STREAM_MAX_DELIVERIES  = int(os.getenv("STREAM_MAX_DELIVERIES", "5"))
+STREAM_LEASE_MS        = int(os.getenv("STREAM_LEASE_MS", "15000"))
+STREAM_RETRY_BASE_MS   = int(os.getenv("STREAM_RETRY_BASE_MS", "200"))    # 제자리 재시도 간격, 시도마다 2배
+STREAM_RETRY_MAX_MS    = int(os.getenv("STREAM_RETRY_MAX_MS", "5000"))
+
+log = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, str]], Awaitable[None]]
+
+stats = {"published": 0, "publish_error": 0, "processed": 0, "failed": 0, "retried": 0,
+         "reclaimed": 0, "dead_lettered": 0, "leases_acquired": 0, "leases_lost": 0}
+lag: Dict[str, int] = {}        # 샤드별 미처리(lag) + pending, 워커가 주기적으로 갱신
+
+# 내 임대일 때만 연장/해제 (값 = 워커 이름)
+_LUA_RENEW = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_LUA_RELEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def enabled() -> bool:
+    return WEBHOOK_STREAM and bool(REDIS_URL)
+
+
+def shard_of(chat_id: str, shards: int = STREAM_SHARDS) -> int:
+    return zlib.crc32(chat_id.encode()) % shards
+
+
+def stream_key(shard: int) -> str:
+    return f"{STREAM_PREFIX}{shard}"
+
+
+def _dead_key() -> str:
+    return f"{STREAM_PREFIX}dead"
+
+
+def _s(v) -> str:
+    return v.decode() if isinstance(v, bytes) else str(v)
+
+
+# ===== 생산자 (웹훅) =====
+async def publish(chat_id: str, fields: Dict[str, str]) -> Optional[str]:
+    """이벤트를 샤드 스트림에 추가하고 entry id 반환. Redis 오류면 None (호출 쪽에서 직접 처리)"""
+    r = get_redis()
+    if r is None:
+        return None
+    try:
+        eid = await r.xadd(
+            stream_key(shard_of(chat_id)),
+            {k: v for k, v in fields.items() if v is not None},
+            maxlen=STREAM_MAXLEN, approximate=True,
+        )
+        stats["published"] += 1
+        return _s(eid)
+    except Exception as e:
+        stats["publish_error"] += 1
+        log.warning("stream publish failed chat=%s: %r", chat_id, e)
+        return None
+
+
+async def stream_lag(r=None) -> Dict[str, Dict[str, int]]:
+    """샤드별 길이/lag/pending (XINFO GROUPS). lag 은 Redis 7 미만이면 -1"""
+    r = r or get_redis()
+    out: Dict[str, Dict[str, int]] = {}
+    if r is None:
+        return out
+    for shard in range(STREAM_SHARDS):
+        key = stream_key(shard)
+        try:
+            length = await r.xlen(key)
+            groups = await r.xinfo_groups(key) if length else []
+        except Exception:
+            continue
+        info = {"length": int(length), "lag": int(length), "pending": 0}   # 그룹이 아직 없으면 전부 미처리
+        for g in groups:
+            if _s(g.get("name") or g.get(b"name")) == STREAM_GROUP:
+                lag_v = g.get("lag", g.get(b"lag"))
+                info["lag"] = -1 if lag_v is None else int(lag_v)
+                info["pending"] = int(g.get("pending", g.get(b"pending")) or 0)
+        out[str(shard)] = info
+    return out
+
+
+# ===== 소비자 (워커) =====
+class StreamWorker:
+    """
+    샤드 임대 + consumer group 소비자. handler 는 필드 dict 를 받아 처리 (예외 = 실패 → 재시도)
+    """
+
+    def __init__(self, handler: Handler, *, name: Optional[str] = None, redis=None, shards: int = STREAM_SHARDS):
+        self.handler = handler
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.shards = shards
+        self._redis = redis
+        self._owned: Dict[int, asyncio.Task] = {}
+        self._revoked: set = set()      # 반납 예정 샤드 — 처리 중인 항목까지만 끝내고 멈춘다
+        self._stopping = asyncio.Event()
+        self._renew = self._release = None
+
+    def _r(self):
+        if self._redis is None:
+            import redis.asyncio as aioredis
+            # XREADGROUP BLOCK 동안 소켓 타임아웃이 나지 않도록 별도 클라이언트
+            self._redis = aioredis.from_url(
+                REDIS_URL,
+                socket_timeout=STREAM_BLOCK_MS / 1000 + 5,
+                socket_connect_timeout=float(os.getenv("REDIS_TIMEOUT", "0.5")),
+                health_check_interval=30,
+            )
+        return self._redis
+
+    def _lease_key(self, shard: int) -> str:
+        return f"{STREAM_PREFIX}lease:{shard}"
+
+    def _workers_key(self) -> str:
+        return f"{STREAM_PREFIX}workers"
+
+    async def _ensure_groups(self) -> None:
+        r = self._r()
+        for shard in range(self.shards):
+            try:
+                await r.xgroup_create(stream_key(shard), STREAM_GROUP, id="0", mkstream=True)
+            except Exception as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    # --- 임대 ---
+    async def _fair_share(self) -> int:
+        """살아 있는 워커 수로 나눈 샤드 몫 (올림)"""
+        r = self._r()
+        now = time.time()
+        await r.zadd(self._workers_key(), {self.name: now})
+        await r.zremrangebyscore(self._workers_key(), 0, now - STREAM_LEASE_MS / 1000)
+        live = max(1, int(await r.zcard(self._workers_key())))
+        return -(-self.shards // live)
+
+    async def _renew_owned(self) -> None:
+        """가진 임대 연장. 못 하면(만료/뺏김) 그 샤드 소비를 멈춘다"""
+        for shard, task in list(self._owned.items()):
+            ok = int(await self._renew(keys=[self._lease_key(shard)], args=[self.name, STREAM_LEASE_MS]))
+            if not ok or task.done():
+                task.cancel()
+                self._owned.pop(shard, None)
+                stats["leases_lost"] += 1
+                log.warning("stream lease lost shard=%d", shard)
+
+    async def _release_surplus(self, share: int) -> None:
+        """
+        몫보다 많이 갖고 있으면 반납 (다른 워커가 가져가도록).
+        남는 샤드를 한꺼번에 멈추고 함께 기다린다 — 하나씩 기다리면 그동안 남길 임대가 만료될 수 있다
+        """
+        surplus = []
+        while len(self._owned) > share:
+            shard, task = self._owned.popitem()
+            self._revoked.add(shard)
+            surplus.append((shard, task))
+        if not surplus:
+            return
+        tasks = [t for _, t in surplus]
+        await asyncio.wait(tasks, timeout=STREAM_BLOCK_MS / 1000 + 5)
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for shard, _ in surplus:
+            self._revoked.discard(shard)
+            await self._release(keys=[self._lease_key(shard)], args=[self.name])
+            log.info("stream lease released shard=%d", shard)
+        # 기다리는 동안 지난 시간만큼 남긴 임대와 생존 표시를 다시 연장
+        await self._renew_owned()
+        await self._fair_share()
+
+    async def _rebalance(self) -> None:
+        r = self._r()
+        if self._renew is None:
+            self._renew = r.register_script(_LUA_RENEW)
+            self._release = r.register_script(_LUA_RELEASE)
+
+        await self._renew_owned()
+        share = await self._fair_share()
+        await self._release_surplus(share)
+
+        for shard in range(self.shards):
+            if len(self._owned) >= share:
+                break
+            if shard in self._owned:
+                continue
+            if await r.set(self._lease_key(shard), self.name, nx=True, px=STREAM_LEASE_MS):
+                stats["leases_acquired"] += 1
+                self._owned[shard] = asyncio.create_task(self._consume(shard))
+                log.info("stream lease acquired shard=%d", shard)
+
+    # --- 처리 ---
+    async def _handle(self, shard: int, key: str, eid, fields) -> bool:
+        """
+        한 항목을 ack 또는 dead-letter 될 때까지 제자리에서 재시도 (실패한 항목을 건너뛰면 같은 상담의 다음
+        이벤트가 먼저 처리되므로). 재시도 대기 중 임대 반납/종료면 False — 항목은 pending 으로 다음 소유자에게
+        """
+        data = {_s(k): _s(v) for k, v in fields.items()}
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                await self.handler(data)
+            except Exception:
+                stats["failed"] += 1
+                log.exception("stream event failed shard=%s id=%s attempt=%d", key, _s(eid), attempt)
+                if attempt >= STREAM_MAX_DELIVERIES:
+                    await self._dead_letter(key, eid, fields)
+                    return True
+                if not await self._retry_wait(shard, attempt):
+                    return False
+                stats["retried"] += 1
+                continue
+            await self._r().xack(key, STREAM_GROUP, eid)
+            stats["processed"] += 1
+            return True
+
+    async def _retry_wait(self, shard: int, attempt: int) -> bool:
+        """재시도 전 backoff. 그 사이 종료/반납이 정해지면 False"""
+        delay = min(STREAM_RETRY_MAX_MS, STREAM_RETRY_BASE_MS * (2 ** (attempt - 1))) / 1000
+        try:
+            await asyncio.wait_for(self._stopping.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+        return not self._stopping.is_set() and shard not in self._revoked
+
+    async def _dead_letter(self, key: str, eid, fields) -> None:
+        r = self._r()
+        await r.xadd(_dead_key(), {**fields, b"stream": key, b"id": eid}, maxlen=STREAM_MAXLEN, approximate=True)
+        await r.xack(key, STREAM_GROUP, eid)
+        stats["dead_lettered"] += 1
+        log.error("stream event dead-lettered shard=%s id=%s", key, _s(eid))
+
+    async def _reclaim(self, key: str, min_idle_ms: int) -> List:
+        """
+        여러 소유자를 거치며 너무 여러 번 배달된 항목(처리 중 워커가 죽는 항목)은 dead-letter 로,
+        나머지 idle pending 은 내 것으로 가져온다
+        """
+        r = self._r()
+        pending = await r.xpending_range(key, STREAM_GROUP, min="-", max="+", count=STREAM_BATCH, idle=min_idle_ms)
+        for p in pending:
+            if int(p["times_delivered"]) >= STREAM_MAX_DELIVERIES:
+                eid = p["message_id"]
+                rows = await r.xrange(key, min=eid, max=eid)
+                if rows:
+                    await self._dead_letter(key, eid, rows[0][1])
+                else:
+                    await r.xack(key, STREAM_GROUP, eid)   # trim 으로 본문이 사라진 항목
+        res = await r.xautoclaim(key, STREAM_GROUP, self.name, min_idle_time=min_idle_ms,
+                                 start_id="0-0", count=STREAM_BATCH)
+        claimed = [m for m in res[1] if m and m[1]]
+        stats["reclaimed"] += len(claimed)
+        return claimed
+
+    async def _consume(self, shard: int) -> None:
+        key = stream_key(shard)
+        r = self._r()
+        # 임대 직후: 이전 소유자가 남긴 pending 을 먼저 (idle 무관)
+        min_idle = 0
+        last_reclaim = 0.0
+        while not self._stopping.is_set() and shard not in self._revoked:
+            try:
+                if min_idle == 0 or time.monotonic() - last_reclaim > STREAM_CLAIM_IDLE_MS / 1000:
+                    claimed = await self._reclaim(key, min_idle)
+                    last_reclaim = time.monotonic()
+                    if not await self._handle_batch(shard, key, claimed):
+                        break
+                    if claimed and min_idle == 0:
+                        continue
+                    min_idle = STREAM_CLAIM_IDLE_MS
+                resp = await r.xreadgroup(STREAM_GROUP, self.name, {key: ">"},
+                                          count=STREAM_BATCH, block=STREAM_BLOCK_MS)
+                for _, entries in resp or ():
+                    if not await self._handle_batch(shard, key, entries):
+                        break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("stream consume error shard=%d: %r", shard, e)
+                min_idle = 0     # 읽어 두고 처리 못 한 항목(pending)부터 다시 — 새 항목이 앞지르지 않도록
+                await asyncio.sleep(1)
+
+    async def _handle_batch(self, shard: int, key: str, entries) -> bool:
+        """순서대로 처리. 반납/종료로 중간에 멈추면 False (남은 항목은 pending 으로 다음 소유자에게)"""
+        for eid, fields in entries:
+            if shard in self._revoked or not await self._handle(shard, key, eid, fields):
+                return False
+        return True
+
+    async def _update_lag(self) -> None:
+        try:
+            lag.clear()
+            for shard, info in (await stream_lag(self._r())).items():
+                lag[shard] = max(0, info["lag"]) + info["pending"]
+        except Exception as e:
+            log.warning("stream lag update failed: %r", e)
+
+    async def run(self) -> None:
+        await self._ensure_groups()
+        log.info("stream worker %s started (%d shards)", self.name, self.shards)
+        tick = STREAM_LEASE_MS / 3000
+        try:
+            while not self._stopping.is_set():
+                try:
+                    await self._rebalance()
+                    await self._update_lag()
+                except Exception as e:
+                    log.warning("stream rebalance failed: %r", e)
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), tick)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await self._shutdown()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def _shutdown(self) -> None:
+        """진행 중 배치는 끝까지 기다리고 임대 반납 (미처리 항목은 다음 소유자가 이어받는다)"""
+        tasks = list(self._owned.values())
+        if tasks:
+            await asyncio.wait(tasks, timeout=STREAM_BLOCK_MS / 1000 + 5)
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        r = self._r()
+        for shard in list(self._owned):
+            try:
+                await r.eval(_LUA_RELEASE, 1, self._lease_key(shard), self.name)
+            except Exception:
+                pass
+        self._owned.clear()
+        try:
+            await r.zrem(self._workers_key(), self.name)
+        except Exception:
+            pass
+        log.info("stream worker %s stopped", self.name)
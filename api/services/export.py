@@ -0,0 +1,133 @@
+# api/services/export.py
+"""
+chat_logs 스트리밍 내보내기 (NDJSON / CSV, gzip)
+- 서버 사이드 커서(session.stream + yield_per)로 chunk 단위 읽기 → 메모리 사용량은 행 수와 무관
+- chat_logs 에 축제 컬럼이 없으므로 축제 필터는 "기간 내 축제 이름/별칭을 언급한 사용자의 대화"
+"""
+import os, io, csv, json, zlib
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import select, or_
+
+from api.db.models import ChatLog
+
+try:  # 선택 의존성
+    import orjson as _orjson
+except ImportError:  # pragma: no cover
+    _orjson = None
+
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "2000"))
+EXPORT_GZIP_LEVEL = int(os.getenv("EXPORT_GZIP_LEVEL", "6"))
+
+FORMATS = ("ndjson", "csv")
+COLUMNS = ("id", "channel_user_id", "role", "message", "created_at")
+
+
+def festival_terms(name: str) -> list[str]:
+    """축제 이름 → 이름 + 별칭 (intent_router 스냅샷 기준). 모르는 이름이면 그대로"""
+    from api.services import intent_router
+    key = name.strip().lower()
+    for f in intent_router.current().festivals:
+        terms = (f.name, *f.aliases)
+        if key in (t.lower() for t in terms) or key == str(f.loc):
+            return list(terms)
+    return [name.strip()]
+
+
+def build_query(
+    *,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    festival: Optional[str] = None,
+    role: Optional[str] = None,
+):
+    cols = [getattr(ChatLog, c) for c in COLUMNS]
+    time_conds = []
+    if since is not None:
+        time_conds.append(ChatLog.created_at >= since)
+    if until is not None:
+        time_conds.append(ChatLog.created_at < until)
+    conds = list(time_conds)
+    if role is not None:
+        conds.append(ChatLog.role == role)
+    if festival:
+        # 언급한 사용자는 기간만으로 고른다 (role 은 내보낼 행에만 — 사용자 본인 메시지의 언급을 놓치지 않도록)
+        mention = or_(*(ChatLog.message.contains(t, autoescape=True) for t in festival_terms(festival)))
+        users = select(ChatLog.channel_user_id).where(mention, *time_conds).distinct()
+        conds.append(ChatLog.channel_user_id.in_(users))
+    return select(*cols).where(*conds).order_by(ChatLog.id)
+
+
+def _iso(v) -> Optional[str]:
+    return v.isoformat() if v is not None else None
+
+
+def _ndjson(rows) -> bytes:
+    if _orjson is not None:
+        return b"".join(
+            _orjson.dumps({"id": r[0], "channel_user_id": r[1], "role": r[2], "message": r[3], "created_at": _iso(r[4])}) + b"\n"
+            for r in rows
+        )
+    return "".join(
+        json.dumps({"id": r[0], "channel_user_id": r[1], "role": r[2], "message": r[3], "created_at": _iso(r[4])},
+                   ensure_ascii=False) + "\n"
+        for r in rows
+    ).encode("utf-8")
+
+
+def _csv(rows, header: bool) -> bytes:
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    if header:
+        w.writerow(COLUMNS)
+    w.writerows((r[0], r[1], r[2], r[3], _iso(r[4])) for r in rows)
+    return buf.getvalue().encode("utf-8")
+
+
+async def export_rows(
+    fmt: str = "ndjson",
+    *,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    festival: Optional[str] = None,
+    role: Optional[str] = None,
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+    stats: Optional[dict] = None,
+) -> AsyncIterator[bytes]:
+    """
+    chunk_rows 행마다 인코딩된 bytes 한 덩어리를 yield.
+    stats 를 넘기면 rows/chunks 를 채워 줌
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown export format: {fmt!r}")
+    from api.db.session import get_session
+
+    stmt = build_query(since=since, until=until, festival=festival, role=role)
+    stmt = stmt.execution_options(yield_per=chunk_rows, stream_results=True)
+    if stats is not None:
+        stats.setdefault("rows", 0)
+        stats.setdefault("chunks", 0)
+
+    first = True
+    async with get_session() as s:
+        result = await s.stream(stmt)
+        async for part in result.partitions(chunk_rows):
+            chunk = _ndjson(part) if fmt == "ndjson" else _csv(part, header=first)
+            first = False
+            if stats is not None:
+                stats["rows"] += len(part)
+                stats["chunks"] += 1
+            yield chunk
+    if first and fmt == "csv":
+        yield _csv((), header=True)
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes], level: int = EXPORT_GZIP_LEVEL) -> AsyncIterator[bytes]:
+    """bytes 스트림을 gzip 멤버 하나로 압축하며 흘려보냄"""
+    z = zlib.compressobj(level, zlib.DEFLATED, 31)   # wbits=31 → gzip 헤더/트레일러
+    async for chunk in chunks:
+        out = z.compress(chunk)
+        if out:
+            yield out
+    yield z.flush()
@@ -0,0 +1,276 @@
+# api/services/faq.py
+"""
+FAQ 자동 답변
+- 문자 n-gram(2,3) 역색인 — 형태소 분석기 없이 한국어 띄어쓰기/조사 변형에 강함
+- 후보 순위는 BM25, 답변 여부는 상위 후보의 IDF 가중 n-gram 코사인(0~1)으로 판단
+- 문서 단위 add/remove 로 증분 갱신, to_dict/from_dict(FAQ_SNAPSHOT 파일)로 콜드 스타트 적재
+"""
+import os, json, math, time, heapq, asyncio, logging
+from datetime import datetime, timedelta
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+FAQ_ENABLED        = os.getenv("FAQ_ENABLED", "true").lower() in ("1", "true", "yes", "y")
+FAQ_MIN_CONFIDENCE = float(os.getenv("FAQ_MIN_CONFIDENCE", "0.35"))
+FAQ_MIN_QUERY_LEN  = int(os.getenv("FAQ_MIN_QUERY_LEN", "4"))     # 정규화 후 글자 수
+FAQ_TTL            = float(os.getenv("FAQ_TTL", "120"))            # DB 변경분 확인 주기(초)
+FAQ_SNAPSHOT       = os.getenv("FAQ_SNAPSHOT", "")
+
+NGRAM_SIZES = (2, 3)
+BM25_K1 = 1.2
+BM25_B = 0.75
+RERANK_CANDIDATES = 8
+
+log = logging.getLogger(__name__)
+
+
+# 질문 끝 어미는 거의 모든 문서에 있어 점수만 흐리므로 n-gram 전에 뗀다 (긴 것부터)
+QUESTION_ENDINGS = (
+    "할수있나요", "가능한가요", "가능할까요", "되었나요", "됐나요", "되나요", "하나요", "인가요", "한가요",
+    "있나요", "없나요", "있어요", "나요", "할까요", "을까요", "ㄹ까요", "까요", "이에요", "예요", "에요", "해요", "돼요", "어요",
+    "되요", "어때요", "어디요", "습니까", "니까", "요",
+)
+
+
+def normalize(text: str) -> str:
+    """공백/문장부호 제거 + 소문자"""
+    return "".join(ch for ch in text.lower() if ch.isalnum())
+
+
+def strip_ending(s: str) -> str:
+    for e in QUESTION_ENDINGS:
+        if s.endswith(e) and len(s) - len(e) >= 2:
+            return s[: -len(e)]
+    return s
+
+
+def ngrams(text: str) -> Counter:
+    s = strip_ending(normalize(text))
+    grams: Counter = Counter()
+    for n in NGRAM_SIZES:
+        if len(s) < n:
+            continue
+        for i in range(len(s) - n + 1):
+            grams[s[i:i + n]] += 1
+    if not grams and s:
+        grams[s] += 1
+    return grams
+
+
+class FaqHit(NamedTuple):
+    id: int
+    question: str
+    answer: str
+    score: float
+    confidence: float
+
+
+class FaqIndex:
+    """n-gram → {문서 id: tf} 역색인 + BM25"""
+
+    __slots__ = ("docs", "grams", "postings", "total_len", "version")
+
+    def __init__(self):
+        self.docs: Dict[int, Tuple[str, str, int]] = {}      # id → (question, answer, 문서 길이)
+        self.grams: Dict[int, Counter] = {}                  # id → 질문 n-gram (remove / cosine 용)
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.total_len = 0
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def add(self, doc_id: int, question: str, answer: str) -> None:
+        """같은 id 가 있으면 교체"""
+        if doc_id in self.docs:
+            self.remove(doc_id)
+        grams = ngrams(question)
+        if not grams:
+            return
+        for g, tf in grams.items():
+            self.postings.setdefault(g, {})[doc_id] = tf
+        dl = sum(grams.values())
+        self.docs[doc_id] = (question, answer, dl)
+        self.grams[doc_id] = grams
+        self.total_len += dl
+        self.version += 1
+
+    def remove(self, doc_id: int) -> None:
+        doc = self.docs.pop(doc_id, None)
+        if doc is None:
+            return
+        for g in self.grams.pop(doc_id):
+            plist = self.postings.get(g)
+            if plist is not None:
+                plist.pop(doc_id, None)
+                if not plist:
+                    del self.postings[g]
+        self.total_len -= doc[2]
+        self.version += 1
+
+    def _idf(self, df: int) -> float:
+        n = len(self.docs)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def _cosine(self, q: Counter, q_norm: float, doc_id: int) -> float:
+        """IDF 가중 n-gram 벡터 코사인. 후보 k 개에만 계산 (idf 가 문서 추가마다 바뀌므로 캐시하지 않음)"""
+        dot, d_norm = 0.0, 0.0
+        for g, tf in self.grams[doc_id].items():
+            w = tf * self._idf(len(self.postings[g]))
+            d_norm += w * w
+            qtf = q.get(g)
+            if qtf:
+                dot += w * qtf * self._idf(len(self.postings[g]))
+        return dot / (q_norm * math.sqrt(d_norm)) if dot else 0.0
+
+    def search(self, query: str, k: int = 3) -> List[FaqHit]:
+        if not self.docs:
+            return []
+        q = ngrams(query)
+        avgdl = self.total_len / len(self.docs)
+        scores: Dict[int, float] = {}
+        q_sq = 0.0
+        for g, qtf in q.items():
+            plist = self.postings.get(g)
+            idf = self._idf(len(plist) if plist else 0)
+            q_sq += (idf * qtf) ** 2
+            if not plist:
+                continue
+            for doc_id, tf in plist.items():
+                dl = self.docs[doc_id][2]
+                s = idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * dl / avgdl))
+                scores[doc_id] = scores.get(doc_id, 0.0) + s * qtf
+        if not scores:
+            return []
+        # BM25 상위 후보를 코사인으로 재정렬 ("~나요/~가요" 같은 어미 n-gram 이 BM25 를 끌어올리는 경우 보정)
+        q_norm = math.sqrt(q_sq)
+        top = heapq.nlargest(max(k, RERANK_CANDIDATES), scores.items(), key=lambda kv: kv[1])
+        out = []
+        for doc_id, s in top:
+            question, answer, _ = self.docs[doc_id]
+            out.append(FaqHit(doc_id, question, answer, s, self._cosine(q, q_norm, doc_id)))
+        out.sort(key=lambda h: (h.confidence, h.score), reverse=True)
+        return out[:k]
+
+    # --- 직렬화 ---
+    def to_dict(self) -> dict:
+        return {"docs": [[i, q, a] for i, (q, a, _) in sorted(self.docs.items())]}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "FaqIndex":
+        ix = cls()
+        for i, q, a in d.get("docs", []):
+            ix.add(int(i), q, a)
+        return ix
+
+
+_index = FaqIndex()
+_watermark = None          # 마지막으로 반영한 faq_entries.updated_at
+_lock: Optional[asyncio.Lock] = None
+_checked_at = float("-inf")
+_snapshot_tried = False
+
+stats = {"queries": 0, "answered": 0, "low_confidence": 0, "refreshes": 0, "docs_changed": 0}
+
+
+def current() -> FaqIndex:
+    return _index
+
+
+def load_snapshot(path: str = FAQ_SNAPSHOT) -> bool:
+    """스냅샷은 문서 목록 + 워터마크. 역색인은 적재하며 다시 만든다 (수천 건 기준 수십 ms)"""
+    global _index, _watermark, _checked_at
+    if not path or not os.path.exists(path):
+        return False
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            d = json.load(f)
+        ix = FaqIndex.from_dict(d)
+    except Exception as e:
+        log.warning("faq snapshot %s unreadable: %r", path, e)
+        return False
+    _index = ix
+    _watermark = d.get("watermark")
+    _checked_at = time.monotonic()
+    log.info("faq index loaded from snapshot (%d docs)", len(ix))
+    return True
+
+
+def save_snapshot(path: str) -> None:
+    d = _index.to_dict()
+    d["watermark"] = _watermark
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(d, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+async def _load_changes(since) -> Tuple[list, Optional[str]]:
+    """watermark 이후 바뀐 faq_entries (비활성 포함 — 색인에서 빼야 하므로)"""
+    from sqlalchemy import select
+    from api.db.session import get_session
+    from api.db.models import FaqEntry
+
+    stmt = select(FaqEntry.id, FaqEntry.question, FaqEntry.answer, FaqEntry.enabled, FaqEntry.updated_at)
+    if since is not None:
+        # 같은 초에 커밋된 변경을 놓치지 않도록 1초 겹쳐 읽는다 (add 는 교체라 중복 반영해도 무해)
+        stmt = stmt.where(FaqEntry.updated_at >= since - timedelta(seconds=1))
+    async with get_session() as s:
+        rows = (await s.execute(stmt.order_by(FaqEntry.updated_at))).all()
+    return rows, (rows[-1][4].isoformat() if rows else None)
+
+
+async def refresh(force: bool = False) -> FaqIndex:
+    """FAQ_TTL 마다 updated_at 워터마크 이후 변경분만 색인에 반영"""
+    global _lock, _checked_at, _watermark, _snapshot_tried
+    if not _snapshot_tried:
+        _snapshot_tried = True
+        load_snapshot()
+    if not force and time.monotonic() - _checked_at < FAQ_TTL:
+        return _index
+    if _lock is None:
+        _lock = asyncio.Lock()
+    if _lock.locked():
+        return _index
+    async with _lock:
+        try:
+            since = datetime.fromisoformat(_watermark) if _watermark else None
+            rows, mark = await _load_changes(since)
+            for doc_id, question, answer, enabled, _ in rows:
+                if enabled and question and answer:
+                    _index.add(int(doc_id), question, answer)
+                else:
+                    _index.remove(int(doc_id))
+            _watermark = mark or _watermark
+            stats["refreshes"] += 1
+            stats["docs_changed"] += len(rows)
+        except Exception as e:
+            log.warning("faq refresh failed, keeping %d docs: %r", len(_index), e)
+        _checked_at = time.monotonic()
+    return _index
+
+
+def upsert(doc_id: int, question: str, answer: str) -> None:
+    """관리 API 에서 저장 직후 이 프로세스 색인에 바로 반영 (다른 인스턴스는 refresh 로)"""
+    _index.add(doc_id, question, answer)
+
+
+def remove(doc_id: int) -> None:
+    _index.remove(doc_id)
+
+
+async def answer(text: str) -> Optional[FaqHit]:
+    """확신할 만한 매치가 있으면 FaqHit, 아니면 None"""
+    if not FAQ_ENABLED or len(normalize(text or "")) < FAQ_MIN_QUERY_LEN:
+        return None
+    ix = await refresh()
+    stats["queries"] += 1
+    hits = ix.search(text, k=1)
+    if not hits:
+        return None
+    hit = hits[0]
+    if hit.confidence < FAQ_MIN_CONFIDENCE:
+        stats["low_confidence"] += 1
+        return None
+    stats["answered"] += 1
+    return hit
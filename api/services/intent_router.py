@@ -0,0 +1,222 @@
+# api/services/intent_router.py
+import os, time, hashlib, asyncio, logging
+from collections import deque
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+INTENT_ROUTER_TTL = float(os.getenv("INTENT_ROUTER_TTL", "60"))   # DB 재확인 주기(초)
+
+log = logging.getLogger(__name__)
+
+
+class FestivalDef(NamedTuple):
+    name: str
+    loc: int
+    aliases: Tuple[str, ...] = ()
+    user_long: Optional[float] = None
+    user_lati: Optional[float] = None
+
+
+class KeywordDef(NamedTuple):
+    keyword: str
+    intent: str      # 'notice' | 'point'
+    target: str      # message.msg_type | point.pos_type
+    label: str
+
+
+# DB 테이블이 비어 있을 때 사용하는 기본 정의 (기존 하드코딩 값)
+DEFAULT_FESTIVALS: Tuple[FestivalDef, ...] = (
+    FestivalDef("대동제", 1, (), 0.0, 0.0),
+    FestivalDef("락페", 2, (), 126.0, 37.0),
+    FestivalDef("해키", 3, (), 0.0, 0.0),
+)
+DEFAULT_KEYWORDS: Tuple[KeywordDef, ...] = (
+    KeywordDef("화장실", "point", "toilet", "화장실"),
+    KeywordDef("무대", "point", "stage", "무대"),
+    KeywordDef("안내", "point", "helpdesk", "안내데스크"),
+    KeywordDef("부스", "point", "booth", "부스"),
+    KeywordDef("금지물품", "notice", "물품 공지", "금지물품"),
+    KeywordDef("분실물", "notice", "분실물 공지", "분실물"),
+)
+
+
+def normalize(text: str) -> str:
+    """공백 제거 + 소문자 ("대동제 화장실" == "대동제화장실")"""
+    return "".join(text.split()).lower()
+
+
+class AhoCorasick:
+    """다중 패턴 단일 패스 매처. find_all()은 (start, end, payload) 를 끝 위치 순으로 반환"""
+
+    __slots__ = ("_goto", "_fail", "_out")
+
+    def __init__(self, patterns: Iterable[Tuple[str, Any]]):
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[Tuple[int, Any]]] = [[]]
+        for pat, payload in patterns:
+            if not pat:
+                continue
+            node = 0
+            for ch in pat:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                node = nxt
+            out[node].append((len(pat), payload))
+
+        fail = [0] * len(goto)
+        q = deque(goto[0].values())
+        while q:
+            node = q.popleft()
+            for ch, nxt in goto[node].items():
+                q.append(nxt)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                cand = goto[f].get(ch, 0)
+                fail[nxt] = cand if cand != nxt else 0
+                out[nxt] = out[nxt] + out[fail[nxt]]
+
+        self._goto, self._fail, self._out = goto, fail, out
+
+    def find_all(self, text: str) -> List[Tuple[int, int, Any]]:
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        hits = []
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for ln, payload in out[node]:
+                hits.append((i + 1 - ln, i + 1, payload))
+        return hits
+
+
+class Intent(NamedTuple):
+    festival: FestivalDef
+    keyword: Optional[KeywordDef]
+
+
+class RouterSnapshot:
+    """축제/키워드 정의를 컴파일한 불변 스냅샷. version이 같으면 정의도 같다"""
+
+    __slots__ = ("version", "festivals", "keywords", "_matcher", "built_at")
+
+    def __init__(self, festivals: Iterable[FestivalDef], keywords: Iterable[KeywordDef]):
+        self.festivals = tuple(festivals)
+        self.keywords = tuple(keywords)
+        self.version = snapshot_version(self.festivals, self.keywords)
+        patterns: List[Tuple[str, Any]] = []
+        for f in self.festivals:
+            for name in (f.name, *f.aliases):
+                patterns.append((normalize(name), f))
+        for k in self.keywords:
+            patterns.append((normalize(k.keyword), k))
+        self._matcher = AhoCorasick(patterns)
+        self.built_at = time.monotonic()
+
+    def match(self, text: str) -> Optional[Intent]:
+        """
+        공백을 모두 지우고 소문자로 바꾼 문장에서 (기존 startswith/endswith 는 앞뒤 공백만 무시)
+        축제: 문장 맨 앞에서 시작하는 이름/별칭 (기존 startswith 와 같음, 여럿이면 긴 것)
+        키워드: 축제 이름 뒤에서 끝나는 것 중 가장 뒤에서 끝나는 매치(동률이면 긴 것).
+          기존 endswith 는 문장 끝에 붙어 있어야 했지만 이제 뒤에 조사/어미가 와도 된다 ("대동제 화장실 어디야")
+        """
+        hits = self._matcher.find_all(normalize(text))
+        festival, f_end = None, 0
+        for start, end, d in hits:
+            if start == 0 and isinstance(d, FestivalDef) and end > f_end:
+                festival, f_end = d, end
+        if festival is None:
+            return None
+        keyword = k_rank = None
+        for start, end, d in hits:
+            if isinstance(d, KeywordDef) and end > f_end:
+                rank = (end, end - start)
+                if k_rank is None or rank > k_rank:
+                    keyword, k_rank = d, rank
+        return Intent(festival, keyword)
+
+
+def snapshot_version(festivals: Iterable[FestivalDef], keywords: Iterable[KeywordDef]) -> str:
+    h = hashlib.sha1()
+    for row in sorted(map(repr, festivals)) + sorted(map(repr, keywords)):
+        h.update(row.encode())
+        h.update(b"\0")
+    return h.hexdigest()[:12]
+
+
+# ===== 현재 스냅샷 (교체는 참조 대입 한 번) =====
+_snapshot = RouterSnapshot(DEFAULT_FESTIVALS, DEFAULT_KEYWORDS)
+_refresh_lock: Optional[asyncio.Lock] = None
+_checked_at = float("-inf")
+
+
+def current() -> RouterSnapshot:
+    return _snapshot
+
+
+def swap(snapshot: RouterSnapshot) -> bool:
+    """버전이 다를 때만 교체. 교체했으면 True"""
+    global _snapshot
+    if snapshot.version == _snapshot.version:
+        return False
+    log.info("intent router swap %s -> %s", _snapshot.version, snapshot.version)
+    _snapshot = snapshot
+    return True
+
+
+def mark_fresh() -> None:
+    """외부(스냅샷 파일 등)에서 정의를 채웠을 때 TTL 동안 DB 재확인 생략"""
+    global _checked_at
+    _checked_at = time.monotonic()
+
+
+async def load_definitions() -> Tuple[List[FestivalDef], List[KeywordDef]]:
+    """festivals / intent_keywords 테이블에서 활성 정의 로드. 비어 있으면 기본값"""
+    from sqlalchemy import select
+    from api.db.session import get_session
+    from api.db.models import Festival, IntentKeyword
+
+    async with get_session() as s:
+        frows = (await s.execute(select(Festival).where(Festival.enabled.is_(True)))).scalars().all()
+        krows = (await s.execute(select(IntentKeyword).where(IntentKeyword.enabled.is_(True)))).scalars().all()
+
+    festivals = [
+        FestivalDef(
+            r.name,
+            int(r.loc),
+            tuple(a.strip() for a in (r.aliases or "").split(",") if a.strip()),
+            r.user_long,
+            r.user_lati,
+        )
+        for r in frows
+    ] or list(DEFAULT_FESTIVALS)
+    keywords = [
+        KeywordDef(r.keyword, r.intent, r.target, r.label) for r in krows
+    ] or list(DEFAULT_KEYWORDS)
+    return festivals, keywords
+
+
+async def refresh(force: bool = False) -> RouterSnapshot:
+    """
+    INTENT_ROUTER_TTL 마다 DB 정의를 다시 읽어 버전이 바뀌었으면 스냅샷 교체.
+    로드 실패 시 기존 스냅샷 유지.
+    """
+    global _refresh_lock, _checked_at
+    if not force and time.monotonic() - _checked_at < INTENT_ROUTER_TTL:
+        return _snapshot
+    if _refresh_lock is None:
+        _refresh_lock = asyncio.Lock()
+    async with _refresh_lock:
+        if not force and time.monotonic() - _checked_at < INTENT_ROUTER_TTL:
+            return _snapshot
+        try:
+            festivals, keywords = await load_definitions()
+            swap(RouterSnapshot(festivals, keywords))
+        except Exception as e:
+            log.warning("intent router refresh failed, keeping %s: %r", _snapshot.version, e)
+        _checked_at = time.monotonic()
+    return _snapshot
@@ -0,0 +1,168 @@
+# api/services/logs.py
+"""
+로깅 설정
+- 요청 경로에서는 QueueHandler 가 레코드를 큐에 넣기만 하고, 포맷/출력은 QueueListener 스레드가 한다
+  (큐가 가득 차면 기다리지 않고 버림 → stats["dropped"])
+- LOG_FORMAT=json 이면 한 줄 JSON (ts, level, logger, msg, request_id, extra 필드)
+- RequestIdMiddleware: X-Request-ID 헤더(없으면 생성)를 contextvar 에 넣어 모든 로그에 request_id 로 붙인다
+- 원시 웹훅 payload 는 LOG_PAYLOAD_SAMPLE 비율로만 기록
+"""
+import os, sys, json, time, uuid, queue, random, atexit, logging
+import logging.handlers
+from contextvars import ContextVar
+from typing import Optional
+
+try:
+    import orjson as _orjson
+except ImportError:  # pragma: no cover
+    _orjson = None
+
+LOG_LEVEL          = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT         = os.getenv("LOG_FORMAT", "json").lower()          # json | text
+LOG_QUEUE_SIZE     = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_PAYLOAD_SAMPLE = float(os.getenv("LOG_PAYLOAD_SAMPLE", "0.01"))  # 0~1
+LOG_PAYLOAD_MAX    = int(os.getenv("LOG_PAYLOAD_MAX", "8192"))        # 기록할 payload 최대 바이트
+REQUEST_ID_HEADER  = b"x-request-id"
+
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+stats = {"enqueued": 0, "dropped": 0, "payload_sampled": 0}
+
+# LogRecord 기본 속성 — 이 외의 속성은 extra 로 넘어온 것으로 보고 JSON 에 싣는다
+_RESERVED = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+class _RequestIdFilter(logging.Filter):
+    """호출 스레드(이벤트 루프)에서 실행되어야 contextvar 를 읽을 수 있으므로 QueueHandler 쪽에 단다"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id.get()
+        return True
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 메시지 % args 와 traceback 만 여기서 문자열로 만들고 나머지 포맷은 리스너 스레드에서
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            stats["enqueued"] += 1
+        except queue.Full:
+            stats["dropped"] += 1
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        d = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)) + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            d["request_id"] = record.request_id
+        for k, v in record.__dict__.items():
+            if k not in _RESERVED:
+                d[k] = v
+        if record.exc_text:
+            d["exc"] = record.exc_text
+        if _orjson is not None:
+            return _orjson.dumps(d, default=str).decode()
+        return json.dumps(d, ensure_ascii=False, default=str)
+
+
+def setup(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT) -> None:
+    """루트 로거를 큐 핸들러로 교체하고 리스너 시작 (여러 번 호출해도 한 번만)"""
+    global _listener
+    if _listener is not None:
+        return
+    out = logging.StreamHandler(sys.stdout)
+    if fmt == "json":
+        out.setFormatter(JsonFormatter())
+    else:
+        out.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+
+    q: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    qh = _NonBlockingQueueHandler(q)
+    qh.addFilter(_RequestIdFilter())
+
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    root.addHandler(qh)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(q, out, respect_handler_level=False)
+    _listener.start()
+    atexit.register(shutdown)
+
+
+def shutdown() -> None:
+    """남은 레코드를 모두 출력하고 리스너 정지"""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+
+
+def should_sample_payload() -> bool:
+    if LOG_PAYLOAD_SAMPLE <= 0:
+        return False
+    if LOG_PAYLOAD_SAMPLE >= 1 or random.random() < LOG_PAYLOAD_SAMPLE:
+        stats["payload_sampled"] += 1
+        return True
+    return False
+
+
+def log_payload(logger: logging.Logger, raw: bytes) -> None:
+    """원시 payload 기록 (호출 쪽에서 should_sample_payload 로 거른 뒤)"""
+    logger.info(
+        "webhook raw payload",
+        extra={"payload": raw[:LOG_PAYLOAD_MAX].decode("utf-8", errors="replace"),
+               "payload_bytes": len(raw), "truncated": len(raw) > LOG_PAYLOAD_MAX},
+    )
+
+
+class RequestIdMiddleware:
+    """ASGI 미들웨어: 요청마다 request_id 를 정하고 응답 헤더 X-Request-ID 로 돌려준다"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        rid = None
+        for k, v in scope.get("headers") or ():
+            if k == REQUEST_ID_HEADER:
+                rid = v.decode("latin-1")[:64] or None
+                break
+        rid = rid or new_request_id()
+        token = request_id.set(rid)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(REQUEST_ID_HEADER, rid.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id.reset(token)
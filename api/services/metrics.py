@@ -0,0 +1,168 @@
+# api/services/metrics.py
+"""
+의존성 없는 경량 Prometheus 메트릭 (text exposition format 0.0.4)
+- Counter / Histogram: 라벨 튜플 → 값 dict, 관측은 bisect 한 번 + 덧셈
+- 게이지는 렌더링 시점에 콜백으로 읽는다(관측 비용 0)
+"""
+import time, bisect
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Mapping, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry: List["_Metric"] = []
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(v) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) and not v.is_integer() else str(int(v))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        _registry.append(self)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        out = self.header()
+        for labels, v in sorted(self._values.items()):
+            out.append(f"{self.name}{_fmt_labels(self.labelnames, labels)} {_fmt_value(v)}")
+        return out
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        row = self._values.get(labels)
+        if row is None:
+            row = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        row[bisect.bisect_left(self.buckets, value)] += 1
+        row[-1] += value
+
+    @contextmanager
+    def time(self, *labels: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, *labels)
+
+    def render(self) -> List[str]:
+        out = self.header()
+        for labels, row in sorted(self._values.items()):
+            acc = 0
+            for le, n in zip(self.buckets + (float("inf"),), row[:-1]):
+                acc += n
+                le_s = "+Inf" if le == float("inf") else repr(le)
+                lbl = _fmt_labels(self.labelnames, labels, 'le="' + le_s + '"')
+                out.append(f"{self.name}_bucket{lbl} {acc}")
+            out.append(f"{self.name}_sum{_fmt_labels(self.labelnames, labels)} {row[-1]!r}")
+            out.append(f"{self.name}_count{_fmt_labels(self.labelnames, labels)} {acc}")
+        return out
+
+
+class GaugeCallback(_Metric):
+    """렌더링 시 fn() 호출. fn 은 숫자 또는 {라벨값 튜플: 숫자} 반환"""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, fn: Callable, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self.fn = fn
+
+    def render(self) -> List[str]:
+        try:
+            v = self.fn()
+        except Exception:
+            return []
+        if v is None:
+            return []
+        out = self.header()
+        if isinstance(v, Mapping):
+            for labels, x in sorted(v.items()):
+                labels = labels if isinstance(labels, tuple) else (labels,)
+                out.append(f"{self.name}{_fmt_labels(self.labelnames, labels)} {_fmt_value(x)}")
+        else:
+            out.append(f"{self.name} {_fmt_value(v)}")
+        return out
+
+
+def stats_gauge(name: str, help: str, stats: Callable[[], Mapping[str, float]]) -> GaugeCallback:
+    """기존 stats dict 를 {key} 라벨 게이지로 노출"""
+    return GaugeCallback(
+        name, help,
+        lambda: {(k,): v for k, v in stats().items() if isinstance(v, (int, float))},
+        ("key",),
+    )
+
+
+def render() -> str:
+    lines: List[str] = []
+    for m in _registry:
+        lines.extend(m.render())
+    return "\n".join(lines) + "\n"
+
+
+# ===== 공용 메트릭 =====
+STAGE_SECONDS = Histogram(
+    "eventlive_webhook_stage_seconds",
+    "Webhook processing time per stage",
+    ("stage",),
+)
+INTENTS = Counter(
+    "eventlive_route_reply_intents_total",
+    "route_reply decisions by intent",
+    ("intent",),
+)
+WEBHOOKS = Counter(
+    "eventlive_webhooks_total",
+    "Webhook deliveries by outcome",
+    ("outcome",),
+)
+
+
+def stage(name: str):
+    """with stage("verify"): ... — 단계별 소요 시간 관측"""
+    return STAGE_SECONDS.time(name)
@@ -0,0 +1,300 @@
+# api/services/outbox.py
+"""
+채널톡 응답 outbox (at-least-once)
+- OUTBOX_ENABLED=true 일 때만 (기본 끔 — 메시지마다 sent 표시 쓰기가 하나 더 든다)
+- 웹훅 처리: ChatLog 와 같은 트랜잭션으로 outbox 행 저장 → 재시도 없이 한 번 전송 시도(deliver)
+  성공하면 sent, 실패하면 next_attempt_at 을 뒤로 미루고 응답은 그대로 반환 (재시도는 dispatcher 몫, 요청을 붙잡지 않음)
+- dispatcher(dispatch_once): 기한이 된 pending 을 배치로 가져와 재전송.
+  가져갈 때 next_attempt_at 을 OUTBOX_CLAIM_SEC 뒤로 밀어 두므로 여러 인스턴스가 동시에 돌아도 중복 전송을 줄이고,
+  중간에 죽으면 그 시간 뒤 다른 dispatcher 가 이어받는다 (MySQL 은 SKIP LOCKED)
+- 재시도 불가(4xx) 또는 OUTBOX_MAX_ATTEMPTS 초과 → dead
+- next_attempt_at / sent_at 은 created_at 과 같은 DB 시계(db_now)로 쓰고 비교한다 (앱 서버 시각·시간대와 무관)
+"""
+import os, time, random, asyncio, logging
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import DateTime, select, update, func, literal
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from api.db.models import Outbox
+
+OUTBOX_ENABLED      = os.getenv("OUTBOX_ENABLED", "false").lower() in ("1", "true", "yes", "y")
+OUTBOX_DISPATCHER   = os.getenv("OUTBOX_DISPATCHER", "false").lower() in ("1", "true", "yes", "y")  # 상주 프로세스에서 백그라운드 실행
+OUTBOX_BATCH        = int(os.getenv("OUTBOX_BATCH", "50"))
+OUTBOX_CONCURRENCY  = int(os.getenv("OUTBOX_CONCURRENCY", "8"))      # 동시에 보내는 상담 수
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_BACKOFF_BASE = float(os.getenv("OUTBOX_BACKOFF_BASE", "5"))    # 초, 시도마다 2배
+OUTBOX_BACKOFF_CAP  = float(os.getenv("OUTBOX_BACKOFF_CAP", "600"))
+OUTBOX_CLAIM_SEC    = float(os.getenv("OUTBOX_CLAIM_SEC", "60"))       # 가져간 배치의 처리 보장 시간
+OUTBOX_POLL_SEC     = float(os.getenv("OUTBOX_POLL_SEC", "2"))
+# 바로 보낸 행의 sent 표시를 모아 UPDATE 한 번으로 (0 = 즉시). 서버리스는 응답 후 flush 를 보장할 수 없어 0
+OUTBOX_MARK_DELAY_MS = int(os.getenv("OUTBOX_MARK_DELAY_MS", "0" if os.getenv("VERCEL") else "200"))
+
+log = logging.getLogger(__name__)
+
+Send = Callable[[str, str], Awaitable[object]]
+
+stats = {"delivered_inline": 0, "deferred": 0, "dispatched": 0, "retried": 0, "dead": 0, "backlog": 0}
+
+
+class db_now(FunctionElement):
+    """DB 시계 기준 지금 + seconds (created_at 의 server_default=func.now() 와 같은 시계)"""
+    type = DateTime()
+    inherit_cache = True
+
+    def __init__(self, seconds: float = 0.0):
+        super().__init__(literal(float(seconds)))
+
+
+@compiles(db_now)
+def _db_now_default(element, compiler, **kw):
+    return f"(CURRENT_TIMESTAMP + {compiler.process(element.clauses, **kw)} * INTERVAL '1 second')"
+
+
+@compiles(db_now, "mysql")
+def _db_now_mysql(element, compiler, **kw):
+    return f"(NOW() + INTERVAL ROUND({compiler.process(element.clauses, **kw)} * 1000000) MICROSECOND)"
+
+
+@compiles(db_now, "sqlite")
+def _db_now_sqlite(element, compiler, **kw):
+    # CURRENT_TIMESTAMP 와 같은 'YYYY-MM-DD HH:MM:SS' (UTC) 문자열
+    return f"datetime('now', {compiler.process(element.clauses, **kw)} || ' seconds')"
+
+
+def _default_send() -> Send:
+    from api.clients.channeltalk_client import send_message_to_userchat
+    return send_message_to_userchat
+
+
+async def send_once(user_chat_id: str, text: str) -> object:
+    """웹훅 경로용: 클라이언트 재시도 없이 한 번만 (백오프 대기로 요청을 붙잡지 않도록)"""
+    from api.clients.channeltalk_client import send_message_to_userchat
+    return await send_message_to_userchat(user_chat_id, text, retries=0)
+
+
+def backoff(attempts: int) -> float:
+    """attempts 번 실패한 뒤 다음 시도까지 (jitter ±20%)"""
+    d = min(OUTBOX_BACKOFF_CAP, OUTBOX_BACKOFF_BASE * (2 ** max(0, attempts - 1)))
+    return d * random.uniform(0.8, 1.2)
+
+
+def _failure(result) -> Optional[str]:
+    """send 결과가 실패면 오류 문자열, 성공이면 None (성공 응답은 메시지 JSON 이라 ok 키가 없다)"""
+    if isinstance(result, dict) and result.get("ok") is False:
+        return f"{result.get('status', '')} {result.get('error') or result.get('reason') or ''}".strip()[:255]
+    return None
+
+
+def _retryable(result) -> bool:
+    if not isinstance(result, dict):
+        return True
+    status = result.get("status")
+    if result.get("reason") == "no_user_chat_id":
+        return False
+    return not (isinstance(status, int) and 400 <= status < 500 and status != 429)
+
+
+async def _mark(session, ob_id: int, attempts: int, result, error: Optional[str]) -> str:
+    if error is None:
+        values = {"status": "sent", "sent_at": db_now(), "attempts": attempts, "last_error": None}
+    elif not _retryable(result) or attempts >= OUTBOX_MAX_ATTEMPTS:
+        values = {"status": "dead", "attempts": attempts, "last_error": error}
+    else:
+        values = {"attempts": attempts, "last_error": error,
+                  "next_attempt_at": db_now(backoff(attempts))}
+    await session.execute(update(Outbox).where(Outbox.id == ob_id).values(**values))
+    return values.get("status", "pending")
+
+
+_sent_ids: list = []
+_flush_handle: Optional[asyncio.TimerHandle] = None
+_flush_task: Optional[asyncio.Task] = None
+
+
+async def flush() -> None:
+    """모아 둔 sent 표시 반영. 실패하면 행은 pending 으로 남아 OUTBOX_CLAIM_SEC 뒤 재전송 (at-least-once)"""
+    global _flush_handle
+    if _flush_handle is not None:
+        _flush_handle.cancel()
+        _flush_handle = None
+    if not _sent_ids:
+        return
+    ids = _sent_ids[:]
+    del _sent_ids[:]
+    from api.db.session import get_session
+    try:
+        async with get_session() as s:
+            await s.execute(
+                update(Outbox).where(Outbox.id.in_(ids))
+                .values(status="sent", sent_at=db_now(), attempts=1, last_error=None)
+            )
+            await s.commit()
+    except Exception as e:
+        log.warning("outbox sent flush failed (%d rows stay pending): %r", len(ids), e)
+
+
+def _flush_soon() -> None:
+    global _flush_handle, _flush_task
+    _flush_handle = None
+    _flush_task = asyncio.get_running_loop().create_task(flush())
+
+
+def _mark_sent_later(ob_id: int) -> None:
+    global _flush_handle
+    _sent_ids.append(ob_id)
+    if len(_sent_ids) >= OUTBOX_BATCH:
+        if _flush_handle is not None:
+            _flush_handle.cancel()
+        _flush_soon()
+    elif _flush_handle is None:
+        _flush_handle = asyncio.get_running_loop().call_later(OUTBOX_MARK_DELAY_MS / 1000, _flush_soon)
+
+
+async def close() -> None:
+    """종료 시 남은 sent 표시 반영"""
+    if _flush_task is not None and not _flush_task.done():
+        await asyncio.gather(_flush_task, return_exceptions=True)
+    await flush()
+
+
+def claimed_until() -> db_now:
+    """웹훅 경로에서 저장하는 행의 next_attempt_at — 바로 보내는 동안 dispatcher 가 가져가지 않도록"""
+    return db_now(OUTBOX_CLAIM_SEC)
+
+
+async def deliver(ob_id: int, user_chat_id: str, text: str, send: Optional[Send] = None) -> object:
+    """
+    저장 직후 웹훅 경로에서 한 번 전송 (send 는 재시도하지 않는 것 — 기본 send_once).
+    결과를 기록하고 send 결과를 그대로 반환 (실패해도 예외 없음)
+    """
+    from api.db.session import get_session
+
+    send = send or send_once
+    try:
+        result = await send(user_chat_id, text)
+        error = _failure(result)
+    except Exception as e:
+        result, error = {"ok": False, "error": repr(e)}, repr(e)[:255]
+    if error is None and OUTBOX_MARK_DELAY_MS > 0:
+        _mark_sent_later(ob_id)
+        stats["delivered_inline"] += 1
+        return result
+    try:
+        async with get_session() as s:
+            status = await _mark(s, ob_id, 1, result, error)
+            await s.commit()
+    except Exception as e:
+        # 기록 실패: 행은 pending 으로 남아 dispatcher 가 다시 보낸다 (at-least-once)
+        log.warning("outbox mark failed id=%s: %r", ob_id, e)
+        return result
+    if status == "sent":
+        stats["delivered_inline"] += 1
+    else:
+        stats["deferred" if status == "pending" else "dead"] += 1
+        log.warning("outbox not delivered id=%s chat=%s status=%s err=%s", ob_id, user_chat_id, status, error)
+    return result
+
+
+async def _claim(limit: int) -> list:
+    from api.db.session import get_session
+
+    async with get_session() as s:
+        stmt = (
+            select(Outbox.id, Outbox.user_chat_id, Outbox.message, Outbox.attempts)
+            .where(Outbox.status == "pending", Outbox.next_attempt_at <= db_now())
+            .order_by(Outbox.next_attempt_at, Outbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        rows = (await s.execute(stmt)).all()
+        if rows:
+            await s.execute(
+                update(Outbox)
+                .where(Outbox.id.in_([r.id for r in rows]))
+                .values(next_attempt_at=db_now(OUTBOX_CLAIM_SEC))
+            )
+        await s.commit()
+    return rows
+
+
+async def dispatch_once(send: Optional[Send] = None, limit: int = OUTBOX_BATCH) -> Dict[str, int]:
+    """
+    기한이 된 pending 한 배치 전송. 같은 상담은 id 순으로 차례로, 상담끼리는 OUTBOX_CONCURRENCY 만큼 동시에
+    """
+    from api.db.session import get_session
+
+    send = send or _default_send()
+    rows = await _claim(limit)
+    counts = {"claimed": len(rows), "sent": 0, "retry": 0, "dead": 0}
+    if rows:
+        by_chat: Dict[str, list] = {}
+        for r in rows:
+            by_chat.setdefault(r.user_chat_id, []).append(r)
+        sem = asyncio.Semaphore(max(1, OUTBOX_CONCURRENCY))
+
+        async def run_chat(items: list) -> None:
+            async with sem:
+                for r in sorted(items, key=lambda x: x.id):
+                    try:
+                        result = await send(r.user_chat_id, r.message)
+                        error = _failure(result)
+                    except Exception as e:
+                        result, error = {"ok": False, "error": repr(e)}, repr(e)[:255]
+                    async with get_session() as s:
+                        status = await _mark(s, r.id, r.attempts + 1, result, error)
+                        await s.commit()
+                    counts["sent" if status == "sent" else "retry" if status == "pending" else "dead"] += 1
+
+        await asyncio.gather(*(run_chat(v) for v in by_chat.values()))
+        stats["dispatched"] += counts["sent"]
+        stats["retried"] += counts["retry"]
+        stats["dead"] += counts["dead"]
+        if counts["dead"]:
+            log.error("outbox: %d messages dead-lettered", counts["dead"])
+    stats["backlog"] = await backlog()
+    return counts
+
+
+async def backlog() -> int:
+    from api.db.session import get_session
+    async with get_session() as s:
+        return int((await s.execute(
+            select(func.count()).select_from(Outbox).where(Outbox.status == "pending")
+        )).scalar() or 0)
+
+
+async def status_counts() -> Dict[str, object]:
+    """상태별 건수 + 가장 오래된 pending 의 나이(초)"""
+    from api.db.session import get_session
+    async with get_session() as s:
+        rows = (await s.execute(select(Outbox.status, func.count()).group_by(Outbox.status))).all()
+        oldest, now = (await s.execute(
+            select(func.min(Outbox.created_at), db_now()).where(Outbox.status == "pending")
+        )).one()
+    out: Dict[str, object] = {st: int(n) for st, n in rows}
+    if oldest is not None:
+        # SQLite 는 원시 문자열로 돌려준다
+        oldest, now = (datetime.fromisoformat(v) if isinstance(v, str) else v for v in (oldest, now))
+        out["oldest_pending_sec"] = max(0, int((now.replace(tzinfo=None) - oldest.replace(tzinfo=None)).total_seconds()))
+    stats["backlog"] = int(out.get("pending", 0))
+    return out
+
+
+async def run_forever(stop: asyncio.Event, send: Optional[Send] = None) -> None:
+    """상주 프로세스용 루프: 꽉 찬 배치면 바로 다음, 아니면 OUTBOX_POLL_SEC 대기"""
+    while not stop.is_set():
+        t0 = time.monotonic()
+        try:
+            counts = await dispatch_once(send)
+        except Exception as e:
+            log.warning("outbox dispatch failed: %r", e)
+            counts = {"claimed": 0}
+        if counts["claimed"] >= OUTBOX_BATCH:
+            continue
+        try:
+            await asyncio.wait_for(stop.wait(), max(0.0, OUTBOX_POLL_SEC - (time.monotonic() - t0)))
+        except asyncio.TimeoutError:
+            pass
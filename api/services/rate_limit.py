@@ -0,0 +1,194 @@
+# api/services/rate_limit.py
+import os, time, logging
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple
+
+from api.clients.redis_client import get_redis
+
+RATE_LIMIT_ENABLED   = os.getenv("RATE_LIMIT_ENABLED", "false").lower() in ("1", "true", "yes", "y")
+RATE_USER_PER_MIN    = float(os.getenv("RATE_USER_PER_MIN", "20"))   # 사용자(owner_id)당 지속 허용량 (0 = 사용자 제한 없음)
+RATE_USER_BURST      = float(os.getenv("RATE_USER_BURST", "8"))
+RATE_CHAT_PER_MIN    = float(os.getenv("RATE_CHAT_PER_MIN", "30"))   # 상담(user_chat_id)당 (0 = 상담 제한 없음)
+RATE_CHAT_BURST      = float(os.getenv("RATE_CHAT_BURST", "10"))
+RATE_NOTICE_COOLDOWN = float(os.getenv("RATE_NOTICE_COOLDOWN", "60"))  # "잠시 후" 안내는 이 간격에 한 번
+RATE_LIMIT_MAX_KEYS  = int(os.getenv("RATE_LIMIT_MAX_KEYS", "50000"))
+RATE_LIMIT_PREFIX    = os.getenv("RATE_LIMIT_PREFIX", "eventlive:rl:")
+RATE_LIMIT_LOG       = os.getenv("RATE_LIMIT_LOG", "true").lower() in ("1", "true", "yes", "y")  # 스로틀된 메시지도 write-behind 로 기록
+
+log = logging.getLogger(__name__)
+
+# KEYS: 버킷들 (사용자, 상담 또는 그중 하나) / ARGV: 버킷마다 rate, burst (rate 는 초당, 항상 > 0)
+# 모든 버킷에 토큰이 있을 때만 차감하고 1, 막히면 -(막힌 버킷 순번)
+_LUA_BUCKETS = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local tokens = {}
+for i = 1, #KEYS do
+  local rate = tonumber(ARGV[i * 2 - 1])
+  local burst = tonumber(ARGV[i * 2])
+  local st = redis.call('HMGET', KEYS[i], 'tk', 'ts')
+  local tk = tonumber(st[1]) or burst
+  local ts = tonumber(st[2]) or now
+  tk = math.min(burst, tk + math.max(0, now - ts) * rate)
+  if tk < 1 then
+    return -i
+  end
+  tokens[i] = tk
+end
+for i = 1, #KEYS do
+  local rate = tonumber(ARGV[i * 2 - 1])
+  local burst = tonumber(ARGV[i * 2])
+  redis.call('HSET', KEYS[i], 'tk', tokens[i] - 1, 'ts', now)
+  redis.call('PEXPIRE', KEYS[i], math.ceil(burst / rate * 1000) + 1000)
+end
+return 1
+"""
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    scope: Optional[str] = None   # 막힌 경우 'user' | 'chat'
+    notify: bool = False          # 이번 스로틀 구간의 첫 이벤트면 True → 안내 메시지 1회
+
+
+class _Bucket:
+    __slots__ = ("tokens", "ts")
+
+    def __init__(self, tokens: float, ts: float):
+        self.tokens = tokens
+        self.ts = ts
+
+
+class IngestRateLimiter:
+    """
+    웹훅 유입 제한: 사용자(owner_id)·상담(user_chat_id) 토큰 버킷 두 개를 모두 통과해야 처리.
+    owner_id 가 없는 이벤트는 상담 버킷만 (모르는 사용자끼리 한 버킷을 나눠 쓰지 않도록).
+    분당 허용량이 0 이하인 범위는 버킷을 두지 않는다 (제한 없음).
+    로컬: bounded OrderedDict (LRU) / 공유: REDIS_URL 있으면 Lua 스크립트로 원자적 판정,
+    Redis 장애 시 로컬 판단으로 진행
+    """
+
+    def __init__(
+        self,
+        user_rate: Tuple[float, float],
+        chat_rate: Tuple[float, float],
+        maxsize: int,
+        notice_cooldown: float,
+    ):
+        self.user_rate = self._per_sec(user_rate)
+        self.chat_rate = self._per_sec(chat_rate)
+        self.maxsize = maxsize
+        self.notice_cooldown = notice_cooldown
+        self._buckets: "OrderedDict[str, _Bucket]" = OrderedDict()
+        self._noticed: "OrderedDict[str, float]" = OrderedDict()
+        self._script = None
+        self.stats = {"allowed": 0, "throttled": 0, "throttled_user": 0, "throttled_chat": 0,
+                      "notices": 0, "redis_error": 0}
+
+    @staticmethod
+    def _per_sec(rate: Tuple[float, float]) -> Optional[Tuple[float, float]]:
+        """(분당, burst) → (초당, burst). 분당 0 이하면 None (Lua 의 burst / rate 가 0 으로 나누지 않도록)"""
+        per_min, burst = rate
+        if per_min <= 0:
+            return None
+        return per_min / 60.0, max(1.0, burst)
+
+    # --- 로컬 ---
+    def _peek(self, key: str, rate: float, burst: float, now: float) -> _Bucket:
+        b = self._buckets.get(key)
+        if b is None:
+            b = self._buckets[key] = _Bucket(burst, now)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            b.tokens = min(burst, b.tokens + (now - b.ts) * rate)
+            b.ts = now
+        return b
+
+    def _local_allow(self, buckets) -> int:
+        now = time.monotonic()
+        peeked = [self._peek(key, rate, burst, now) for key, (rate, burst) in buckets]
+        for i, b in enumerate(peeked, 1):
+            if b.tokens < 1:
+                return -i
+        for b in peeked:
+            b.tokens -= 1
+        return 1
+
+    # --- 공유 ---
+    async def _redis_allow(self, r, buckets) -> int:
+        if self._script is None:
+            self._script = r.register_script(_LUA_BUCKETS)
+        return int(await self._script(
+            keys=[RATE_LIMIT_PREFIX + key for key, _ in buckets],
+            args=[v for _, rate in buckets for v in rate],
+        ))
+
+    async def _should_notify(self, chat_id: str) -> bool:
+        """스로틀 안내는 상담당 cooldown 에 한 번 (Redis 있으면 인스턴스 간 공유)"""
+        now = time.monotonic()
+        until = self._noticed.get(chat_id)
+        if until is not None and until > now:
+            return False
+        self._noticed[chat_id] = now + self.notice_cooldown
+        self._noticed.move_to_end(chat_id)
+        while len(self._noticed) > self.maxsize:
+            self._noticed.popitem(last=False)
+
+        r = get_redis()
+        if r is not None:
+            try:
+                fresh = await r.set(f"{RATE_LIMIT_PREFIX}notice:{chat_id}", "1", nx=True,
+                                    px=int(self.notice_cooldown * 1000))
+                return bool(fresh)
+            except Exception as e:
+                self.stats["redis_error"] += 1
+                log.warning("rate limit redis notice failed chat=%s err=%r", chat_id, e)
+        return True
+
+    async def check(self, owner_id: Optional[str], chat_id: str) -> Decision:
+        if not RATE_LIMIT_ENABLED:
+            return Decision(True)
+        buckets = []
+        if owner_id and self.user_rate:
+            buckets.append((f"u:{owner_id}", self.user_rate))
+        if self.chat_rate:
+            buckets.append((f"c:{chat_id}", self.chat_rate))
+        if not buckets:
+            self.stats["allowed"] += 1
+            return Decision(True)
+
+        res = None
+        r = get_redis()
+        if r is not None:
+            try:
+                res = await self._redis_allow(r, buckets)
+            except Exception as e:
+                self.stats["redis_error"] += 1
+                log.warning("rate limit redis failed, using local buckets: %r", e)
+        if res is None:
+            res = self._local_allow(buckets)
+
+        if res == 1:
+            self.stats["allowed"] += 1
+            return Decision(True)
+
+        scope = "user" if buckets[-res - 1][0].startswith("u:") else "chat"
+        self.stats["throttled"] += 1
+        self.stats[f"throttled_{scope}"] += 1
+        notify = await self._should_notify(chat_id)
+        if notify:
+            self.stats["notices"] += 1
+        return Decision(False, scope, notify)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+limiter = IngestRateLimiter(
+    (RATE_USER_PER_MIN, RATE_USER_BURST),
+    (RATE_CHAT_PER_MIN, RATE_CHAT_BURST),
+    RATE_LIMIT_MAX_KEYS,
+    RATE_NOTICE_COOLDOWN,
+)
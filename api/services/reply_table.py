@@ -0,0 +1,280 @@
+# api/services/reply_table.py
+"""
+(축제, 키워드) 정적 응답 사전계산 테이블
+- 축제 고정 좌표 기준 최근접 지점 / 공지 본문은 point·message 가 바뀌기 전까지 모든 사용자에게 같은 답
+- 파티션(point:{loc}:{pos_type} / notice:{loc}:{msg_type}) 단위 데이터 지문으로 변경 감지 → 바뀐 파티션만 재계산
+- REPLY_TABLE_SNAPSHOT 파일이 있으면 콜드 스타트 시 DB 없이 적재 (api.scripts.build_reply_table 로 생성)
+- 요청 경로는 기다리지 않는다(refresh_soon): 지문 확인/재계산은 백그라운드 태스크에서,
+  그동안 테이블에 없거나 낡은 항목은 lookup 미스 → 호출 쪽이 라이브 조회
+"""
+import os, json, time, hashlib, asyncio, logging
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from api.services import cache, intent_router, spatial_index
+from api.services.intent_router import FestivalDef, KeywordDef, RouterSnapshot
+
+REPLY_TABLE_TTL      = float(os.getenv("REPLY_TABLE_TTL", "60"))   # 데이터 지문 재확인 주기(초)
+REPLY_TABLE_SNAPSHOT = os.getenv("REPLY_TABLE_SNAPSHOT", "")
+
+log = logging.getLogger(__name__)
+
+Compute = Callable[[FestivalDef, KeywordDef], Awaitable[str]]
+
+
+def partition_of(fest: FestivalDef, kw: KeywordDef) -> str:
+    kind = "notice" if kw.intent == "notice" else "point"
+    return f"{kind}:{int(fest.loc)}:{kw.target}"
+
+
+class ReplyTable:
+    __slots__ = ("router_version", "partitions", "replies", "built_at")
+
+    def __init__(
+        self,
+        router_version: str = "",
+        partitions: Optional[Dict[str, Optional[str]]] = None,
+        replies: Optional[Dict[Tuple[str, str], str]] = None,
+    ):
+        self.router_version = router_version
+        self.partitions = dict(partitions or {})   # 파티션 → 계산에 쓴 데이터 지문 (None = 다시 계산)
+        self.replies = dict(replies or {})         # (축제 이름, 키워드) → 응답
+        self.built_at = time.time()
+
+    @property
+    def version(self) -> str:
+        h = hashlib.sha1(self.router_version.encode())
+        for k in sorted(self.partitions):
+            h.update(f"|{k}={self.partitions[k]}".encode())
+        return h.hexdigest()[:12]
+
+    def get(self, festival: str, keyword: str) -> Optional[str]:
+        return self.replies.get((festival, keyword))
+
+    def to_dict(self) -> dict:
+        return {
+            "router_version": self.router_version,
+            "partitions": self.partitions,
+            "replies": [[f, k, v] for (f, k), v in sorted(self.replies.items())],
+            "built_at": self.built_at,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ReplyTable":
+        t = cls(d.get("router_version", ""), d.get("partitions"), {(f, k): v for f, k, v in d.get("replies", [])})
+        t.built_at = float(d.get("built_at") or t.built_at)
+        return t
+
+    def __len__(self) -> int:
+        return len(self.replies)
+
+
+_table = ReplyTable()
+_lock: Optional[asyncio.Lock] = None
+_checked_at = float("-inf")
+_snapshot_tried = False
+_task: Optional[asyncio.Task] = None
+
+stats = {"hit": 0, "miss": 0, "refreshes": 0, "computed": 0, "compute_errors": 0}
+
+
+def current() -> ReplyTable:
+    return _table
+
+
+def lookup(snapshot: RouterSnapshot, fest: FestivalDef, kw: KeywordDef) -> Optional[str]:
+    """정의 버전이 다르면(스왑 직후) 미스 처리하고 다음 refresh 에서 재빌드"""
+    global _checked_at
+    if _table.router_version != snapshot.version:
+        if len(_table):
+            _checked_at = float("-inf")
+        stats["miss"] += 1
+        return None
+    if _table.partitions.get(partition_of(fest, kw), "") is None:   # mark_stale / 계산 실패 → 재계산 전까지 라이브
+        stats["miss"] += 1
+        return None
+    v = _table.get(fest.name, kw.keyword)
+    stats["hit" if v is not None else "miss"] += 1
+    return v
+
+
+def mark_stale(loc: Optional[int] = None, target: Optional[str] = None) -> None:
+    """
+    원본 데이터를 바꾼 쪽(적재 스크립트 등)에서 호출. 해당 파티션을 다음 refresh 때 재계산.
+    인자를 생략하면 해당 범위 전체
+    """
+    global _checked_at
+    for p in _table.partitions:
+        _, p_loc, p_target = p.split(":", 2)
+        if (loc is None or int(p_loc) == int(loc)) and (target is None or p_target == target):
+            _table.partitions[p] = None
+    _checked_at = float("-inf")
+
+
+async def load_versions() -> Dict[str, str]:
+    from api.db.session import get_session
+    from api.db.queries import partition_versions
+    async with get_session() as s:
+        return await partition_versions(s)
+
+
+async def invalidate_partition(p: str) -> None:
+    """이 파티션("point:{loc}:{pos_type}" 등)의 캐시/공간 인덱스를 비워 다음 조회가 최신 행을 읽게"""
+    kind, loc, target = p.split(":", 2)
+    if kind == "point":
+        await cache.invalidate(cache.point_key(int(loc), target))
+        spatial_index.invalidate(int(loc), target)
+    else:
+        await cache.invalidate(cache.notice_key(int(loc), target))
+
+
+async def data_changed(partitions: Iterable[str]) -> int:
+    """
+    point/message 를 바꾼 쪽에서 호출: 캐시·공간 인덱스 무효화 + 응답 테이블 재계산 예약.
+    이 프로세스 기준이며, 다른 인스턴스는 Redis 캐시 삭제와 데이터 지문 비교(REPLY_TABLE_TTL)로 따라온다
+    """
+    n = 0
+    for p in set(partitions):
+        await invalidate_partition(p)
+        _, loc, target = p.split(":", 2)
+        mark_stale(int(loc), target)
+        n += 1
+    return n
+
+
+async def rebuild(snapshot: RouterSnapshot, versions: Dict[str, str], compute: Compute) -> ReplyTable:
+    """
+    바뀐 파티션(또는 축제/키워드 정의 변경 시 전체)만 다시 계산한 새 테이블로 교체
+    데이터가 없는 파티션의 지문은 "" (행이 생기면 변경으로 감지)
+    """
+    global _table
+    old = _table
+    same_router = old.router_version == snapshot.version
+    replies = dict(old.replies) if same_router else {}
+    partitions: Dict[str, Optional[str]] = {}
+    changed = set()
+    for fest in snapshot.festivals:
+        for kw in snapshot.keywords:
+            p = partition_of(fest, kw)
+            new_v = versions.get(p, "")
+            partitions[p] = new_v
+            if old.partitions.get(p) != new_v:
+                changed.add(p)
+
+    if same_router and not changed:
+        return old
+
+    for p in changed:
+        await invalidate_partition(p)
+
+    for fest in snapshot.festivals:
+        for kw in snapshot.keywords:
+            p = partition_of(fest, kw)
+            key = (fest.name, kw.keyword)
+            if key in replies and p not in changed:
+                continue
+            try:
+                replies[key] = await compute(fest, kw)
+                stats["computed"] += 1
+            except Exception as e:
+                stats["compute_errors"] += 1
+                replies.pop(key, None)
+                partitions[p] = None
+                log.warning("reply table compute failed for %s/%s: %r", fest.name, kw.keyword, e)
+
+    # 정의에서 빠진 조합 정리
+    valid = {(f.name, k.keyword) for f in snapshot.festivals for k in snapshot.keywords}
+    replies = {k: v for k, v in replies.items() if k in valid}
+
+    _table = ReplyTable(snapshot.version, partitions, replies)
+    stats["refreshes"] += 1
+    log.info("reply table %s: %d entries, %d partition(s) rebuilt", _table.version, len(_table), len(changed))
+    return _table
+
+
+def load_snapshot(path: str = REPLY_TABLE_SNAPSHOT) -> bool:
+    """
+    빌드 시점 스냅샷 적재. 축제/키워드 정의도 함께 들어 있어 intent_router 까지 DB 없이 채움
+    """
+    global _table, _checked_at
+    if not path or not os.path.exists(path):
+        return False
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            d = json.load(f)
+        festivals = [FestivalDef(r[0], int(r[1]), tuple(r[2]), r[3], r[4]) for r in d["festivals"]]
+        keywords = [KeywordDef(*r) for r in d["keywords"]]
+        table = ReplyTable.from_dict(d["table"])
+    except Exception as e:
+        log.warning("reply table snapshot %s unreadable: %r", path, e)
+        return False
+
+    snap = RouterSnapshot(festivals, keywords)
+    if snap.version != table.router_version:
+        log.warning("reply table snapshot %s does not match its definitions, ignored", path)
+        return False
+    intent_router.swap(snap)
+    intent_router.mark_fresh()
+    _table = table
+    _checked_at = time.monotonic()
+    log.info("reply table %s loaded from snapshot (%d entries)", table.version, len(table))
+    return True
+
+
+def save_snapshot(path: str) -> None:
+    snap = intent_router.current()
+    d = {
+        "festivals": [list(f) for f in snap.festivals],
+        "keywords": [list(k) for k in snap.keywords],
+        "table": _table.to_dict(),
+    }
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(d, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def ensure_snapshot() -> None:
+    """프로세스당 한 번 스냅샷 파일 적재 시도 (intent_router.refresh 보다 먼저 불러야 DB 왕복이 없다)"""
+    global _snapshot_tried
+    if not _snapshot_tried:
+        _snapshot_tried = True
+        load_snapshot()
+
+
+async def refresh(compute: Compute, force: bool = False) -> ReplyTable:
+    """
+    REPLY_TABLE_TTL 마다 데이터 지문을 확인해 바뀐 부분만 재계산 (끝날 때까지 대기 — 스크립트/백그라운드용).
+    다른 쪽이 재계산 중이면 기다리지 않고 현재 테이블 반환 (빈 테이블이면 대기)
+    """
+    global _lock, _checked_at
+    ensure_snapshot()
+    if not force and time.monotonic() - _checked_at < REPLY_TABLE_TTL:
+        return _table
+    if _lock is None:
+        _lock = asyncio.Lock()
+    if _lock.locked() and len(_table):
+        return _table
+    async with _lock:
+        if not force and time.monotonic() - _checked_at < REPLY_TABLE_TTL:
+            return _table
+        try:
+            versions = await load_versions()
+            await rebuild(intent_router.current(), versions, compute)
+        except Exception as e:
+            log.warning("reply table refresh failed, keeping %s: %r", _table.version, e)
+        _checked_at = time.monotonic()
+    return _table
+
+
+def refresh_soon(compute: Compute) -> ReplyTable:
+    """
+    요청 경로용: 기다리지 않고 현재 테이블 반환. 확인 주기가 지났으면 refresh 를 백그라운드 태스크로 건다
+    (콜드 스타트 직후의 전체 지문 집계·조합별 계산이 첫 요청을 붙잡지 않도록)
+    """
+    global _task
+    ensure_snapshot()
+    if time.monotonic() - _checked_at < REPLY_TABLE_TTL:
+        return _table
+    if _task is None or _task.done():
+        _task = asyncio.get_running_loop().create_task(refresh(compute))
+    return _table
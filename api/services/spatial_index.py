@@ -0,0 +1,152 @@
+# api/services/spatial_index.py
+import os, math, time, heapq, asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+EARTH_RADIUS_M = 6_371_008.8
+
+# (loc, pos_type) 인덱스 재빌드 주기(초). 0 이하이면 invalidate() 전까지 유지
+SPATIAL_INDEX_TTL = float(os.getenv("SPATIAL_INDEX_TTL", "300"))
+
+
+def haversine_m(lng1: float, lat1: float, lng2: float, lat2: float) -> float:
+    """두 경위도 좌표 사이의 대원 거리(m)"""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lng2 - lng1)
+    h = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(h)))
+
+
+def _to_xyz(lng: float, lat: float) -> Tuple[float, float, float]:
+    lam, phi = math.radians(lng), math.radians(lat)
+    c = math.cos(phi)
+    return (c * math.cos(lam), c * math.sin(lam), math.sin(phi))
+
+
+class SpatialIndex:
+    """
+    경위도 점 집합에 대한 KD-tree (단위구 3차원 좌표 기준)
+
+    현 길이는 대원 거리와 단조 관계라서 트리 탐색 순서가 곧 haversine 순서와 같다.
+    nearest()는 (거리m, payload) 리스트를 가까운 순으로 반환한다.
+    """
+
+    __slots__ = ("_xyz", "_payloads", "_coords", "_tree", "built_at")
+
+    def __init__(self, items: Iterable[Tuple[float, float, Any]]):
+        self._xyz: List[Tuple[float, float, float]] = []
+        self._coords: List[Tuple[float, float]] = []
+        self._payloads: List[Any] = []
+        for lng, lat, payload in items:
+            self._xyz.append(_to_xyz(lng, lat))
+            self._coords.append((lng, lat))
+            self._payloads.append(payload)
+        self._tree = self._build(list(range(len(self._xyz))), 0)
+        self.built_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def _build(self, idx: List[int], depth: int):
+        if not idx:
+            return None
+        axis = depth % 3
+        idx.sort(key=lambda i: self._xyz[i][axis])
+        mid = len(idx) // 2
+        return (
+            idx[mid],
+            axis,
+            self._build(idx[:mid], depth + 1),
+            self._build(idx[mid + 1:], depth + 1),
+        )
+
+    def nearest(self, lng: float, lat: float, k: int = 1) -> List[Tuple[float, Any]]:
+        if k <= 0 or self._tree is None:
+            return []
+        q = _to_xyz(lng, lat)
+        xyz = self._xyz
+        heap: List[Tuple[float, int]] = []   # (-d², i) 최대 힙
+
+        stack = [self._tree]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            i, axis, left, right = node
+            p = xyz[i]
+            d2 = (p[0] - q[0]) ** 2 + (p[1] - q[1]) ** 2 + (p[2] - q[2]) ** 2
+            if len(heap) < k:
+                heapq.heappush(heap, (-d2, i))
+            elif d2 < -heap[0][0]:
+                heapq.heapreplace(heap, (-d2, i))
+
+            diff = q[axis] - p[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            # 먼 쪽은 분할면까지 거리가 현재 k번째 후보보다 가까울 때만 탐색
+            if far is not None and (len(heap) < k or diff * diff < -heap[0][0]):
+                stack.append(far)
+            stack.append(near)
+
+        out = sorted((-nd2, i) for nd2, i in heap)
+        return [
+            (haversine_m(lng, lat, *self._coords[i]), self._payloads[i])
+            for _, i in out
+        ]
+
+
+# ===== (loc, pos_type) 별 인덱스 레지스트리 =====
+PointLoader = Callable[[int, str], Awaitable[Iterable[Tuple[float, float, Any]]]]
+
+_indexes: Dict[Tuple[int, str], SpatialIndex] = {}
+_locks: Dict[Tuple[int, str], asyncio.Lock] = {}
+
+
+def _is_fresh(ix: Optional[SpatialIndex]) -> bool:
+    if ix is None:
+        return False
+    if SPATIAL_INDEX_TTL <= 0:
+        return True
+    return (time.monotonic() - ix.built_at) < SPATIAL_INDEX_TTL
+
+
+async def get_index(loc: int, pos_type: str, loader: PointLoader) -> SpatialIndex:
+    """
+    (loc, pos_type) 인덱스 반환. 없거나 TTL이 지났으면 loader로 점을 읽어 재빌드한다.
+    같은 키의 동시 재빌드는 하나로 합쳐진다.
+    """
+    key = (loc, pos_type)
+    ix = _indexes.get(key)
+    if _is_fresh(ix):
+        return ix
+
+    lock = _locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        ix = _indexes.get(key)
+        if _is_fresh(ix):
+            return ix
+        items = await loader(loc, pos_type)
+        ix = SpatialIndex(items)
+        _indexes[key] = ix
+        return ix
+
+
+async def nearest_points(
+    loc: int,
+    pos_type: str,
+    lng: float,
+    lat: float,
+    loader: PointLoader,
+    k: int = 1,
+) -> List[Tuple[float, Any]]:
+    ix = await get_index(loc, pos_type, loader)
+    return ix.nearest(lng, lat, k)
+
+
+def invalidate(loc: Optional[int] = None, pos_type: Optional[str] = None) -> None:
+    """
+    point 데이터 변경 시 호출. 인자를 생략하면 해당 범위 전체를 비운다.
+    다음 조회에서 재빌드된다.
+    """
+    for key in list(_indexes.keys()):
+        if (loc is None or key[0] == loc) and (pos_type is None or key[1] == pos_type):
+            _indexes.pop(key, None)
@@ -0,0 +1,149 @@
+# api/services/webhook_event.py
+import json
+from typing import Any, Optional
+
+try:  # 선택 의존성: 있으면 더 빠른 디코더 사용
+    import orjson as _orjson
+except ImportError:  # pragma: no cover
+    _orjson = None
+
+JSON_BACKEND = "orjson" if _orjson is not None else "json"
+
+
+def loads(raw: bytes) -> Any:
+    if _orjson is not None:
+        return _orjson.loads(raw)
+    return json.loads(raw.decode("utf-8"))
+
+
+class WebhookEvent:
+    """채널톡 웹훅에서 라우팅에 필요한 필드만 한 번에 뽑아 둔 객체"""
+
+    __slots__ = ("actor", "chat_id", "text", "owner_id", "fullname", "event_id")
+
+    def __init__(
+        self,
+        actor: str = "unknown",
+        chat_id: Optional[str] = None,
+        text: str = "",
+        owner_id: Optional[str] = None,
+        fullname: Optional[str] = None,
+        event_id: Optional[str] = None,
+    ):
+        self.actor = actor
+        self.chat_id = chat_id
+        self.text = text
+        self.owner_id = owner_id
+        self.fullname = fullname
+        self.event_id = event_id
+
+    def __repr__(self) -> str:
+        return (
+            f"WebhookEvent(actor={self.actor!r}, chat_id={self.chat_id!r}, text={self.text!r}, "
+            f"owner_id={self.owner_id!r}, fullname={self.fullname!r}, event_id={self.event_id!r})"
+        )
+
+
+def _message_text(m: dict) -> str:
+    t = (m.get("plainText") or "").strip()
+    if t:
+        return t
+    blocks = m.get("blocks") or []
+    if isinstance(blocks, list) and blocks and isinstance(blocks[0], dict):
+        if blocks[0].get("type") == "text":
+            return (blocks[0].get("value") or "").strip()
+    return ""
+
+
+def extract_event(payload: Any) -> WebhookEvent:
+    """
+    payload dict 한 번 순회로 WebhookEvent 생성.
+    우선순위는 기존 classify_actor / extract_* 함수들(scripts/bench_parse 에 보관)과 동일하다.
+    """
+    ev = WebhookEvent()
+    if not isinstance(payload, dict):
+        return ev
+
+    ent = payload.get("entity") or {}
+    if not isinstance(ent, dict):
+        ent = None
+    msgs = payload.get("messages")
+    m0 = msgs[0] if isinstance(msgs, list) and msgs and isinstance(msgs[0], dict) else None
+    data = payload.get("data") or {}
+    if not isinstance(data, dict):
+        data = None
+    refers = payload.get("refers") or {}
+    if not isinstance(refers, dict):
+        refers = None
+    online = (refers.get("online") or {}) if refers is not None else {}
+    if not isinstance(online, dict):
+        online = None
+
+    # actor
+    pt = ent.get("personType") if ent is not None else None
+    if pt not in ("user", "bot") and m0 is not None:
+        pt = m0.get("personType")
+    if pt not in ("user", "bot") and online is not None:
+        pt = online.get("personType")
+    if pt in ("user", "bot"):
+        ev.actor = pt
+
+    # user_chat_id
+    cid = ent.get("chatId") if ent is not None else None
+    if cid is None and data is not None:
+        cid = data.get("userChatId")
+        if cid is None:
+            cid = data.get("chatId")
+    if cid is None and m0 is not None:
+        cid = m0.get("chatId")
+    if cid is not None:
+        ev.chat_id = str(cid)
+
+    # text
+    t = _message_text(ent) if ent is not None else ""
+    if not t and m0 is not None:
+        t = _message_text(m0)
+    if not t and data is not None:
+        t = (data.get("plainText") or "").strip()
+    ev.text = t
+
+    # fullname: refers.user 가 있으면 그 name (없으면 None), 아니면 entity.name
+    u = (refers.get("user") or {}) if refers is not None else None
+    if isinstance(u, dict):
+        name = u.get("name")
+        ev.fullname = str(name) if name else None
+    elif ent is not None and ent.get("name"):
+        ev.fullname = str(ent["name"])
+
+    # owner_id
+    owner = None
+    if refers is not None:
+        uc = refers.get("userChat") or {}
+        if isinstance(uc, dict) and uc.get("userId"):
+            owner = uc["userId"]
+        elif isinstance(u, dict) and u.get("id"):
+            owner = u["id"]
+        elif online is not None and online.get("personId"):
+            owner = online["personId"]
+    if owner is None and ent is not None and ent.get("personId"):
+        owner = ent["personId"]
+    if owner is not None:
+        ev.owner_id = str(owner)
+
+    # event id (재전송 중복 제거 키)
+    eid = ent.get("id") if ent is not None else None
+    if not eid and m0 is not None:
+        eid = m0.get("id")
+    if eid:
+        ev.event_id = str(eid)
+
+    return ev
+
+
+def parse_event(raw: bytes) -> WebhookEvent:
+    """raw body → WebhookEvent. 디코딩 실패나 dict 가 아닌 JSON 은 빈 이벤트"""
+    try:
+        payload = loads(raw)
+    except Exception:
+        payload = {}
+    return extract_event(payload)
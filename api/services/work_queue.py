@@ -0,0 +1,92 @@
+# api/services/work_queue.py
+import os, zlib, asyncio, logging
+from typing import Awaitable, Callable, List, Optional
+
+from api.services.logs import request_id
+
+WEBHOOK_WORKERS   = int(os.getenv("WEBHOOK_WORKERS", "8"))
+WEBHOOK_QUEUE_MAX = int(os.getenv("WEBHOOK_QUEUE_MAX", "1000"))
+
+log = logging.getLogger(__name__)
+
+Job = Callable[[], Awaitable[None]]
+
+
+class KeyedWorkQueue:
+    """
+    키(user_chat_id) 해시로 워커를 고정하는 bounded 작업 큐.
+    같은 키의 작업은 항상 같은 워커가 순서대로 처리하므로 채팅별 순서가 보장된다.
+
+    주의: 응답 후 인스턴스가 멈추는 서버리스 환경에서는 큐 작업이 끝나지 않을 수 있다.
+    상주 프로세스(uvicorn 등)에서 사용할 것.
+    """
+
+    def __init__(self, workers: int, maxsize: int):
+        self.workers = max(1, workers)
+        self.per_worker = max(1, -(-maxsize // self.workers))
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+        self.stats = {"submitted": 0, "backpressure": 0, "done": 0, "failed": 0}
+
+    def _ensure_started(self) -> None:
+        if self._tasks and not all(t.done() for t in self._tasks):
+            return
+        loop = asyncio.get_running_loop()
+        self._queues = [asyncio.Queue(maxsize=self.per_worker) for _ in range(self.workers)]
+        self._tasks = [loop.create_task(self._worker(q)) for q in self._queues]
+
+    def _shard(self, key: str) -> int:
+        return zlib.crc32(key.encode()) % self.workers
+
+    async def submit(self, key: str, job: Job) -> bool:
+        """
+        작업 등록. 해당 샤드가 가득 차 있으면 자리가 날 때까지 대기(backpressure)하고 False 반환.
+        대기 중에도 같은 키의 순서는 유지된다.
+        """
+        self._ensure_started()
+        q = self._queues[self._shard(key)]
+        self.stats["submitted"] += 1
+        item = (request_id.get(), job)   # 워커 태스크에서도 같은 request_id 로 로그가 남도록
+        try:
+            q.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            self.stats["backpressure"] += 1
+            await q.put(item)
+            return False
+
+    def depth(self) -> int:
+        return sum(q.qsize() for q in self._queues)
+
+    async def _worker(self, q: asyncio.Queue) -> None:
+        while True:
+            rid, job = await q.get()
+            token = request_id.set(rid)
+            try:
+                await job()
+                self.stats["done"] += 1
+            except Exception:
+                self.stats["failed"] += 1
+                log.exception("webhook job failed")
+            finally:
+                request_id.reset(token)
+                q.task_done()
+
+    async def drain(self, timeout: Optional[float] = None) -> None:
+        """대기 중인 작업을 모두 처리한 뒤 워커 종료"""
+        if not self._queues:
+            return
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(q.join() for q in self._queues)), timeout
+            )
+        except asyncio.TimeoutError:
+            log.warning("webhook queue drain timed out depth=%d", self.depth())
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queues = []
+
+
+queue = KeyedWorkQueue(WEBHOOK_WORKERS, WEBHOOK_QUEUE_MAX)
@@ -0,0 +1,9 @@
+# tests/conftest.py
+"""
+테스트는 메모리 SQLite + Redis 없음으로만 돈다 (.env 의 운영 DB/키를 건드리지 않도록 import 전에 덮어쓴다)
+"""
+import os
+
+os.environ["DB_URL"] = "sqlite+aiosqlite://"
+os.environ["REDIS_URL"] = ""
+os.environ.setdefault("DB_SCHEMA_CHECK", "always")
@@ -0,0 +1,32 @@
+# tests/test_db_session.py
+import asyncio
+
+from sqlalchemy import text
+
+from api.db import session as db
+
+
+def _observed() -> int:
+    row = db._CHECKOUT_SECONDS._values.get(())
+    return int(sum(row[:-1])) if row else 0
+
+
+def test_session_connects_lazily_and_times_each_checkout():
+    async def main():
+        db.get_engine()
+        checkouts, observed = db.pool_events["checkouts"], _observed()
+        async with db.get_session():
+            pass                                   # 쿼리 없는 세션 (캐시 히트·중복 이벤트)
+        assert db.pool_events["checkouts"] == checkouts and _observed() == observed
+
+        async with db.get_session() as s:
+            await s.execute(text("select 1"))
+            await s.commit()
+            await s.execute(text("select 2"))      # 커밋 뒤 새 트랜잭션 → 다시 체크아웃
+        assert db.pool_events["checkouts"] == checkouts + 2
+        assert _observed() == observed + 2
+
+        async with db.get_engine().connect() as conn:   # 세션 밖 체크아웃은 관측하지 않음
+            await conn.execute(text("select 1"))
+        assert _observed() == observed + 2
+    asyncio.run(main())
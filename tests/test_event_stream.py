@@ -0,0 +1,244 @@
+# tests/test_event_stream.py
+import asyncio
+import time
+
+import fakeredis
+import pytest
+
+from api.services import event_stream as es
+
+
+class PollingFakeRedis(fakeredis.aioredis.FakeRedis):
+    """fakeredis 의 async XREADGROUP BLOCK 은 이벤트 루프를 멈추므로 폴링으로 흉내"""
+
+    async def xreadgroup(self, *a, block=None, **kw):
+        res = await super().xreadgroup(*a, **kw)
+        if not res and block:
+            await asyncio.sleep(block / 1000)
+        return res
+
+
+@pytest.fixture
+def server(monkeypatch):
+    srv = fakeredis.FakeServer()
+    producer = fakeredis.aioredis.FakeRedis(server=srv)
+    monkeypatch.setattr(es, "get_redis", lambda: producer)
+    monkeypatch.setattr(es, "STREAM_BLOCK_MS", 50)
+    monkeypatch.setattr(es, "STREAM_LEASE_MS", 600)
+    monkeypatch.setattr(es, "STREAM_CLAIM_IDLE_MS", 200)
+    monkeypatch.setattr(es, "STREAM_RETRY_BASE_MS", 10)
+    monkeypatch.setattr(es, "STREAM_MAX_DELIVERIES", 3)
+    for k in es.stats:
+        monkeypatch.setitem(es.stats, k, 0)
+    return srv
+
+
+def _worker(srv, handler, name):
+    return es.StreamWorker(handler, name=name, redis=PollingFakeRedis(server=srv))
+
+
+async def _until(cond, timeout=5.0):
+    t0 = time.monotonic()
+    while not cond():
+        assert time.monotonic() - t0 < timeout, "timed out"
+        await asyncio.sleep(0.02)
+
+
+async def _publish(events):
+    for chat, seq in events:
+        assert await es.publish(chat, {"chat_id": chat, "seq": str(seq)})
+
+
+async def _pending(srv) -> int:
+    r = fakeredis.aioredis.FakeRedis(server=srv)
+    total = 0
+    for shard in range(es.STREAM_SHARDS):
+        if await r.exists(es.stream_key(shard)):
+            total += (await r.xpending(es.stream_key(shard), es.STREAM_GROUP))["pending"]
+    return total
+
+
+def _by_chat(seen):
+    out = {}
+    for chat, seq in seen:
+        out.setdefault(chat, []).append(seq)
+    return out
+
+
+def test_publish_shards_by_chat_and_keeps_per_chat_order(server):
+    async def main():
+        chats = [f"chat-{i}" for i in range(6)]
+        await _publish([(c, n) for n in range(10) for c in chats])
+        r = fakeredis.aioredis.FakeRedis(server=server)
+        for c in chats:
+            rows = await r.xrange(es.stream_key(es.shard_of(c)))
+            assert [int(f[b"seq"]) for _, f in rows if f[b"chat_id"] == c.encode()] == list(range(10))
+
+        seen = []
+
+        async def handler(d):
+            seen.append((d["chat_id"], int(d["seq"])))
+
+        w = _worker(server, handler, "w1")
+        task = asyncio.create_task(w.run())
+        await _until(lambda: len(seen) == 60)
+        w.stop()
+        await task
+        assert all(v == list(range(10)) for v in _by_chat(seen).values())
+        assert es.stats["processed"] == 60
+        assert await _pending(server) == 0       # 전부 XACK
+    asyncio.run(main())
+
+
+def test_failed_entry_is_retried_in_place_before_later_ones(server):
+    async def main():
+        await _publish([("a", n) for n in range(3)])
+        seen, failures = [], {"left": 2}
+
+        async def handler(d):
+            if d["seq"] == "0" and failures["left"]:
+                failures["left"] -= 1
+                raise RuntimeError("transient")
+            seen.append((d["chat_id"], int(d["seq"])))
+
+        w = _worker(server, handler, "w1")
+        task = asyncio.create_task(w.run())
+        await _until(lambda: len(seen) == 3)
+        w.stop()
+        await task
+        assert seen == [("a", 0), ("a", 1), ("a", 2)]
+        assert es.stats["retried"] == 2 and es.stats["dead_lettered"] == 0
+        assert await _pending(server) == 0
+    asyncio.run(main())
+
+
+def test_poison_entry_is_dead_lettered_then_shard_continues(server):
+    async def main():
+        await _publish([("a", n) for n in range(3)])
+        seen, calls = [], []
+
+        async def handler(d):
+            calls.append(d["seq"])
+            if d["seq"] == "1":
+                raise RuntimeError("poison")
+            seen.append(int(d["seq"]))
+
+        w = _worker(server, handler, "w1")
+        task = asyncio.create_task(w.run())
+        await _until(lambda: len(seen) == 2)
+        w.stop()
+        await task
+        assert seen == [0, 2]
+        assert calls.count("1") == es.STREAM_MAX_DELIVERIES
+        r = fakeredis.aioredis.FakeRedis(server=server)
+        dead = await r.xrange(es._dead_key())
+        assert len(dead) == 1 and dead[0][1][b"seq"] == b"1"
+        assert dead[0][1][b"stream"] == es.stream_key(es.shard_of("a")).encode()
+        assert await _pending(server) == 0
+    asyncio.run(main())
+
+
+def test_new_owner_reclaims_pending_before_new_entries(server):
+    async def main():
+        key = es.stream_key(es.shard_of("a"))
+        ghost = fakeredis.aioredis.FakeRedis(server=server)
+        await ghost.xgroup_create(key, es.STREAM_GROUP, id="0", mkstream=True)
+        await _publish([("a", n) for n in range(2)])
+        # 죽은 워커가 읽고 ack 하지 못한 항목
+        assert await ghost.xreadgroup(es.STREAM_GROUP, "ghost", {key: ">"}, count=10)
+        await _publish([("a", n) for n in range(2, 4)])
+        seen = []
+
+        async def handler(d):
+            seen.append(int(d["seq"]))
+
+        w = _worker(server, handler, "w1")
+        task = asyncio.create_task(w.run())
+        await _until(lambda: len(seen) == 4)
+        w.stop()
+        await task
+        assert seen == [0, 1, 2, 3]
+        assert es.stats["reclaimed"] == 2
+        assert await _pending(server) == 0
+    asyncio.run(main())
+
+
+def test_entry_redelivered_too_often_is_dead_lettered_on_reclaim(server):
+    async def main():
+        key = es.stream_key(es.shard_of("a"))
+        ghost = fakeredis.aioredis.FakeRedis(server=server)
+        await ghost.xgroup_create(key, es.STREAM_GROUP, id="0", mkstream=True)
+        await _publish([("a", 0), ("a", 1)])
+        resp = await ghost.xreadgroup(es.STREAM_GROUP, "ghost", {key: ">"}, count=1)
+        eid = resp[0][1][0][0]
+        # 처리 중 워커가 계속 죽어 여러 소유자를 거친 항목
+        for _ in range(es.STREAM_MAX_DELIVERIES):
+            await ghost.xclaim(key, es.STREAM_GROUP, "ghost", 0, [eid])
+        seen = []
+
+        async def handler(d):
+            seen.append(int(d["seq"]))
+
+        w = _worker(server, handler, "w1")
+        task = asyncio.create_task(w.run())
+        await _until(lambda: seen == [1])
+        w.stop()
+        await task
+        assert es.stats["dead_lettered"] == 1
+        assert len(await ghost.xrange(es._dead_key())) == 1
+        assert await _pending(server) == 0
+    asyncio.run(main())
+
+
+def test_leases_rebalance_across_live_workers(server):
+    async def main():
+        async def handler(d):
+            pass
+
+        w1, w2 = _worker(server, handler, "w1"), _worker(server, handler, "w2")
+        t1 = asyncio.create_task(w1.run())
+        await _until(lambda: len(w1._owned) == es.STREAM_SHARDS)
+        t2 = asyncio.create_task(w2.run())
+        half = es.STREAM_SHARDS // 2
+        await _until(lambda: len(w1._owned) == half and len(w2._owned) == half)
+        assert not set(w1._owned) & set(w2._owned)
+
+        w1.stop()
+        await t1
+        await _until(lambda: len(w2._owned) == es.STREAM_SHARDS)
+        w2.stop()
+        await t2
+        assert es.stats["leases_lost"] == 0
+    asyncio.run(main())
+
+
+def test_releasing_several_shards_keeps_remaining_leases(server):
+    # 처리 중인 샤드 여러 개를 한 번에 반납해야 남길 임대(600ms)가 기다리는 사이 만료되지 않는다
+    async def main():
+        chats = [f"chat-{i}" for i in range(40)]
+        await _publish([(c, n) for n in range(3) for c in chats])
+        seen, active = [], {}
+
+        def make_handler(name):
+            async def handler(d):
+                shard = es.shard_of(d["chat_id"])
+                assert active.setdefault(shard, name) == name, f"shard {shard} consumed by two workers"
+                try:
+                    await asyncio.sleep(0.2)
+                    seen.append((d["chat_id"], int(d["seq"])))
+                finally:
+                    active.pop(shard, None)
+            return handler
+
+        w1, w2 = _worker(server, make_handler("w1"), "w1"), _worker(server, make_handler("w2"), "w2")
+        t1 = asyncio.create_task(w1.run())
+        await _until(lambda: len(w1._owned) == es.STREAM_SHARDS and active)
+        t2 = asyncio.create_task(w2.run())
+        await _until(lambda: len(seen) == len(chats) * 3, timeout=20)
+        w1.stop(), w2.stop()
+        await asyncio.gather(t1, t2)
+        assert sorted(seen) == sorted(set(seen))                       # 같은 항목을 두 번 처리하지 않음
+        assert all(v == [0, 1, 2] for v in _by_chat(seen).values())
+        assert es.stats["leases_lost"] == 0
+        assert w2._owned == {} and es.stats["leases_acquired"] > es.STREAM_SHARDS
+    asyncio.run(main())
@@ -0,0 +1,54 @@
+# tests/test_export.py
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete, text
+
+from api.db.session import init_models, get_session
+from api.db.models import ChatLog
+from api.services.export import build_query
+
+FESTIVAL = "테스트축제"
+
+ROWS = [
+    # (user, role, message, created_at)
+    ("u1", "user", f"{FESTIVAL} 어디예요", "2026-03-10 10:00:00"),   # 사용자가 언급
+    ("u1", "bot", "안내드릴게요", "2026-03-10 10:00:01"),
+    ("u2", "user", "안녕하세요", "2026-03-10 11:00:00"),
+    ("u2", "bot", f"{FESTIVAL} 안내입니다", "2026-03-10 11:00:01"),  # 봇이 언급
+    ("u3", "user", f"{FESTIVAL} 언제 해요", "2026-01-05 09:00:00"),  # 기간 밖 언급
+    ("u3", "bot", "답변입니다", "2026-03-11 09:00:01"),
+    ("u4", "user", "무관한 질문", "2026-03-12 09:00:00"),
+    ("u4", "bot", "무관한 답변", "2026-03-12 09:00:01"),
+]
+
+
+async def _export(**kw):
+    await init_models()
+    async with get_session() as s:
+        await s.execute(delete(ChatLog))
+        for u, role, msg, ts in ROWS:
+            await s.execute(
+                text("insert into chat_logs (channel_user_id, role, message, created_at) values (:u, :r, :m, :ts)"),
+                {"u": u, "r": role, "m": msg, "ts": ts},
+            )
+        await s.commit()
+        rows = (await s.execute(build_query(**kw))).all()
+    return sorted((r[1], r[2]) for r in rows)
+
+
+@pytest.mark.parametrize("since, until, users", [
+    (datetime(2026, 3, 1), None, ["u1", "u2"]),
+    (None, datetime(2026, 4, 1), ["u1", "u2", "u3"]),
+    (None, None, ["u1", "u2", "u3"]),
+    (datetime(2026, 3, 1), datetime(2026, 4, 1), ["u1", "u2"]),
+])
+def test_festival_mention_ignores_role_filter(since, until, users):
+    got = asyncio.run(_export(since=since, until=until, festival=FESTIVAL, role="bot"))
+    assert got == [(u, "bot") for u in users]
+
+
+def test_festival_without_role_exports_all_rows_of_mentioning_users():
+    got = asyncio.run(_export(since=datetime(2026, 3, 1), festival=FESTIVAL))
+    assert got == [("u1", "bot"), ("u1", "user"), ("u2", "bot"), ("u2", "user")]
@@ -0,0 +1,66 @@
+# tests/test_history_page.py
+import asyncio
+
+from sqlalchemy import delete, text
+
+from api.db.session import init_models, get_session
+from api.db.models import ChatLog
+from api.db.crud import add_chat_log, get_history_page
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+async def _reset():
+    await init_models()
+    async with get_session() as s:
+        await s.execute(delete(ChatLog))
+        await s.commit()
+
+
+async def _walk(user_id, limit, role=None):
+    """next_cursor 가 None 이 될 때까지 따라가며 모든 id (최신순)"""
+    ids, cursor, pages = [], None, 0
+    while True:
+        async with get_session() as s:
+            rows, cursor = await get_history_page(s, user_id, role=role, limit=limit, cursor=cursor)
+        ids += [r.id for r in rows]
+        pages += 1
+        assert pages < 100, "cursor does not advance"
+        if cursor is None:
+            return ids
+
+
+def test_walks_every_page_within_one_second():
+    # server_default 로 같은 초에 들어간 행들 — SQLite 커서 비교가 어긋나면 첫 페이지가 반복된다
+    async def main():
+        await _reset()
+        async with get_session() as s:
+            for i in range(23):
+                await add_chat_log(s, "u1", "user" if i % 2 else "bot", f"m{i}", defer=False)
+            await add_chat_log(s, "u2", "user", "other", defer=False)
+            await s.commit()
+            expected = [r[0] for r in (await s.execute(
+                text("select id from chat_logs where channel_user_id = 'u1' order by created_at desc, id desc")
+            )).all()]
+        assert await _walk("u1", 5) == expected
+        user_only = await _walk("u1", 4, role="user")
+        assert len(user_only) == 11 and user_only == sorted(user_only, reverse=True)
+    _run(main())
+
+
+def test_walks_every_page_across_seconds():
+    async def main():
+        await _reset()
+        async with get_session() as s:
+            for i, ts in enumerate(["2026-01-01 10:00:00"] * 3 + ["2026-01-01 10:00:01"] * 4 + ["2026-01-02 00:00:00"]):
+                await s.execute(
+                    text("insert into chat_logs (channel_user_id, role, message, created_at) values ('u1', 'user', :m, :ts)"),
+                    {"m": f"m{i}", "ts": ts},
+                )
+            await s.commit()
+        ids = await _walk("u1", 3)
+        assert len(ids) == 8 and len(set(ids)) == 8
+        assert ids == [8, 7, 6, 5, 4, 3, 2, 1]
+    _run(main())
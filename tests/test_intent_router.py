@@ -0,0 +1,66 @@
+# tests/test_intent_router.py
+import pytest
+
+from api.services.intent_router import (
+    DEFAULT_FESTIVALS, DEFAULT_KEYWORDS, FestivalDef, KeywordDef, RouterSnapshot,
+)
+
+DEFAULT = RouterSnapshot(DEFAULT_FESTIVALS, DEFAULT_KEYWORDS)
+CUSTOM = RouterSnapshot(
+    (FestivalDef("락페", 2, ("rock",)), FestivalDef("안내축제", 4)),
+    (
+        KeywordDef("굿즈", "point", "goods", "굿즈"),
+        KeywordDef("락페굿즈", "point", "official", "공식 굿즈"),   # 축제 이름을 품은 키워드
+        KeywordDef("안내", "point", "helpdesk", "안내데스크"),      # 축제 이름 안에 든 키워드
+        KeywordDef("부스", "point", "booth", "부스"),
+        KeywordDef("푸드부스", "point", "food", "푸드부스"),         # 겹치는 키워드
+    ),
+)
+
+
+def _match(snapshot, text):
+    intent = snapshot.match(text)
+    if intent is None:
+        return None
+    return intent.festival.name, intent.keyword.keyword if intent.keyword else None
+
+
+# 기존 startswith/endswith 체인과 결과가 같은 경우
+@pytest.mark.parametrize("snapshot, text, expected", [
+    # 축제 접두 + 키워드 접미
+    (DEFAULT, "대동제 화장실", ("대동제", "화장실")),
+    (DEFAULT, "대동제화장실", ("대동제", "화장실")),
+    (DEFAULT, "  락페 무대 ", ("락페", "무대")),
+    (DEFAULT, "해키 금지물품", ("해키", "금지물품")),
+    # 축제만
+    (DEFAULT, "대동제", ("대동제", None)),
+    (DEFAULT, "대동제 공연 언제", ("대동제", None)),
+    # 키워드만 / 축제가 맨 앞이 아님
+    (DEFAULT, "화장실", None),
+    (DEFAULT, "화장실 대동제", None),
+    (DEFAULT, "오늘 대동제 화장실", None),
+    # 겹치는 키워드: 문장 끝에 있는 것
+    (DEFAULT, "대동제 분실물 안내", ("대동제", "안내")),
+    (DEFAULT, "대동제 안내 분실물", ("대동제", "분실물")),
+    (CUSTOM, "락페 푸드부스", ("락페", "푸드부스")),
+    (CUSTOM, "락페 부스", ("락페", "부스")),
+    # 축제 이름이 키워드 안에 / 키워드가 축제 이름 안에
+    (CUSTOM, "락페굿즈", ("락페", "락페굿즈")),
+    (CUSTOM, "안내축제", ("안내축제", None)),
+    (CUSTOM, "안내축제 안내", ("안내축제", "안내")),
+])
+def test_matches_baseline(snapshot, text, expected):
+    assert _match(snapshot, text) == expected
+
+
+# 의도한 변화: 안쪽 공백·대소문자 무시, 키워드 뒤 조사/어미 허용
+@pytest.mark.parametrize("snapshot, text, expected", [
+    (DEFAULT, "대동제 화장실 어디야", ("대동제", "화장실")),
+    (DEFAULT, "대동제 무대는요?", ("대동제", "무대")),
+    (DEFAULT, "대동제 화 장 실", ("대동제", "화장실")),
+    (CUSTOM, "ROCK 부스", ("락페", "부스")),
+    # 공백을 지우므로 "락페 굿즈" == "락페굿즈" (기존엔 굿즈)
+    (CUSTOM, "락페 굿즈", ("락페", "락페굿즈")),
+])
+def test_tolerates_spacing_and_trailing_words(snapshot, text, expected):
+    assert _match(snapshot, text) == expected
@@ -0,0 +1,79 @@
+# tests/test_outbox.py
+import asyncio
+
+import pytest
+from sqlalchemy import delete, select, text
+
+from api.db.crud import record_message_with_reply
+from api.db.models import Outbox
+from api.db.session import init_models, get_session
+from api.services import outbox
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(outbox, "OUTBOX_MARK_DELAY_MS", 0)
+    monkeypatch.setattr(outbox, "OUTBOX_BACKOFF_BASE", 60)
+
+    async def reset():
+        await init_models()
+        async with get_session() as s:
+            await s.execute(delete(Outbox))
+            await s.commit()
+    asyncio.run(reset())
+
+
+async def _row(ob_id):
+    async with get_session() as s:
+        row = (await s.execute(select(Outbox).where(Outbox.id == ob_id))).scalar_one()
+        # created_at 과 같은 DB 시계 기준으로 비교
+        ahead = (await s.execute(
+            text("select strftime('%s', next_attempt_at) - strftime('%s', created_at) from outbox where id = :i"),
+            {"i": ob_id},
+        )).scalar()
+    return row, ahead
+
+
+async def _save():
+    async with get_session() as s:
+        _, ob_id = await record_message_with_reply(
+            s, "u1", None, "질문", "chat-1", "답변", next_attempt_at=outbox.claimed_until(),
+        )
+    return ob_id
+
+
+def test_inline_failure_is_deferred_on_db_clock(db):
+    async def main():
+        ob_id = await _save()
+        row, ahead = await _row(ob_id)
+        assert abs(ahead - outbox.OUTBOX_CLAIM_SEC) <= 1
+
+        async def fail(chat, msg):
+            return {"ok": False, "status": 503, "error": "unavailable"}
+
+        await outbox.deliver(ob_id, "chat-1", "답변", fail)
+        row, ahead = await _row(ob_id)
+        assert row.status == "pending" and row.attempts == 1
+        assert 0.8 * 60 - 1 <= ahead <= 1.2 * 60 + 1    # backoff(1) = OUTBOX_BACKOFF_BASE ±20%
+        # 기한 전이라 dispatcher 가 가져가지 않는다
+        assert (await outbox.dispatch_once(fail))["claimed"] == 0
+    asyncio.run(main())
+
+
+def test_due_rows_are_dispatched_and_marked_sent(db):
+    async def main():
+        async with get_session() as s:
+            _, ob_id = await record_message_with_reply(s, "u1", None, "질문", "chat-1", "답변")
+        sent = []
+
+        async def ok(chat, msg):
+            sent.append((chat, msg))
+            return {"message": {"id": "m1"}}
+
+        counts = await outbox.dispatch_once(ok)
+        assert counts["claimed"] == 1 and counts["sent"] == 1
+        assert sent == [("chat-1", "답변")]
+        row, _ = await _row(ob_id)
+        assert row.status == "sent" and row.sent_at is not None
+        assert (await outbox.status_counts())["sent"] == 1
+    asyncio.run(main())
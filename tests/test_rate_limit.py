@@ -0,0 +1,64 @@
+# tests/test_rate_limit.py
+import asyncio
+
+import fakeredis
+import pytest
+
+from api.services import rate_limit as rl
+
+SLOW = 0.06   # 분당 — 테스트 중에는 사실상 다시 차지 않음
+
+
+@pytest.fixture(params=["redis", "local"])
+def backend(request, monkeypatch):
+    r = fakeredis.aioredis.FakeRedis() if request.param == "redis" else None
+    monkeypatch.setattr(rl, "get_redis", lambda: r)
+    monkeypatch.setattr(rl, "RATE_LIMIT_ENABLED", True)
+    return request.param
+
+
+def _limiter(user=(SLOW, 2), chat=(SLOW, 3)):
+    return rl.IngestRateLimiter(user, chat, maxsize=100, notice_cooldown=60)
+
+
+async def _run(limiter, events):
+    return [await limiter.check(owner, chat) for owner, chat in events]
+
+
+def test_user_bucket_spans_chats(backend):
+    limiter = _limiter()
+    got = asyncio.run(_run(limiter, [("u1", "c1"), ("u1", "c2"), ("u1", "c3"), ("u2", "c3")]))
+    assert [d.allowed for d in got] == [True, True, False, True]
+    assert got[2].scope == "user" and got[2].notify
+    assert limiter.stats["throttled_user"] == 1 and limiter.stats["redis_error"] == 0
+
+
+def test_chat_bucket_spans_users(backend):
+    limiter = _limiter(user=(SLOW, 5))
+    got = asyncio.run(_run(limiter, [("u1", "c1"), ("u2", "c1"), ("u3", "c1"), ("u4", "c1"), ("u4", "c2")]))
+    assert [d.allowed for d in got] == [True, True, True, False, True]
+    assert got[3].scope == "chat"
+    assert limiter.stats["throttled_chat"] == 1
+
+
+def test_ownerless_events_use_only_their_chat_bucket(backend):
+    limiter = _limiter(user=(SLOW, 1))
+    got = asyncio.run(_run(limiter, [(None, "c1"), (None, "c2"), (None, "c1"), (None, "c1"), (None, "c1"), (None, "c1")]))
+    # 사용자 버킷(burst 1)을 나눠 쓰지 않으므로 상담마다 burst 3
+    assert [d.allowed for d in got] == [True, True, True, True, False, False]
+    assert got[4].scope == "chat" and got[4].notify and not got[5].notify   # 안내는 cooldown 에 한 번
+
+
+@pytest.mark.parametrize("user, chat, scope", [((0, 2), (SLOW, 3), "chat"), ((SLOW, 2), (0, 3), "user")])
+def test_zero_rate_disables_that_scope(backend, user, chat, scope):
+    limiter = _limiter(user=user, chat=chat)
+    got = asyncio.run(_run(limiter, [("u1", "c1")] * 4))
+    assert [d.allowed for d in got] == [True] * (3 if scope == "chat" else 2) + [False] * (1 if scope == "chat" else 2)
+    assert {d.scope for d in got if not d.allowed} == {scope}
+    assert limiter.stats["redis_error"] == 0
+
+
+def test_zero_rates_allow_everything(backend):
+    limiter = _limiter(user=(0, 2), chat=(0, 3))
+    got = asyncio.run(_run(limiter, [("u1", "c1")] * 5))
+    assert all(d.allowed for d in got)
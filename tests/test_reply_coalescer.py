@@ -0,0 +1,43 @@
+# tests/test_reply_coalescer.py
+import asyncio
+
+import pytest
+
+from api.clients import channeltalk_client as ctc
+
+
+@pytest.fixture
+def posted(monkeypatch):
+    out = []
+
+    async def fake_post(user_chat_id, body, *, bot_name=None, retries=None):
+        out.append((user_chat_id, body))
+        return {"message": {"id": str(len(out))}}
+
+    monkeypatch.setattr(ctc, "_post_message", fake_post)
+    return out
+
+
+async def _submit_all(items, window=0.05):
+    c = ctc.ReplyCoalescer(window, max_items=10)
+    return await asyncio.gather(*(c.submit("chat-1", text, None, plain) for text, plain in items))
+
+
+def test_same_plain_is_merged(posted):
+    asyncio.run(_submit_all([("a", True), ("b", True)]))
+    assert posted == [("chat-1", {"blocks": [{"type": "text", "value": "a"}, {"type": "text", "value": "b"}]})]
+
+
+def test_single_message_keeps_its_format(posted):
+    asyncio.run(_submit_all([("a", True)]))
+    asyncio.run(_submit_all([("b", False)]))
+    assert posted == [("chat-1", {"plainText": "a"}), ("chat-1", {"blocks": [{"type": "text", "value": "b"}]})]
+
+
+def test_plain_change_flushes_in_order(posted):
+    asyncio.run(_submit_all([("a", True), ("b", False), ("c", False), ("d", True)]))
+    assert posted == [
+        ("chat-1", {"plainText": "a"}),
+        ("chat-1", {"blocks": [{"type": "text", "value": "b"}, {"type": "text", "value": "c"}]}),
+        ("chat-1", {"plainText": "d"}),
+    ]
@@ -0,0 +1,44 @@
+# tests/test_webhook_dedup.py
+import asyncio
+
+import pytest
+
+from api.routers import channel_webhook as cw
+from api.services.dedup import Deduplicator
+from api.services.work_queue import KeyedWorkQueue
+
+
+@pytest.fixture
+def async_mode(monkeypatch):
+    d, q = Deduplicator(60, 100), KeyedWorkQueue(2, 10)
+    monkeypatch.setattr(cw, "dedup", d)
+    monkeypatch.setattr(cw, "webhook_queue", q)
+    monkeypatch.setattr(cw, "WEBHOOK_ASYNC", True)
+    monkeypatch.setattr(cw.event_stream, "enabled", lambda: False)
+    return d, q
+
+
+async def _dispatch_queued(d, q, event_id):
+    assert not await d.is_duplicate(event_id)
+    resp = await cw._dispatch("user", "u1", None, None, "chat-1", "안녕", event_id)
+    assert resp.status_code == 200
+    while q.depth() or q.stats["done"] + q.stats["failed"] < q.stats["submitted"]:
+        await asyncio.sleep(0.01)
+    return await d.is_duplicate(event_id)
+
+
+def test_failed_async_job_forgets_event(async_mode, monkeypatch):
+    async def boom(*a):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(cw, "_process_user_and_reply", boom)
+    assert asyncio.run(_dispatch_queued(*async_mode, "ev-1")) is False   # 재전송은 다시 처리
+    assert async_mode[1].stats["failed"] == 1
+
+
+def test_successful_async_job_keeps_event(async_mode, monkeypatch):
+    async def ok(*a):
+        pass
+
+    monkeypatch.setattr(cw, "_process_user_and_reply", ok)
+    assert asyncio.run(_dispatch_queued(*async_mode, "ev-2")) is True